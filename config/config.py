@@ -1,3 +1,5 @@
+import os
+
 # Configuration MySQL pour Workbench (WAMP)
 DB_CONFIG = {
     "host": "localhost",
@@ -23,4 +25,124 @@ TEST_USERS = ["admin", "root", "user", "test", "guest"]
 LOG_TYPES = ["SSH", "scan_port", "acces_fichier"]
 
 # Statuts possibles
-LOG_STATUS = ["succes", "echec", "detecte"]
\ No newline at end of file
+LOG_STATUS = ["succes", "echec", "detecte"]
+
+# Modèles de description des logs (paramètre noté {}) - table ref_modeles_description
+DESCRIPTION_TEMPLATES = {
+    "ssh_echec": "Tentative de connexion SSH échouée pour {}",
+    "ssh_succes": "Connexion SSH réussie pour {}",
+    "scan_port": "Scan de ports détecté - {} ports analysés",
+    "acces_fichier": "Tentative d'accès au fichier {}",
+    "brute_force": "Tentative brute force #{} - Mot de passe incorrect"
+}
+
+# Partitionnement et rétention de logs_securite (src/partition_maintenance.py)
+LOG_PARTITION_INTERVAL = "day"   # "day" (journalier) ou "week" (hebdomadaire)
+LOG_PARTITIONS_AHEAD = 7         # Nombre de partitions futures créées à l'avance
+LOG_RETENTION_DAYS = 90          # Les partitions plus anciennes sont supprimées
+
+# Archive froide des logs (src/log_archive.py) : un fichier colonne compressé par jour
+ARCHIVE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "archive")
+ARCHIVE_BEFORE_DROP = True       # Archiver les jours d'une partition avant sa suppression
+ARCHIVE_FETCH_SIZE = 10_000      # Lignes lues par fetchmany (seules les colonnes encodées restent en mémoire)
+
+# Distribution des notifications (src/notification_dispatcher.py)
+NOTIFICATION_BATCH_SIZE = 500      # Notifications réclamées par transaction
+NOTIFICATION_POLL_INTERVAL = 2     # Secondes entre deux lectures de l'outbox vide
+NOTIFICATION_RECONNECT_ATTEMPTS = 3   # Reconnexions tentées avant chaque lot (espacées de l'intervalle)
+NOTIFICATION_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alertes.jsonl")
+NOTIFICATION_WEBHOOK_URL = "http://127.0.0.1:8765/alertes"   # Stub local : --stub
+
+# Flux de menaces (src/threat_intel.py) : nom → fichier d'IP / préfixes CIDR
+THREAT_FEEDS = {
+    "suspect_ips": os.path.join(os.path.dirname(os.path.abspath(__file__)), "threat_feeds", "suspect_ips.txt")
+}
+THREAT_FEEDS_RELOAD_INTERVAL = 60   # Secondes entre deux vérifications des fichiers
+
+# Enrichissement GeoIP / ASN (src/geoip.py) : base binaire de plages, lue par mmap
+GEOIP_DATABASE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "geoip", "geoip.bin")
+GEOIP_CACHE_SIZE = 65536          # Entrées du cache LRU placé devant la base
+
+# Démon de pipeline (src/pipeline_daemon.py) : lots de logs dont l'INSERT échoue
+PIPELINE_INSERT_RETRIES = 5      # Tentatives par lot (délai doublé après chaque échec)
+PIPELINE_RETRY_DELAY = 1         # Secondes avant la deuxième tentative
+PIPELINE_SPILL_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs_non_inseres.jsonl")
+
+# Corrélation multi-étapes (src/correlation.py) : séquences suivies par IP source
+CORRELATION_SEQUENCES = [
+    {
+        "nom": "Kill chain SSH",
+        "id_regle": 4,
+        "severite": "critique",
+        "fenetre": 30 * 60,    # Secondes max entre la première et la dernière étape
+        "etapes": [
+            {"type_log": "scan_port"},
+            {"type_log": "SSH", "statut": "echec", "min": 3},
+            {"type_log": "acces_fichier", "description_contient": "/etc/shadow"}
+        ]
+    }
+]
+CORRELATION_MAX_SOURCES = 2_000_000   # États suivis au maximum (les plus anciens sont évincés)
+CORRELATION_OVERLAP_IDS = 1000        # Derniers id_log relus à chaque analyse (commits hors de l'ordre des id)
+
+# Agrégation des incidents : silence (s) au-delà duquel une campagne est close
+INCIDENT_QUIET_PERIOD = 15 * 60
+
+# Limitation des alertes (alert_system.AlertSuppressor) : seau à jetons par (règle, sévérité)
+ALERT_RATE_LIMITS = {
+    "critique": {"capacite": 20, "recharge": 1.0},    # Jetons max, jetons/seconde
+    "moyen": {"capacite": 10, "recharge": 0.2},
+    "faible": {"capacite": 5, "recharge": 0.05}
+}
+ALERT_DIGEST_WINDOW = 60      # Secondes de regroupement des alertes supprimées en un résumé
+ALERT_DIGEST_EXAMPLES = 3     # Exemples conservés par résumé
+
+# Journalisation structurée (src/structured_logging.py)
+LOG_LEVEL = os.environ.get("CSM_LOG_LEVEL", "INFO")
+LOG_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "cloudsecmonitor.jsonl")
+LOG_CONSOLE = os.environ.get("CSM_LOG_CONSOLE", "1") == "1"   # Vue console colorée
+LOG_EVENT_SAMPLE_EVERY = 100    # Un message par événement gardé sur N
+LOG_QUEUE_SIZE = 10_000         # File entre les appelants et le thread d'écriture
+
+# Triage en masse des incidents : incidents par transaction (verrous courts)
+INCIDENT_BULK_BATCH_SIZE = 500
+
+# Dashboard : cache des requêtes (clé = version des données) et fraîcheur de la version
+DASHBOARD_CACHE_TTL = 300      # Secondes max avant de rejouer une requête, même sans changement
+DASHBOARD_VERSION_TTL = 5      # Secondes entre deux lectures de MAX(id_log) / MAX(id_incident)
+
+# Export en flux (src/log_export.py) : lignes lues par paquet et dossier des fichiers du dashboard
+EXPORT_CHUNK_SIZE = 10_000
+EXPORT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "exports")
+EXPORT_DOWNLOAD_MAX_MB = 50    # Au-delà, le dashboard indique le chemin du fichier au lieu de le servir
+
+# Dashboard, mode direct : intervalle d'actualisation (s) et lignes gardées en session
+DASHBOARD_LIVE_INTERVAL = 5
+DASHBOARD_LIVE_MAX_ROWS = 2000
+DASHBOARD_LIVE_MAX_INCIDENTS = 200
+DASHBOARD_LIVE_OVERLAP_IDS = 1000   # Derniers id_log relus à chaque passage (commits hors de l'ordre des id)
+
+# Agrégats temporels des logs (src/log_rollup.py) et séries du dashboard
+ROLLUP_BATCH_SIZE = 100_000            # Identifiants de logs agrégés par transaction
+ROLLUP_MINUTE_RETENTION_DAYS = 35      # Au-delà, seules les séries horaires restent disponibles
+ROLLUP_SAFETY_LAG = 60                 # Secondes : seuls les logs plus anciens font avancer l'état (commits tardifs)
+DASHBOARD_SERIES_MAX_POINTS = 1000     # Points max par série (le pas est choisi en conséquence)
+
+# Recherche dans les descriptions de logs (src/log_search.py)
+SEARCH_INDEX_BATCH_SIZE = 50_000       # Identifiants de logs indexés par transaction
+SEARCH_MAX_TOKENS = 5                  # Mots retenus par recherche (les plus longs)
+
+# Dashboard : pool de connexions (src/db_pool.py)
+DASHBOARD_POOL_SIZE = 10             # Connexions ouvertes au plus (toutes sessions confondues)
+DASHBOARD_POOL_TIMEOUT = 5           # Secondes d'attente d'une connexion libre
+DASHBOARD_POOL_PING_AFTER = 30       # Inactivité (s) au-delà de laquelle une connexion est vérifiée
+DASHBOARD_QUERY_TIMEOUT_MS = 10_000  # MAX_EXECUTION_TIME des SELECT du dashboard
+
+# Dashboard : budgets de temps (affichés dans le panneau Debug)
+DASHBOARD_FIRST_PAINT_BUDGET_MS = 300    # Script lancé -> CSS et navigation envoyés
+DASHBOARD_RENDER_BUDGET_MS = 1500        # Rendu complet de la page active
+
+# Chronométrage des requêtes SQL (src/query_stats.py, page Performance du dashboard)
+QUERY_STATS_CAPACITY = 5000              # Entrées du tampon circulaire par processus
+QUERY_STATS_SAMPLE_RATE = float(os.environ.get("CSM_QUERY_SAMPLE_RATE", "1.0"))   # Part des requêtes notées
+QUERY_STATS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "query_stats")
@@ -0,0 +1,26 @@
+-- MIGRATION 001 : INDEX ADAPTÉS AUX REQUÊTES CRITIQUES
+-- Chaque index correspond à une requête enregistrée dans HOT_QUERIES (src/db_migrations.py)
+
+
+-- detect_brute_force() / detect_port_scan() :
+-- filtre type_log + statut + fenêtre sur date_heure, IP incluse pour le regroupement
+CREATE INDEX idx_logs_type_statut_date
+    ON logs_securite (type_log, statut, date_heure, adresse_ip_source);
+
+-- Dashboard (logs récents) : ORDER BY date_heure DESC LIMIT n
+CREATE INDEX idx_logs_date ON logs_securite (date_heure);
+
+-- Dashboard (top IP suspectes, KPI IP suspectes) : statut = 'echec' groupé par IP (couvrant)
+CREATE INDEX idx_logs_statut_ip ON logs_securite (statut, adresse_ip_source);
+
+-- check_if_incident_exists() : recherche par (id_log, id_regle) (couvrant)
+-- L'index remplace celui créé automatiquement pour la clé étrangère sur id_log
+CREATE INDEX idx_incidents_log_regle ON incidents (id_log, id_regle);
+ALTER TABLE incidents DROP INDEX id_log;
+
+-- Dashboard (incidents) : ORDER BY date_detection DESC
+CREATE INDEX idx_incidents_date ON incidents (date_detection);
+
+-- KPI alertes critiques : niveau_severite = 'critique' AND statut = 'nouveau'
+CREATE INDEX idx_incidents_severite_statut
+    ON incidents (niveau_severite, statut, date_detection);
@@ -0,0 +1,32 @@
+-- MIGRATION 002 : PARTITIONNEMENT DE logs_securite PAR PLAGE SUR date_heure
+--
+-- Contraintes InnoDB pour une table partitionnée :
+--   * aucune clé étrangère (ni depuis la table, ni vers la table)
+--   * chaque clé unique (dont la clé primaire) doit contenir la colonne de partitionnement
+--
+-- Les clés étrangères incidents.id_log → logs_securite et logs_securite.id_serveur → serveurs
+-- sont donc supprimées. L'intégrité est assurée par l'application :
+--   * les incidents ne sont créés qu'à partir de logs lus en base (log_analyzer.py)
+--   * le ON DELETE CASCADE est émulé par src/partition_maintenance.py : avant de supprimer une
+--     partition expirée, les incidents qui référencent ses logs sont supprimés ; une partition
+--     encore référencée par un incident non résolu est conservée jusqu'à sa résolution
+--   * les index sur incidents.id_log (idx_incidents_log_regle) et logs_securite.id_serveur
+--     sont conservés pour les jointures
+--
+-- La table est créée avec une seule partition pmax ; les partitions journalières/hebdomadaires
+-- sont découpées par : python src/partition_maintenance.py
+
+
+ALTER TABLE incidents DROP FOREIGN KEY incidents_ibfk_1;
+
+ALTER TABLE logs_securite DROP FOREIGN KEY logs_securite_ibfk_1;
+
+ALTER TABLE logs_securite
+    MODIFY date_heure DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    DROP PRIMARY KEY,
+    ADD PRIMARY KEY (id_log, date_heure);
+
+ALTER TABLE logs_securite
+    PARTITION BY RANGE (TO_DAYS(date_heure)) (
+        PARTITION pmax VALUES LESS THAN MAXVALUE
+    );
@@ -0,0 +1,142 @@
+-- MIGRATION 003 : ENCODAGE DICTIONNAIRE DES COLONNES RÉPÉTITIVES DE logs_securite
+--
+-- type_log, statut et utilisateur deviennent des codes entiers (tables de référence ref_*).
+-- description devient un modèle (ref_modeles_description, paramètre noté {}) + un paramètre.
+-- Les codes sont mis en cache par src/log_codec.py (encodage à la collecte, décodage
+-- dans l'analyseur et le dashboard). La vue v_logs_securite restitue les colonnes d'origine
+-- pour les requêtes ad hoc.
+--
+-- Les codes de SSH/scan_port/acces_fichier et succes/echec/detecte sont fixés (1, 2, 3) :
+-- les requêtes enregistrées dans HOT_QUERIES (db_migrations.py) en dépendent.
+
+
+-- SECTION 1 : TABLES DE RÉFÉRENCE
+
+CREATE TABLE ref_types_log (
+    id_type_log TINYINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+    libelle VARCHAR(50) NOT NULL UNIQUE
+);
+
+CREATE TABLE ref_statuts (
+    id_statut TINYINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+    libelle VARCHAR(20) NOT NULL UNIQUE
+);
+
+CREATE TABLE ref_utilisateurs (
+    id_utilisateur SMALLINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+    libelle VARCHAR(50) NOT NULL UNIQUE
+);
+
+CREATE TABLE ref_modeles_description (
+    id_modele SMALLINT UNSIGNED PRIMARY KEY AUTO_INCREMENT,
+    modele VARCHAR(500) NOT NULL UNIQUE
+);
+
+INSERT INTO ref_types_log (id_type_log, libelle) VALUES
+(1, 'SSH'), (2, 'scan_port'), (3, 'acces_fichier');
+
+INSERT INTO ref_statuts (id_statut, libelle) VALUES
+(1, 'succes'), (2, 'echec'), (3, 'detecte');
+
+INSERT INTO ref_utilisateurs (libelle) VALUES
+('admin'), ('root'), ('user'), ('test'), ('guest');
+
+-- Modèle générique {} : description libre stockée entièrement dans le paramètre
+INSERT INTO ref_modeles_description (id_modele, modele) VALUES
+(1, '{}'),
+(2, 'Tentative de connexion SSH échouée pour {}'),
+(3, 'Connexion SSH réussie pour {}'),
+(4, 'Scan de ports détecté - {} ports analysés'),
+(5, 'Tentative d''accès au fichier {}'),
+(6, 'Tentative brute force #{} - Mot de passe incorrect'),
+(7, 'Tentative de connexion échouée'),
+(8, 'Scan de ports détecté');
+
+
+-- SECTION 2 : NOUVELLES COLONNES ET REPRISE DES DONNÉES
+
+ALTER TABLE logs_securite
+    ADD COLUMN id_type_log TINYINT UNSIGNED NULL AFTER id_serveur,
+    ADD COLUMN id_utilisateur SMALLINT UNSIGNED NULL AFTER adresse_ip_source,
+    ADD COLUMN id_statut TINYINT UNSIGNED NULL AFTER id_utilisateur,
+    ADD COLUMN id_modele SMALLINT UNSIGNED NULL AFTER date_heure,
+    ADD COLUMN description_param TEXT NULL AFTER id_modele;
+
+INSERT IGNORE INTO ref_types_log (libelle) SELECT DISTINCT type_log FROM logs_securite;
+INSERT IGNORE INTO ref_statuts (libelle) SELECT DISTINCT statut FROM logs_securite;
+INSERT IGNORE INTO ref_utilisateurs (libelle)
+    SELECT DISTINCT utilisateur FROM logs_securite WHERE utilisateur IS NOT NULL;
+
+UPDATE logs_securite l
+JOIN ref_types_log t ON t.libelle = l.type_log
+JOIN ref_statuts s ON s.libelle = l.statut
+SET l.id_type_log = t.id_type_log,
+    l.id_statut = s.id_statut;
+
+UPDATE logs_securite l
+JOIN ref_utilisateurs u ON u.libelle = l.utilisateur
+SET l.id_utilisateur = u.id_utilisateur;
+
+-- Descriptions correspondant exactement à un modèle sans paramètre
+UPDATE logs_securite l
+JOIN ref_modeles_description m ON m.modele = l.description
+SET l.id_modele = m.id_modele;
+
+-- Descriptions correspondant à un modèle paramétré : préfixe + {paramètre} + suffixe
+UPDATE logs_securite l
+JOIN ref_modeles_description m
+    ON m.id_modele > 1
+    AND LOCATE('{}', m.modele) > 0
+    AND l.description LIKE REPLACE(m.modele, '{}', '%')
+SET l.id_modele = m.id_modele,
+    l.description_param = SUBSTRING(
+        l.description,
+        LOCATE('{}', m.modele),
+        CHAR_LENGTH(l.description) - CHAR_LENGTH(m.modele) + 2
+    )
+WHERE l.id_modele IS NULL;
+
+-- Descriptions libres restantes : modèle générique
+UPDATE logs_securite
+SET id_modele = 1, description_param = description
+WHERE id_modele IS NULL AND description IS NOT NULL;
+
+
+-- SECTION 3 : SUPPRESSION DES COLONNES TEXTE ET NOUVEAUX INDEX
+
+ALTER TABLE logs_securite
+    DROP INDEX idx_logs_type_statut_date,
+    DROP INDEX idx_logs_statut_ip;
+
+ALTER TABLE logs_securite
+    MODIFY id_type_log TINYINT UNSIGNED NOT NULL,
+    MODIFY id_statut TINYINT UNSIGNED NOT NULL,
+    DROP COLUMN type_log,
+    DROP COLUMN statut,
+    DROP COLUMN utilisateur,
+    DROP COLUMN description;
+
+CREATE INDEX idx_logs_type_statut_date
+    ON logs_securite (id_type_log, id_statut, date_heure, adresse_ip_source);
+
+CREATE INDEX idx_logs_statut_ip ON logs_securite (id_statut, adresse_ip_source);
+
+
+-- SECTION 4 : VUE DE COMPATIBILITÉ (colonnes décodées)
+
+CREATE OR REPLACE VIEW v_logs_securite AS
+SELECT
+    l.id_log,
+    l.id_serveur,
+    t.libelle AS type_log,
+    l.adresse_ip_source,
+    u.libelle AS utilisateur,
+    s.libelle AS statut,
+    l.date_heure,
+    IF(l.description_param IS NULL, m.modele,
+       REPLACE(m.modele, '{}', l.description_param)) AS description
+FROM logs_securite l
+JOIN ref_types_log t ON t.id_type_log = l.id_type_log
+JOIN ref_statuts s ON s.id_statut = l.id_statut
+LEFT JOIN ref_utilisateurs u ON u.id_utilisateur = l.id_utilisateur
+LEFT JOIN ref_modeles_description m ON m.id_modele = l.id_modele;
@@ -0,0 +1,45 @@
+-- MIGRATION 004 : TABLE notifications UTILISÉE COMME OUTBOX
+--
+-- Le trigger d'insertion d'incident alimente notifications pour toutes les sévérités ;
+-- src/notification_dispatcher.py réclame les notifications non lues par lots
+-- (SELECT ... FOR UPDATE SKIP LOCKED), les livre aux sorties configurées
+-- (terminal, fichier, webhook) puis les marque lues en une seule requête.
+-- create_incident() n'affiche plus l'alerte de façon synchrone.
+
+
+ALTER TABLE notifications
+    ADD COLUMN id_incident INT NULL AFTER id_notification,
+    ADD COLUMN id_regle INT NULL AFTER id_incident,
+    ADD COLUMN niveau_severite ENUM('faible', 'moyen', 'critique') NULL AFTER type_notification,
+    ADD INDEX idx_notifications_lu (lu, id_notification);
+
+DROP TRIGGER IF EXISTS after_incident_critical;
+
+DELIMITER //
+
+CREATE TRIGGER after_incident_notification
+AFTER INSERT ON incidents
+FOR EACH ROW
+BEGIN
+    INSERT INTO notifications (
+        id_incident,
+        id_regle,
+        type_notification,
+        niveau_severite,
+        message,
+        date_notification
+    ) VALUES (
+        NEW.id_incident,
+        NEW.id_regle,
+        CASE NEW.niveau_severite
+            WHEN 'critique' THEN 'ALERTE_CRITIQUE'
+            WHEN 'moyen' THEN 'ALERTE_MOYENNE'
+            ELSE 'ALERTE_FAIBLE'
+        END,
+        NEW.niveau_severite,
+        CONCAT('Incident ', NEW.niveau_severite, ' détecté : ', NEW.type_incident),
+        NOW()
+    );
+END//
+
+DELIMITER ;
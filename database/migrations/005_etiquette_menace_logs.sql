@@ -0,0 +1,8 @@
+-- MIGRATION 005 : ÉTIQUETTE DES FLUX DE MENACES SUR LES LOGS
+--
+-- Le collecteur compare chaque IP source aux flux de menaces (src/threat_intel.py)
+-- avant l'insertion et stocke les noms des flux correspondants (NULL sinon).
+
+
+ALTER TABLE logs_securite
+    ADD COLUMN menace VARCHAR(100) NULL AFTER description_param;
@@ -0,0 +1,9 @@
+-- MIGRATION 006 : ENRICHISSEMENT GEOIP / ASN DES LOGS
+--
+-- Le collecteur renseigne le pays et l'ASN de l'IP source à l'insertion
+-- (src/geoip.py, base de plages locale lue par mmap). NULL si l'IP est inconnue.
+
+
+ALTER TABLE logs_securite
+    ADD COLUMN code_pays CHAR(2) NULL AFTER adresse_ip_source,
+    ADD COLUMN asn INT UNSIGNED NULL AFTER code_pays;
@@ -0,0 +1,8 @@
+-- MIGRATION 007 : RÈGLE DE CORRÉLATION MULTI-ÉTAPES
+--
+-- Incident de campagne levé par src/correlation.py quand une séquence configurée
+-- (CORRELATION_SEQUENCES) est complétée par une même IP source.
+
+
+INSERT INTO regles_alerte (id_regle, nom_regle, type_anomalie, seuil_declenchement, niveau_severite, action) VALUES
+(4, 'Campagne multi-étapes', 'correlation', 3, 'critique', 'Bloquer IP et alerter');
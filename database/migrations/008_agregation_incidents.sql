@@ -0,0 +1,26 @@
+-- MIGRATION 008 : AGRÉGATION DES INCIDENTS PAR CAMPAGNE
+--
+-- Un incident ouvert par (règle, IP source, serveur) est mis à jour sur place
+-- (nombre d'événements, plage de logs, dernière activité) tant que l'attaque
+-- continue ; un nouvel incident n'est créé qu'après INCIDENT_QUIET_PERIOD
+-- secondes sans activité. La table incidents croît avec les attaques, pas avec
+-- les cycles d'analyse, et le trigger d'outbox ne notifie qu'une fois par campagne.
+
+
+ALTER TABLE incidents
+    ADD COLUMN adresse_ip_source VARCHAR(45) NULL AFTER id_regle,
+    ADD COLUMN id_serveur INT NULL AFTER adresse_ip_source,
+    ADD COLUMN nb_evenements INT NOT NULL DEFAULT 1 AFTER id_serveur,
+    ADD COLUMN premier_log INT NULL AFTER nb_evenements,
+    ADD COLUMN dernier_log INT NULL AFTER premier_log,
+    ADD COLUMN derniere_activite DATETIME NULL AFTER date_detection,
+    ADD INDEX idx_incidents_campagne (id_regle, adresse_ip_source, id_serveur, statut, derniere_activite);
+
+-- Incidents existants : une campagne d'un seul log
+UPDATE incidents i
+JOIN logs_securite ls ON ls.id_log = i.id_log
+SET i.adresse_ip_source = ls.adresse_ip_source,
+    i.id_serveur = ls.id_serveur,
+    i.premier_log = i.id_log,
+    i.dernier_log = i.id_log,
+    i.derniere_activite = i.date_detection;
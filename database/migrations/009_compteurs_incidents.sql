@@ -0,0 +1,105 @@
+-- MIGRATION 009 : COMPTEURS D'INCIDENTS (SÉVÉRITÉ × STATUT)
+--
+-- compteurs_incidents contient une ligne par couple (sévérité, statut). Les
+-- triggers ci-dessous la tiennent à jour dans la transaction de chaque
+-- insertion, mise à jour ou suppression d'incident : create_incident(),
+-- record_incident(), update_incident_status() et les procédures creer_incident /
+-- resoudre_incident passent tous par eux. Les statistiques lisent 9 lignes,
+-- quelle que soit la taille de l'historique.
+--
+-- reconcilier_compteurs_incidents() recalcule les compteurs depuis incidents
+-- (appelée par la maintenance périodique) et renvoie les écarts corrigés.
+
+
+CREATE TABLE compteurs_incidents (
+    niveau_severite ENUM('faible', 'moyen', 'critique') NOT NULL,
+    statut ENUM('nouveau', 'en_cours', 'resolu') NOT NULL,
+    nombre INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (niveau_severite, statut)
+);
+
+INSERT INTO compteurs_incidents (niveau_severite, statut, nombre)
+SELECT s.niveau_severite, t.statut,
+       (SELECT COUNT(*) FROM incidents i
+        WHERE i.niveau_severite = s.niveau_severite AND i.statut = t.statut)
+FROM (SELECT 'faible' AS niveau_severite UNION ALL SELECT 'moyen' UNION ALL SELECT 'critique') s
+CROSS JOIN (SELECT 'nouveau' AS statut UNION ALL SELECT 'en_cours' UNION ALL SELECT 'resolu') t;
+
+DELIMITER //
+
+CREATE TRIGGER after_incident_compteur_insert
+AFTER INSERT ON incidents
+FOR EACH ROW
+BEGIN
+    UPDATE compteurs_incidents
+    SET nombre = nombre + 1
+    WHERE niveau_severite = NEW.niveau_severite AND statut = NEW.statut;
+END//
+
+CREATE TRIGGER after_incident_compteur_update
+AFTER UPDATE ON incidents
+FOR EACH ROW
+BEGIN
+    IF NEW.niveau_severite != OLD.niveau_severite OR NEW.statut != OLD.statut THEN
+        UPDATE compteurs_incidents
+        SET nombre = nombre - 1
+        WHERE niveau_severite = OLD.niveau_severite AND statut = OLD.statut;
+        UPDATE compteurs_incidents
+        SET nombre = nombre + 1
+        WHERE niveau_severite = NEW.niveau_severite AND statut = NEW.statut;
+    END IF;
+END//
+
+CREATE TRIGGER after_incident_compteur_delete
+AFTER DELETE ON incidents
+FOR EACH ROW
+BEGIN
+    UPDATE compteurs_incidents
+    SET nombre = nombre - 1
+    WHERE niveau_severite = OLD.niveau_severite AND statut = OLD.statut;
+END//
+
+DROP PROCEDURE IF EXISTS stats_incidents//
+
+CREATE PROCEDURE stats_incidents()
+BEGIN
+    SELECT
+        niveau_severite as severite,
+        statut,
+        nombre as nombre_incidents
+    FROM compteurs_incidents
+    WHERE nombre > 0
+    ORDER BY niveau_severite DESC, statut;
+END//
+
+CREATE PROCEDURE reconcilier_compteurs_incidents()
+BEGIN
+    -- Le verrou sur les compteurs bloque les triggers concurrents : le comptage
+    -- qui suit voit tous les incidents déjà comptés
+    START TRANSACTION;
+
+    SELECT COUNT(*) INTO @nb_compteurs FROM compteurs_incidents FOR UPDATE;
+
+    DROP TEMPORARY TABLE IF EXISTS tmp_comptage_incidents;
+    CREATE TEMPORARY TABLE tmp_comptage_incidents AS
+    SELECT c.niveau_severite, c.statut, c.nombre AS compteur,
+           (SELECT COUNT(*) FROM incidents i
+            WHERE i.niveau_severite = c.niveau_severite AND i.statut = c.statut) AS reel
+    FROM compteurs_incidents c;
+
+    UPDATE compteurs_incidents c
+    JOIN tmp_comptage_incidents t
+      ON t.niveau_severite = c.niveau_severite AND t.statut = c.statut
+    SET c.nombre = t.reel
+    WHERE c.nombre != t.reel;
+
+    COMMIT;
+
+    SELECT niveau_severite, statut, compteur, reel
+    FROM tmp_comptage_incidents
+    WHERE compteur != reel;
+
+    DROP TEMPORARY TABLE tmp_comptage_incidents;
+END//
+
+DELIMITER ;
@@ -0,0 +1,13 @@
+-- MIGRATION 010 : INDEX DE PAGINATION DES INCIDENTS
+--
+-- Registre du dashboard (get_incidents_page) : filtre facultatif sur la sévérité
+-- et/ou le statut, tri par (date_detection, id_incident) décroissant, pagination par
+-- clé. Avec les deux filtres, idx_incidents_severite_statut (migration 001) suffit ;
+-- un seul filtre doit aussi lire les lignes dans l'ordre de date_detection.
+
+
+-- Filtre sur le statut seul (ex: incidents 'nouveau')
+CREATE INDEX idx_incidents_statut_date ON incidents (statut, date_detection);
+
+-- Filtre sur la sévérité seule (ex: incidents 'critique' récents de l'accueil)
+CREATE INDEX idx_incidents_severite_date ON incidents (niveau_severite, date_detection);
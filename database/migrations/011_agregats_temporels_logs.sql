@@ -0,0 +1,47 @@
+-- MIGRATION 011 : AGRÉGATS TEMPORELS DES LOGS (PAR MINUTE ET PAR HEURE)
+--
+-- Les séries temporelles du dashboard (get_event_series) lisent ces agrégats au
+-- lieu de logs_securite : une ligne par (minute, type, statut) et par
+-- (heure, serveur, type, statut), quel que soit le volume de logs.
+--
+-- src/log_rollup.py les tient à jour par lots d'id_log au-delà du dernier
+-- identifiant agrégé (etat_agregats) ; les logs plus récents sont agrégés à la
+-- lecture. Les agrégats horaires survivent à la suppression des partitions ;
+-- les minutes sont purgées après ROLLUP_MINUTE_RETENTION_DAYS.
+
+
+CREATE TABLE logs_par_minute (
+    minute DATETIME NOT NULL,
+    id_type_log TINYINT UNSIGNED NOT NULL,
+    id_statut TINYINT UNSIGNED NOT NULL,
+    nombre INT UNSIGNED NOT NULL,
+    PRIMARY KEY (minute, id_type_log, id_statut)
+);
+
+CREATE TABLE logs_par_heure (
+    heure DATETIME NOT NULL,
+    id_serveur INT NOT NULL,
+    id_type_log TINYINT UNSIGNED NOT NULL,
+    id_statut TINYINT UNSIGNED NOT NULL,
+    nombre INT UNSIGNED NOT NULL,
+    PRIMARY KEY (heure, id_serveur, id_type_log, id_statut)
+);
+
+CREATE TABLE etat_agregats (
+    nom VARCHAR(50) PRIMARY KEY,
+    dernier_id BIGINT NOT NULL DEFAULT 0
+);
+
+-- Reprise de l'historique présent
+INSERT INTO logs_par_minute (minute, id_type_log, id_statut, nombre)
+SELECT DATE_FORMAT(date_heure, '%Y-%m-%d %H:%i:00'), id_type_log, id_statut, COUNT(*)
+FROM logs_securite
+GROUP BY 1, 2, 3;
+
+INSERT INTO logs_par_heure (heure, id_serveur, id_type_log, id_statut, nombre)
+SELECT DATE_FORMAT(date_heure, '%Y-%m-%d %H:00:00'), id_serveur, id_type_log, id_statut, COUNT(*)
+FROM logs_securite
+GROUP BY 1, 2, 3, 4;
+
+INSERT INTO etat_agregats (nom, dernier_id)
+SELECT 'logs', COALESCE(MAX(id_log), 0) FROM logs_securite;
@@ -0,0 +1,26 @@
+-- MIGRATION 012 : CUBE D'ACTIVITÉ (HEURE × SERVEUR × TYPE × STATUT × UTILISATEUR)
+--
+-- Une ligne par combinaison présente dans l'heure. src/log_rollup.py la tient à
+-- jour avec les autres agrégats (même état etat_agregats, même transaction) ;
+-- le dashboard la charge une fois en tableaux compacts (src/activity_cube.py)
+-- puis ne relit que les dernières heures. id_utilisateur vaut 0 pour les logs
+-- sans utilisateur (scans de ports).
+
+
+CREATE TABLE cube_activite (
+    heure DATETIME NOT NULL,
+    id_serveur INT NOT NULL,
+    id_type_log TINYINT UNSIGNED NOT NULL,
+    id_statut TINYINT UNSIGNED NOT NULL,
+    id_utilisateur SMALLINT UNSIGNED NOT NULL,
+    nombre INT UNSIGNED NOT NULL,
+    PRIMARY KEY (heure, id_serveur, id_type_log, id_statut, id_utilisateur)
+);
+
+-- Reprise jusqu'au dernier log déjà agrégé (les suivants passent par log_rollup.py)
+INSERT INTO cube_activite (heure, id_serveur, id_type_log, id_statut, id_utilisateur, nombre)
+SELECT DATE_FORMAT(date_heure, '%Y-%m-%d %H:00:00'), id_serveur, id_type_log, id_statut,
+       COALESCE(id_utilisateur, 0), COUNT(*)
+FROM logs_securite
+WHERE id_log <= (SELECT dernier_id FROM etat_agregats WHERE nom = 'logs')
+GROUP BY 1, 2, 3, 4, 5;
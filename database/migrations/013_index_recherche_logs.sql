@@ -0,0 +1,26 @@
+-- MIGRATION 013 : INDEX DE RECHERCHE PLEIN TEXTE DES DESCRIPTIONS DE LOGS
+--
+-- Un index FULLTEXT est impossible sur logs_securite (table partitionnée). Les
+-- descriptions sont de toute façon encodées (migration 003) : un modèle parmi
+-- quelques dizaines (ref_modeles_description) et un paramètre libre.
+--   * les mots des modèles sont cherchés dans ref_modeles_description (en mémoire),
+--     puis les logs de ces modèles par idx_logs_modele_date
+--   * les mots des paramètres sont dans un index inversé (token, date_heure, id_log),
+--     tenu à jour par src/log_search.py au-delà de etat_agregats('recherche') :
+--     une recherche parcourt la clé primaire du token, déjà triée pour la
+--     pagination par clé (date_heure, id_log) du dashboard
+--
+-- L'historique présent est indexé par lots avec : python src/log_search.py indexer
+
+
+CREATE TABLE index_recherche_logs (
+    token VARCHAR(64) NOT NULL,
+    date_heure DATETIME NOT NULL,
+    id_log INT NOT NULL,
+    PRIMARY KEY (token, date_heure, id_log),
+    KEY idx_recherche_date (date_heure)
+);
+
+CREATE INDEX idx_logs_modele_date ON logs_securite (id_modele, date_heure);
+
+INSERT INTO etat_agregats (nom, dernier_id) VALUES ('recherche', 0);
@@ -0,0 +1,9 @@
+-- MIGRATION 014 : INDEX DES NOTIFICATIONS PAR INCIDENT
+--
+-- Le démon de pipeline livre lui-même l'alerte d'un incident qu'il vient de créer
+-- et marque lue la notification insérée par le trigger (migration 004) :
+-- UPDATE notifications SET lu = TRUE WHERE id_incident = ?
+-- Sans index sur id_incident, chaque incident parcourait toute la table.
+
+
+CREATE INDEX idx_notifications_incident ON notifications (id_incident);
@@ -0,0 +1,11 @@
+-- MIGRATION 015 : SUPPRESSION DE L'INDEX idx_incidents_log_regle
+--
+-- Créé par la migration 001 pour check_if_incident_exists() (recherche par
+-- (id_log, id_regle)), remplacée par record_incident() qui cherche la campagne
+-- par (id_regle, adresse_ip_source, id_serveur) (migration 008). L'index n'était
+-- plus lu que par les jointures de src/partition_maintenance.py, qui partent des
+-- incidents et atteignent les logs par la clé primaire de logs_securite ; il
+-- coûtait une mise à jour à chaque incident créé.
+
+
+DROP INDEX idx_incidents_log_regle ON incidents;
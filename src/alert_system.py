@@ -1,22 +1,19 @@
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime
+import logging
+import time
 import sys
 import os
 
 # Importer config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.config import DB_CONFIG
+from config.config import (DB_CONFIG, INCIDENT_QUIET_PERIOD, ALERT_RATE_LIMITS,
+                           ALERT_DIGEST_WINDOW, ALERT_DIGEST_EXAMPLES, INCIDENT_BULK_BATCH_SIZE)
+from structured_logging import Colors, get_logger, log_event, setup_logging
+from query_stats import instrumented
 
-
-# Codes couleurs pour le terminal
-class Colors:
-    RED = '\033[91m'      # Rouge - Critique
-    YELLOW = '\033[93m'   # Jaune - Moyen
-    GREEN = '\033[92m'    # Vert - Faible
-    BLUE = '\033[94m'     # Bleu - Info
-    RESET = '\033[0m'     # Reset couleur
-    BOLD = '\033[1m'      # Gras
+logger = get_logger("alertes")
 
 
 def connect_db():
@@ -30,9 +27,12 @@ def connect_db():
         return None
 
 
+@instrumented
 def create_incident(connection, id_log, id_regle, type_incident, description, niveau_severite):
     """
     Crée un incident dans la table incidents
+    L'alerte n'est pas affichée ici : le trigger after_incident_notification écrit une
+    notification que notification_dispatcher.py livre de façon asynchrone
     
     Args:
         connection: Connexion MySQL
@@ -70,13 +70,8 @@ def create_incident(connection, id_log, id_regle, type_incident, description, ni
         
         cursor.execute(query, values)
         connection.commit()
-        
-        incident_id = cursor.lastrowid
         cursor.close()
         
-        # Afficher l'alerte
-        display_alert(incident_id, type_incident, description, niveau_severite)
-        
         return True
         
     except Error as e:
@@ -84,9 +79,128 @@ def create_incident(connection, id_log, id_regle, type_incident, description, ni
         return False
 
 
+@instrumented
+def record_incident(connection, id_regle, ip_source, id_serveur, log_ids, type_incident,
+                    description, niveau_severite, quiet_period=INCIDENT_QUIET_PERIOD, nb_events=None):
+    """
+    Enregistre une détection au niveau de la campagne (règle, IP source, serveur)
+    Si un incident non résolu de la même campagne a eu de l'activité depuis moins de
+    quiet_period secondes, il est mis à jour sur place (nombre d'événements, plage de
+    logs, dernière activité) ; sinon un nouvel incident est créé
+    Les logs déjà comptés par un incident de la campagne, résolu compris, sont ignorés :
+    résoudre un incident pendant que ses logs sont encore dans la fenêtre des détecteurs
+    n'en recrée pas un
+    
+    Args:
+        connection: Connexion MySQL
+        id_regle: ID de la règle appliquée
+        ip_source: IP source de l'attaque
+        id_serveur: Serveur visé
+        log_ids: IDs des logs de la détection (les logs déjà comptés sont ignorés)
+        type_incident, description, niveau_severite: comme create_incident
+        quiet_period: Silence (s) au-delà duquel la campagne est close
+        nb_events: Nombre d'événements de la détection quand log_ids n'en donne que les
+            bornes (campagne multi-étapes : premier et dernier log) ; len(log_ids) sinon
+    
+    Returns:
+        (id_incident, créé) ; (None, False) si aucun nouveau log ou en cas d'erreur
+    """
+    try:
+        # Le verrou FOR UPDATE sérialise les analyseurs sur une même campagne
+        cursor = connection.cursor(dictionary=True)
+        
+        query = """
+        SELECT id_incident, dernier_log
+        FROM incidents
+        WHERE id_regle = %s
+        AND adresse_ip_source = %s
+        AND id_serveur = %s
+        AND statut != 'resolu'
+        AND derniere_activite >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+        ORDER BY derniere_activite DESC
+        LIMIT 1
+        FOR UPDATE
+        """
+        cursor.execute(query, (id_regle, ip_source, id_serveur, quiet_period))
+        incident = cursor.fetchone()
+        
+        # Dernier log compté par la campagne, tous statuts confondus (idx_incidents_campagne)
+        cursor.execute("""
+        SELECT MAX(dernier_log) AS dernier_log
+        FROM incidents
+        WHERE id_regle = %s AND adresse_ip_source = %s AND id_serveur = %s
+        """, (id_regle, ip_source, id_serveur))
+        counted = cursor.fetchone()['dernier_log'] or 0
+        new_ids = [i for i in log_ids if i > counted]
+        if not new_ids:
+            connection.commit()
+            cursor.close()
+            return None, False
+        # Détection entièrement nouvelle : tous ses événements ; chevauchement : les ids nouveaux
+        nb_new = nb_events if nb_events and len(new_ids) == len(log_ids) else len(new_ids)
+        
+        if incident:
+            query = """
+            UPDATE incidents
+            SET nb_evenements = nb_evenements + %s,
+                dernier_log = %s,
+                derniere_activite = NOW(),
+                description = %s
+            WHERE id_incident = %s
+            """
+            cursor.execute(query, (nb_new, max(new_ids), description, incident['id_incident']))
+            connection.commit()
+            cursor.close()
+            return incident['id_incident'], False
+        
+        query = """
+        INSERT INTO incidents (
+            id_log,
+            id_regle,
+            adresse_ip_source,
+            id_serveur,
+            nb_evenements,
+            premier_log,
+            dernier_log,
+            type_incident,
+            description,
+            niveau_severite,
+            statut,
+            date_detection,
+            derniere_activite
+        ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'nouveau', NOW(), NOW())
+        """
+        
+        values = (
+            max(new_ids),
+            id_regle,
+            ip_source,
+            id_serveur,
+            nb_new,
+            min(new_ids),
+            max(new_ids),
+            type_incident,
+            description,
+            niveau_severite
+        )
+        
+        cursor.execute(query, values)
+        incident_id = cursor.lastrowid
+        connection.commit()
+        cursor.close()
+        
+        return incident_id, True
+        
+    except Error as e:
+        connection.rollback()
+        print(f"✗ Erreur enregistrement incident: {e}")
+        return None, False
+
+
 def display_alert(incident_id, type_incident, description, niveau_severite):
     """
-    Affiche une alerte colorée dans le terminal
+    Émet une alerte structurée (console colorée selon la sévérité, fichier JSON lines)
+    L'écriture est faite par le thread de journalisation : l'appelant ne bloque pas
     
     Args:
         incident_id: ID de l'incident créé
@@ -94,45 +208,166 @@ def display_alert(incident_id, type_incident, description, niveau_severite):
         description: Description
         niveau_severite: Niveau de sévérité
     """
-    # Choisir la couleur selon la sévérité
     if niveau_severite == 'critique':
-        color = Colors.RED
-        icon = "🔴"
-        label = "ALERTE CRITIQUE"
+        level, icon, label = logging.ERROR, "🔴", "ALERTE CRITIQUE"
     elif niveau_severite == 'moyen':
-        color = Colors.YELLOW
-        icon = "🟠"
-        label = "ALERTE MOYENNE"
+        level, icon, label = logging.WARNING, "🟠", "ALERTE MOYENNE"
     else:
-        color = Colors.GREEN
-        icon = "🟢"
-        label = "ALERTE FAIBLE"
+        level, icon, label = logging.INFO, "🟢", "ALERTE FAIBLE"
+    
+    log_event(logger, level, f"{icon} [{label}] INCIDENT #{incident_id} - {type_incident}",
+              incident=incident_id, severite=niveau_severite, statut="nouveau",
+              description=description)
+
+
+def display_digest(digest):
+    """
+    Émet un résumé d'alertes supprimées (une ligne, quelques exemples)
+    
+    Args:
+        digest: Résumé produit par AlertSuppressor (voir _digest)
+    """
+    log_event(logger, logging.WARNING,
+              f"📦 [RÉSUMÉ] {digest['nb_supprimees']} alerte(s) {digest['niveau_severite']} "
+              f"supprimée(s) - {digest['type_incident']}",
+              severite=digest['niveau_severite'], premier_incident=digest['premier_incident'],
+              dernier_incident=digest['dernier_incident'], exemples=digest['exemples'])
+
+
+class AlertSuppressor:
+    """
+    Limitation des alertes en cas de tempête
+    
+    Un seau à jetons par (règle, sévérité) laisse passer les alertes tant qu'il
+    reste des jetons (ALERT_RATE_LIMITS). Au-delà, les alertes sont comptées dans
+    un résumé par (règle, sévérité) émis une fois par ALERT_DIGEST_WINDOW secondes.
+    Chaque alerte coûte quelques opérations sur des dicts, quel que soit le volume.
+    """
+    
+    def __init__(self, limits=None, window=ALERT_DIGEST_WINDOW, examples=ALERT_DIGEST_EXAMPLES,
+                 clock=time.monotonic):
+        self.limits = dict(ALERT_RATE_LIMITS if limits is None else limits)
+        self.window = window
+        self.examples = examples
+        self.clock = clock
+        self._buckets = {}    # (règle, sévérité) -> [jetons, dernière recharge]
+        self._digests = {}    # (règle, sévérité) -> résumé en cours
+        self.passed = 0
+        self.suppressed = 0
+    
+    def allow(self, id_regle, niveau_severite):
+        """Consomme un jeton du seau (règle, sévérité) ; False si le seau est vide"""
+        limit = self.limits.get(niveau_severite)
+        if limit is None:
+            return True
+        now = self.clock()
+        bucket = self._buckets.get((id_regle, niveau_severite))
+        if bucket is None:
+            bucket = self._buckets[(id_regle, niveau_severite)] = [limit['capacite'], now]
+        else:
+            bucket[0] = min(limit['capacite'], bucket[0] + (now - bucket[1]) * limit['recharge'])
+            bucket[1] = now
+        if bucket[0] >= 1:
+            bucket[0] -= 1
+            return True
+        return False
+    
+    def submit(self, alert):
+        """
+        Soumet une alerte (notification ou incident sous forme de dict)
+        
+        Returns:
+            True si l'alerte doit être émise, False si elle est comptée dans un résumé
+        """
+        severite = alert.get('niveau_severite') or 'faible'
+        if self.allow(alert.get('id_regle'), severite):
+            self.passed += 1
+            return True
+        
+        self.suppressed += 1
+        key = (alert.get('id_regle'), severite)
+        digest = self._digests.get(key)
+        if digest is None:
+            digest = self._digests[key] = _digest(alert, severite, self.clock())
+        digest['nb_supprimees'] += 1
+        digest['dernier_incident'] = alert.get('id_incident')
+        if len(digest['exemples']) < self.examples:
+            digest['exemples'].append(alert.get('description') or alert.get('message'))
+        return False
+    
+    def copy(self):
+        """
+        Copie de travail indépendante : décider d'un lot sur la copie, puis adopt() une fois
+        la livraison confirmée (un lot relivré ne consomme ni jetons ni résumés deux fois)
+        """
+        working = AlertSuppressor(self.limits, self.window, self.examples, self.clock)
+        working._buckets = {key: list(bucket) for key, bucket in self._buckets.items()}
+        working._digests = {key: dict(digest, exemples=list(digest['exemples']))
+                            for key, digest in self._digests.items()}
+        working.passed, working.suppressed = self.passed, self.suppressed
+        return working
+    
+    def adopt(self, working):
+        """Reprend l'état d'une copie de travail (voir copy)"""
+        self._buckets, self._digests = working._buckets, working._digests
+        self.passed, self.suppressed = working.passed, working.suppressed
+    
+    def filter(self, alerts):
+        """Alertes à émettre parmi alerts, suivies des résumés dont la fenêtre est écoulée"""
+        emitted = [alert for alert in alerts if self.submit(alert)]
+        return emitted + self.flush()
     
-    # Afficher l'alerte
-    print(f"\n{color}{Colors.BOLD}{'='*60}")
-    print(f"{icon} [{label}] INCIDENT #{incident_id}")
-    print(f"{'='*60}{Colors.RESET}")
-    print(f"{color}Type: {type_incident}")
-    print(f"Sévérité: {niveau_severite.upper()}")
-    print(f"Description: {description}")
-    print(f"Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-    print(f"Statut: NOUVEAU{Colors.RESET}")
-    print(f"{color}{'='*60}{Colors.RESET}\n")
+    def flush(self, force=False):
+        """Résumés dont la fenêtre est écoulée (tous si force)"""
+        now = self.clock()
+        due = [key for key, digest in self._digests.items()
+               if force or now - digest['ouvert'] >= self.window]
+        digests = [self._digests.pop(key) for key in due]
+        for digest in digests:
+            digest['message'] = (f"{digest['nb_supprimees']} alerte(s) {digest['niveau_severite']} "
+                                 f"supprimée(s) : {digest['type_incident']}")
+        return digests
+    
+    def stats(self):
+        """Alertes émises / supprimées depuis le démarrage"""
+        return {"emises": self.passed, "supprimees": self.suppressed,
+                "resumes_en_cours": len(self._digests)}
+
 
+def _digest(alert, severite, now):
+    """Résumé vide, au format d'une notification (livrable par toutes les sorties)"""
+    return {
+        'id_notification': None,
+        'id_incident': None,
+        'id_regle': alert.get('id_regle'),
+        'type_notification': 'RESUME_ALERTES',
+        'niveau_severite': severite,
+        'type_incident': alert.get('type_incident') or alert.get('type_notification'),
+        'message': None,
+        'description': None,
+        'date_notification': datetime.now(),
+        'nb_supprimees': 0,
+        'premier_incident': alert.get('id_incident'),
+        'dernier_incident': alert.get('id_incident'),
+        'exemples': [],
+        'ouvert': now
+    }
 
+
+@instrumented
 def get_incidents_stats(connection):
     """Affiche les statistiques des incidents"""
     try:
         cursor = connection.cursor(dictionary=True)
         
-        # Stats globales
+        # Stats globales : compteurs maintenus par trigger (migration 009), lecture en O(1)
         query = """
         SELECT 
             niveau_severite,
             statut,
-            COUNT(*) as nombre
-        FROM incidents
-        GROUP BY niveau_severite, statut
+            nombre
+        FROM compteurs_incidents
+        WHERE nombre > 0
         ORDER BY 
             FIELD(niveau_severite, 'critique', 'moyen', 'faible'),
             FIELD(statut, 'nouveau', 'en_cours', 'resolu')
@@ -162,6 +397,33 @@ def get_incidents_stats(connection):
         print(f"✗ Erreur récupération stats: {e}")
 
 
+@instrumented
+def reconcile_incident_counters(connection):
+    """
+    Recalcule compteurs_incidents depuis incidents et corrige les écarts
+    (procédure reconcilier_compteurs_incidents, à lancer périodiquement)
+    
+    Returns:
+        Liste des écarts corrigés [{niveau_severite, statut, compteur, reel}], None en cas d'erreur
+    """
+    try:
+        cursor = connection.cursor(dictionary=True)
+        cursor.callproc('reconcilier_compteurs_incidents')
+        drift = [row for result in cursor.stored_results() for row in result.fetchall()]
+        cursor.close()
+        
+        for row in drift:
+            log_event(logger, logging.WARNING, "Compteur d'incidents corrigé",
+                      severite=row['niveau_severite'], statut=row['statut'],
+                      compteur=row['compteur'], reel=row['reel'])
+        return drift
+        
+    except Error as e:
+        print(f"✗ Erreur réconciliation compteurs: {e}")
+        return None
+
+
+@instrumented
 def get_recent_incidents(connection, limit=10):
     """Affiche les incidents récents"""
     try:
@@ -212,6 +474,7 @@ def get_recent_incidents(connection, limit=10):
         print(f"✗ Erreur récupération incidents: {e}")
 
 
+@instrumented
 def update_incident_status(connection, incident_id, new_status, resolu_par=None, notes=None):
     """
     Met à jour le statut d'un incident
@@ -255,8 +518,99 @@ def update_incident_status(connection, incident_id, new_status, resolu_par=None,
         return False
 
 
+# Filtres acceptés par bulk_update_incidents : nom -> condition SQL
+BULK_FILTERS = {
+    'id_regle': "id_regle = %s",
+    'adresse_ip_source': "adresse_ip_source = %s",
+    'id_serveur': "id_serveur = %s",
+    'niveau_severite': "niveau_severite = %s",
+    'statut': "statut = %s",
+    'debut': "date_detection >= %s",
+    'fin': "date_detection < %s",
+}
+
+
+@instrumented
+def bulk_update_incidents(connection, new_status, ids=None, filtres=None, resolu_par=None,
+                          notes=None, batch_size=INCIDENT_BULK_BATCH_SIZE):
+    """
+    Met à jour le statut de nombreux incidents, par lots de batch_size (une transaction par lot)
+    Le trigger before_incident_update s'applique à chaque ligne (date_resolution)
+    
+    Args:
+        connection: Connexion MySQL
+        new_status: 'nouveau', 'en_cours', ou 'resolu'
+        ids: Liste d'IDs d'incidents (prioritaire sur filtres)
+        filtres: Dict de critères (voir BULK_FILTERS), ex: {'id_regle': 1, 'debut': datetime(...)}
+        resolu_par: Nom de la personne (si résolu)
+        notes: Notes sur la résolution
+        batch_size: Incidents par transaction
+    
+    Returns:
+        {'modifies': int, 'lots': int} ; les incidents déjà au statut demandé sont ignorés
+    """
+    filtres = filtres or {}
+    unknown = set(filtres) - set(BULK_FILTERS)
+    if unknown:
+        raise ValueError(f"Filtre(s) inconnu(s): {', '.join(sorted(unknown))}")
+    if ids is None and not filtres:
+        raise ValueError("Indiquer des IDs ou au moins un filtre")
+    
+    if new_status == 'resolu':
+        update = "SET statut = %s, resolu_par = %s, notes = %s"
+        update_params = [new_status, resolu_par, notes]
+    else:
+        update = "SET statut = %s"
+        update_params = [new_status]
+    
+    conditions = [BULK_FILTERS[name] for name in filtres]
+    params = list(filtres.values())
+    pending_ids = sorted(set(ids)) if ids is not None else None
+    
+    result = {'modifies': 0, 'lots': 0}
+    last_id = 0
+    cursor = connection.cursor()
+    try:
+        while True:
+            # Lot suivant : IDs fournis ou parcours du filtre par id_incident croissant
+            if pending_ids is not None:
+                batch = pending_ids[:batch_size]
+                pending_ids = pending_ids[batch_size:]
+            else:
+                where = " AND ".join(conditions + ["id_incident > %s", "statut != %s"])
+                cursor.execute(
+                    f"SELECT id_incident FROM incidents WHERE {where} ORDER BY id_incident LIMIT %s",
+                    params + [last_id, new_status, batch_size]
+                )
+                batch = [row[0] for row in cursor.fetchall()]
+            if not batch:
+                break
+            
+            placeholders = ", ".join(["%s"] * len(batch))
+            cursor.execute(
+                f"UPDATE incidents {update} WHERE id_incident IN ({placeholders}) AND statut != %s",
+                update_params + batch + [new_status]
+            )
+            connection.commit()
+            result['modifies'] += cursor.rowcount
+            result['lots'] += 1
+            last_id = batch[-1]
+        
+        log_event(logger, logging.INFO, f"✓ {result['modifies']} incident(s) passé(s) en {new_status}",
+                  lots=result['lots'], filtres=filtres or None, resolu_par=resolu_par)
+        return result
+        
+    except Error as e:
+        connection.rollback()
+        print(f"✗ Erreur mise à jour en masse ({result['modifies']} incident(s) déjà modifié(s)): {e}")
+        return result
+    finally:
+        cursor.close()
+
+
 def main():
     """Fonction principale - Interface de gestion des alertes"""
+    setup_logging()
     print("=" * 60)
     print("   CLOUDSECMONITOR - SYSTÈME D'ALERTES")
     print("=" * 60)
@@ -273,9 +627,10 @@ def main():
             print("2. Voir incidents récents")
             print("3. Créer un incident test")
             print("4. Mettre à jour statut d'un incident")
-            print("5. Quitter")
+            print("5. Triage en masse (IDs ou filtre)")
+            print("6. Quitter")
             
-            choice = input("\nVotre choix (1-5): ").strip()
+            choice = input("\nVotre choix (1-6): ").strip()
             
             if choice == "1":
                 get_incidents_stats(connection)
@@ -291,7 +646,8 @@ def main():
                 desc = input("Description: ").strip() or "Incident de test"
                 sev = input("Sévérité (faible/moyen/critique): ").strip() or "moyen"
                 
-                create_incident(connection, 1, 1, type_inc, desc, sev)
+                if create_incident(connection, 1, 1, type_inc, desc, sev):
+                    print("✓ Incident test créé - alerte livrée par notification_dispatcher.py")
             
             elif choice == "4":
                 inc_id = input("ID de l'incident: ").strip()
@@ -309,6 +665,34 @@ def main():
                     print("✗ ID invalide")
             
             elif choice == "5":
+                print("\n🧹 TRIAGE EN MASSE (laisser vide pour ignorer un critère)")
+                ids = input("IDs séparés par des virgules: ").strip()
+                filtres = {}
+                if not ids:
+                    for name, label in (('id_regle', "ID de règle"), ('adresse_ip_source', "IP source"),
+                                        ('id_serveur', "ID serveur"), ('niveau_severite', "Sévérité"),
+                                        ('statut', "Statut actuel"), ('debut', "Détecté depuis (AAAA-MM-JJ)"),
+                                        ('fin', "Détecté avant (AAAA-MM-JJ)")):
+                        value = input(f"{label}: ").strip()
+                        if value:
+                            filtres[name] = value
+                status_choice = input("Nouveau statut: 1=en_cours, 2=resolu: ").strip()
+                new_status = 'resolu' if status_choice == "2" else 'en_cours'
+                resolu_par = notes = None
+                if new_status == 'resolu':
+                    resolu_par = input("Résolu par: ").strip() or "Admin"
+                    notes = input("Notes: ").strip() or "Résolution en masse"
+                try:
+                    result = bulk_update_incidents(
+                        connection, new_status,
+                        ids=[int(i) for i in ids.split(",") if i.strip().isdigit()] if ids else None,
+                        filtres=filtres, resolu_par=resolu_par, notes=notes
+                    )
+                    print(f"✓ {result['modifies']} incident(s) mis à jour en {result['lots']} lot(s)")
+                except ValueError as e:
+                    print(f"✗ {e}")
+            
+            elif choice == "6":
                 print("\n👋 Au revoir!")
                 break
             
@@ -0,0 +1,288 @@
+"""
+CloudSecMonitor - Corrélation multi-étapes des événements par IP source
+
+Chaque séquence de CORRELATION_SEQUENCES (ex: scan_port → échecs SSH → accès à
+/etc/shadow) est suivie par un automate par IP source. L'état d'une IP tient
+dans un seul entier :
+    début de séquence (s) | premier id_log | étape courante | compteur de l'étape
+
+Les états sont rangés dans un dict par séquence, dans l'ordre de dernière
+progression : au-delà de CORRELATION_MAX_SOURCES, l'IP la moins récemment
+active est évincée (LRU), et une séquence qui dépasse sa fenêtre est
+abandonnée. La mémoire reste donc bornée quel que soit le nombre de sources.
+L'expiration périodique (expire) est au mieux : elle ne parcourt que la tête du
+dict, une séquence hors fenêtre plus loin attend son prochain événement ou l'éviction.
+
+Usage:
+    python src/correlation.py benchmark     # 2M IP sources aléatoires
+"""
+
+from datetime import datetime
+import argparse
+import random
+import socket
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import CORRELATION_SEQUENCES, CORRELATION_MAX_SOURCES, CORRELATION_OVERLAP_IDS
+from log_codec import get_codec
+
+# Largeur des champs de l'état compacté
+ID_BITS = 40
+STAGE_BITS = 8
+COUNT_BITS = 8
+MAX_COUNT = (1 << COUNT_BITS) - 1
+
+
+def pack_state(start_ts, first_log, stage, count):
+    return (((start_ts << ID_BITS | first_log) << STAGE_BITS | stage) << COUNT_BITS) | count
+
+
+def unpack_state(state):
+    count = state & MAX_COUNT
+    state >>= COUNT_BITS
+    stage = state & ((1 << STAGE_BITS) - 1)
+    state >>= STAGE_BITS
+    return state >> ID_BITS, state & ((1 << ID_BITS) - 1), stage, count
+
+
+def ip_key(ip):
+    """Clé compacte d'une IP : entier pour l'IPv4, chaîne sinon"""
+    try:
+        return int.from_bytes(socket.inet_aton(ip), "big")
+    except (OSError, TypeError):
+        return ip
+
+
+def step_matches(step, event):
+    """Vrai si l'événement (log décodé) satisfait l'étape"""
+    if event['type_log'] != step['type_log']:
+        return False
+    if 'statut' in step and event['statut'] != step['statut']:
+        return False
+    if 'description_contient' in step and step['description_contient'] not in (event.get('description') or ''):
+        return False
+    return True
+
+
+class CorrelationEngine:
+    """Automates par IP source pour toutes les séquences configurées"""
+
+    def __init__(self, sequences=None, max_sources=CORRELATION_MAX_SOURCES, id_key='id_log'):
+        self.sequences = list(CORRELATION_SEQUENCES if sequences is None else sequences)
+        for sequence in self.sequences:
+            if any(step.get('min', 1) > MAX_COUNT for step in sequence['etapes']):
+                raise ValueError(f"{sequence['nom']}: 'min' limité à {MAX_COUNT}")
+        self.max_sources = max_sources
+        self.id_key = id_key    # Clé de l'identifiant croissant des événements (premier/dernier log)
+        self._states = [{} for _ in self.sequences]
+        self.evicted = 0
+        self.expired = 0
+        self.completed = 0
+
+    @property
+    def max_window(self):
+        return max((s['fenetre'] for s in self.sequences), default=0)
+
+    def process(self, event):
+        """
+        Fait avancer les automates de l'IP de l'événement
+
+        Returns:
+            Liste des campagnes complétées par cet événement
+        """
+        key = ip_key(event['adresse_ip_source'])
+        ts = int(event['date_heure'].timestamp())
+        campaigns = []
+        for sequence, states in zip(self.sequences, self._states):
+            campaign = self._advance(sequence, states, key, ts, event)
+            if campaign:
+                campaigns.append(campaign)
+        return campaigns
+
+    def _advance(self, sequence, states, key, ts, event):
+        steps = sequence['etapes']
+        state = states.get(key)
+        if state is not None:
+            start_ts, first_log, stage, count = unpack_state(state)
+            if ts - start_ts > sequence['fenetre']:
+                del states[key]
+                self.expired += 1
+                state = None
+
+        if state is None:
+            if not step_matches(steps[0], event):
+                return None
+            start_ts, first_log, stage, count = ts, event[self.id_key], 0, 0
+        elif not step_matches(steps[stage], event):
+            return None
+        else:
+            del states[key]    # Réinsérée en fin : ordre de dernière progression
+
+        count += 1
+        if count >= steps[stage].get('min', 1):
+            stage, count = stage + 1, 0
+
+        if stage == len(steps):
+            self.completed += 1
+            # Un événement ne compte que pour l'étape courante, qui avance à son 'min' :
+            # la campagne couvre exactement la somme des 'min' (ids intermédiaires non gardés)
+            return {
+                'nom': sequence['nom'],
+                'id_regle': sequence['id_regle'],
+                'severite': sequence['severite'],
+                'ip_source': event['adresse_ip_source'],
+                'id_serveur': event['id_serveur'],
+                'premier_log': first_log,
+                'dernier_log': event[self.id_key],
+                'nb_etapes': len(steps),
+                'nb_evenements': sum(step.get('min', 1) for step in steps),
+                'periode': f"{datetime.fromtimestamp(start_ts)} → {event['date_heure']}"
+            }
+
+        states[key] = pack_state(start_ts, first_log, stage, count)
+        if len(states) > self.max_sources:
+            del states[next(iter(states))]
+            self.evicted += 1
+        return None
+
+    def expire(self, now=None):
+        """
+        Abandonne les séquences hors fenêtre en tête de dict (les moins actives), au mieux
+        Le dict est rangé par dernière progression, la fenêtre porte sur le début de séquence :
+        un état encore valide en tête peut précéder des états expirés (séquence commencée plus
+        tôt, mais progressée depuis). Le parcours s'arrête pourtant au premier état valide pour
+        rester en O(états expirés) ; les autres sont abandonnés à leur prochain événement
+        (_advance) ou évincés au-delà de max_sources, jamais complétés hors fenêtre
+
+        Returns:
+            Nombre d'états supprimés
+        """
+        now_ts = int((now or datetime.now()).timestamp())
+        removed = 0
+        for sequence, states in zip(self.sequences, self._states):
+            expired_keys = []
+            for key, state in states.items():
+                if now_ts - unpack_state(state)[0] <= sequence['fenetre']:
+                    break
+                expired_keys.append(key)
+            for key in expired_keys:
+                del states[key]
+            removed += len(expired_keys)
+        self.expired += removed
+        return removed
+
+    def stats(self):
+        """Nombre d'IP suivies et mémoire occupée par séquence (parcours complet)"""
+        sequences = {}
+        for sequence, states in zip(self.sequences, self._states):
+            size = sys.getsizeof(states) + sum(sys.getsizeof(k) + sys.getsizeof(v)
+                                               for k, v in states.items())
+            sequences[sequence['nom']] = {"sources": len(states), "octets": size}
+        return {"sequences": sequences, "completees": self.completed,
+                "expirees": self.expired, "evincees": self.evicted}
+
+
+def fetch_new_events(connection, last_id, window_seconds, batch_size=5000, seen=frozenset()):
+    """
+    Logs décodés insérés après last_id, par lots croissants d'id_log
+    Au premier appel (last_id None), reprend les logs de la dernière fenêtre
+    Un id_log est attribué à l'insertion mais visible au commit : un log commité après un
+    id plus grand (collecteur et pipeline en parallèle) apparaît sous last_id. Les
+    CORRELATION_OVERLAP_IDS ids sous last_id sont relus et ceux absents de seen rendus
+
+    Args:
+        seen: Ids déjà traités dans ]last_id - CORRELATION_OVERLAP_IDS, last_id]
+    """
+    codec = get_codec(connection)
+    cursor = connection.cursor(dictionary=True)
+    columns = """
+        SELECT id_log, id_serveur, adresse_ip_source, id_type_log, id_statut,
+               id_modele, description_param, date_heure
+        FROM logs_securite
+    """
+    if last_id is None:
+        cursor.execute(columns + """
+        WHERE date_heure >= DATE_SUB(NOW(), INTERVAL %s SECOND)
+        ORDER BY id_log LIMIT %s
+        """, (window_seconds, batch_size))
+    else:
+        cursor.execute(columns + "WHERE id_log > %s ORDER BY id_log LIMIT %s",
+                       (last_id - CORRELATION_OVERLAP_IDS, batch_size))
+
+    while True:
+        rows = cursor.fetchall()
+        if not rows:
+            break
+        for row in rows:
+            if last_id is not None and row['id_log'] <= last_id and row['id_log'] in seen:
+                continue
+            yield codec.decode_row(connection, row)
+        if len(rows) < batch_size:
+            break
+        cursor.execute(columns + "WHERE id_log > %s ORDER BY id_log LIMIT %s",
+                       (rows[-1]['id_log'], batch_size))
+    cursor.close()
+
+
+def correlate_new_logs(connection, engine, last_id=None, seen=frozenset()):
+    """
+    Passe les nouveaux logs dans le moteur (y compris ceux commités en retard sous last_id)
+
+    Returns:
+        (campagnes complétées, dernier id_log traité,
+        ids traités dans ]last_id - CORRELATION_OVERLAP_IDS, last_id], seen du passage suivant)
+    """
+    campaigns = []
+    processed = set(seen)
+    for event in fetch_new_events(connection, last_id, engine.max_window, seen=seen):
+        campaigns.extend(engine.process(event))
+        processed.add(event['id_log'])
+        last_id = max(last_id or 0, event['id_log'])
+    engine.expire()
+    if last_id is None:
+        return campaigns, None, set()
+    return campaigns, last_id, {i for i in processed if i > last_id - CORRELATION_OVERLAP_IDS}
+
+
+def benchmark(nb_sources=2_000_000, nb_events=3_000_000, max_sources=CORRELATION_MAX_SOURCES):
+    """Mesure débit et mémoire avec des IP sources aléatoires (toutes en cours de séquence)"""
+    rng = random.Random(42)
+    engine = CorrelationEngine(max_sources=max_sources)
+    now = datetime.now()
+    events = [{'adresse_ip_source': socket.inet_ntoa(rng.getrandbits(32).to_bytes(4, "big")),
+               'type_log': 'scan_port', 'statut': 'detecte', 'id_serveur': 1,
+               'id_log': i, 'date_heure': now} for i in range(min(nb_sources, nb_events))]
+    events += [dict(rng.choice(events), type_log='SSH', statut='echec', id_log=i)
+               for i in range(len(events), nb_events)]
+
+    start = time.perf_counter()
+    for event in events:
+        engine.process(event)
+    elapsed = time.perf_counter() - start
+
+    stats = engine.stats()
+    for name, sequence in stats["sequences"].items():
+        print(f"{name}: {sequence['sources']:,} IP suivies, "
+              f"{sequence['octets'] / 1024 / 1024:.0f} Mo "
+              f"({sequence['octets'] / max(sequence['sources'], 1):.0f} octets/IP)")
+    print(f"Traitement: {elapsed / nb_events * 1e6:.2f} µs/événement, "
+          f"{stats['evincees']:,} IP évincées")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Corrélation multi-étapes CloudSecMonitor")
+    parser.add_argument("commande", choices=["benchmark"])
+    parser.add_argument("--sources", type=int, default=2_000_000)
+    parser.add_argument("--max-sources", type=int, default=CORRELATION_MAX_SOURCES)
+    args = parser.parse_args()
+
+    benchmark(args.sources, int(args.sources * 1.5), args.max_sources)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+CloudSecMonitor - Dashboard : page Accueil (vue d'ensemble)
+Importée seulement quand la page est affichée (voir PAGES dans dashboard.py)
+"""
+
+import streamlit as st
+import plotly.express as px
+
+from dashboard_data import (get_global_stats, get_logs_by_type, get_top_suspect_ips,
+                            get_incidents_page, geo_short)
+from dashboard_charts import PLOT_LAYOUT
+
+
+def render():
+    """Rendu de la page Accueil"""
+    st.markdown('<p class="main-title">Cloud<span>Sec</span>Monitor</p>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle">Surveillance et audit de sécurité — infrastructure cloud simulée</p>', unsafe_allow_html=True)
+
+    stats = get_global_stats()
+
+    if stats:
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Logs collectés", f"{stats['total_logs']:,}", "Total événements")
+        with col2:
+            st.metric("Alertes critiques", stats['incidents_critiques'],
+                     "Action requise" if stats['incidents_critiques'] > 0 else "Système nominal",
+                     delta_color="inverse")
+        with col3:
+            st.metric("IP suspectes", stats['ips_suspectes'], "Sources malveillantes")
+        with col4:
+            st.metric("Incidents totaux", stats['total_incidents'], "Historique")
+
+        st.markdown("""
+        <div class="status-band">
+            <div class="status-dot"></div>
+            <div class="status-text"><strong>Surveillance active</strong> — Analyse comportementale en cours · Détection d'anomalies en temps réel</div>
+        </div>
+        """, unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown('<div class="section-label">Répartition des événements</div>', unsafe_allow_html=True)
+            logs_by_type = get_logs_by_type()
+            if logs_by_type is not None and not logs_by_type.empty:
+                fig = px.bar(
+                    logs_by_type, x='type_log', y='count',
+                    labels={'type_log': '', 'count': ''},
+                )
+                fig.update_traces(
+                    marker_color='rgba(59,130,246,0.7)',
+                    marker_line_color='rgba(59,130,246,0.0)',
+                    marker_line_width=0,
+                )
+                fig.update_layout(height=320, showlegend=False, **PLOT_LAYOUT)
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        with col2:
+            st.markdown('<div class="section-label">Top menaces — IP sources</div>', unsafe_allow_html=True)
+            top_ips = get_top_suspect_ips()
+            if top_ips is not None and not top_ips.empty:
+                top_ips['adresse_ip_source'] = top_ips['adresse_ip_source'].map(geo_short)
+                fig = px.bar(
+                    top_ips, x='tentatives', y='adresse_ip_source', orientation='h',
+                    labels={'adresse_ip_source': '', 'tentatives': ''},
+                )
+                fig.update_traces(
+                    marker_color='rgba(239,68,68,0.65)',
+                    marker_line_width=0,
+                )
+                fig.update_layout(height=320, showlegend=False, **PLOT_LAYOUT)
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<div class="section-label">Incidents critiques récents</div>', unsafe_allow_html=True)
+
+        critical, _ = get_incidents_page('critique', None, None, 5)
+        if critical is not None and not critical.empty:
+            for _, row in critical.iterrows():
+                desc = str(row['description'])[:80] + '...' if len(str(row['description'])) > 80 else str(row['description'])
+                date_str = str(row['date_detection'])[:16]
+                st.markdown(f"""
+                <div class="incident-row">
+                    <div class="incident-accent accent-critical"></div>
+                    <div class="incident-body">
+                        <div class="incident-desc">{desc}</div>
+                        <div class="incident-meta">
+                            <span>{date_str}</span>
+                            <span>{row['nom_serveur']}</span>
+                            <span>{geo_short(row['adresse_ip_source'])}</span>
+                            <span class="badge badge-critical">critique</span>
+                        </div>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
@@ -0,0 +1,57 @@
+"""
+CloudSecMonitor - Dashboard : thème et figures Plotly partagés par les pages
+"""
+
+import plotly.graph_objects as go
+
+# ========================================
+# PLOTLY THEME
+# ========================================
+
+PLOT_LAYOUT = dict(
+    paper_bgcolor='rgba(0,0,0,0)',
+    plot_bgcolor='rgba(0,0,0,0)',
+    font=dict(family='DM Mono, monospace', color='rgba(255,255,255,0.4)', size=10),
+    margin=dict(l=0, r=0, t=24, b=0),
+    xaxis=dict(
+        gridcolor='rgba(255,255,255,0.04)',
+        linecolor='rgba(255,255,255,0.06)',
+        tickfont=dict(size=9)
+    ),
+    yaxis=dict(
+        gridcolor='rgba(255,255,255,0.04)',
+        linecolor='rgba(255,255,255,0.06)',
+        tickfont=dict(size=9)
+    )
+)
+
+def series_figure(data, colors, height=300):
+    """Aires empilées à partir des tableaux compacts de fill_series"""
+    fig = go.Figure()
+    for label, values in sorted(data['series'].items()):
+        color = colors.get(label, 'rgba(59,130,246,0.7)')
+        fig.add_trace(go.Scatter(
+            x=data['x'], y=values, name=label, mode='lines', stackgroup='total',
+            line=dict(width=1.2, color=color)
+        ))
+    fig.update_layout(
+        height=height,
+        legend=dict(font=dict(size=10, color='rgba(255,255,255,0.35)', family='DM Mono')),
+        **PLOT_LAYOUT
+    )
+    return fig
+
+def heatmap_figure(df, height=300):
+    """Carte de chaleur d'une tranche du cube (DataFrame libellé lignes × colonnes)"""
+    fig = go.Figure(go.Heatmap(
+        z=df.values, x=list(df.columns), y=list(df.index),
+        colorscale=[[0, 'rgba(59,130,246,0.03)'], [1, 'rgba(239,68,68,0.85)']],
+        showscale=False, hovertemplate='%{y} · %{x}: %{z}<extra></extra>'
+    ))
+    fig.update_layout(height=height, **PLOT_LAYOUT)
+    return fig
+
+STATUS_COLORS = {'succes': 'rgba(16,185,129,0.7)', 'echec': 'rgba(239,68,68,0.7)',
+                 'detecte': 'rgba(245,158,11,0.7)'}
+SEVERITY_COLORS = {'critique': 'rgba(239,68,68,0.75)', 'moyen': 'rgba(245,158,11,0.75)',
+                   'faible': 'rgba(16,185,129,0.7)'}
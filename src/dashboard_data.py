@@ -0,0 +1,784 @@
+"""
+CloudSecMonitor - Dashboard : accès aux données
+Pool de connexions, cache par version des données, requêtes et export des pages
+(aucune dépendance graphique : importé par toutes les pages)
+"""
+
+import streamlit as st
+import mysql.connector
+import pandas as pd
+from datetime import datetime, timedelta
+from contextlib import contextmanager
+import functools
+import threading
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (DB_CONFIG, DASHBOARD_CACHE_TTL, DASHBOARD_VERSION_TTL, EXPORT_DIR,
+                           EXPORT_DOWNLOAD_MAX_MB, DASHBOARD_LIVE_MAX_ROWS, DASHBOARD_LIVE_MAX_INCIDENTS,
+                           DASHBOARD_LIVE_OVERLAP_IDS,
+                           DASHBOARD_SERIES_MAX_POINTS, ROLLUP_MINUTE_RETENTION_DAYS)
+from log_archive import query_logs_range
+from db_pool import ConnectionPool, PoolTimeout
+import log_export
+from log_codec import LogCodec, render_description
+from geoip import GeoIP
+from activity_cube import ActivityCube, TIME_AXES
+from query_stats import get_recorder, instrument
+from db_migrations import explain_query
+import log_search
+
+# ========================================
+# FONCTIONS DE CONNEXION BASE DE DONNÉES
+# ========================================
+
+@st.cache_resource
+def get_pool():
+    """Pool de connexions partagé par toutes les sessions (borné, thread-safe)"""
+    return ConnectionPool(DB_CONFIG)
+
+class DatabaseUnavailable(Exception):
+    """Pas de connexion (pool saturé ou MySQL injoignable) : jamais mis en cache"""
+
+@contextmanager
+def get_connection():
+    """
+    Connexion empruntée au pool pour la durée du bloc with
+    Chaque requête a sa propre connexion : les sessions simultanées ne se bloquent pas
+    Ses requêtes sont chronométrées (query_stats, page Performance)
+
+    Raises:
+        DatabaseUnavailable: aucune connexion obtenue ; levée plutôt qu'un résultat None
+        que st.cache_data garderait DASHBOARD_CACHE_TTL secondes
+    """
+    pool = get_pool()
+    try:
+        conn = pool.acquire()
+    except (mysql.connector.Error, PoolTimeout) as err:
+        raise DatabaseUnavailable(str(err)) from err
+    broken = False
+    try:
+        yield instrument(conn)
+    except BaseException:
+        # pd.read_sql relance les erreurs du pilote en pandas.errors.DatabaseError :
+        # toute exception du bloc ferme la connexion plutôt que de la rendre au pool
+        broken = True
+        raise
+    finally:
+        pool.release(conn, broken)
+
+@st.cache_resource
+def get_log_codec():
+    """
+    Décodeurs des colonnes encodées de logs_securite (partagés entre sessions)
+    Base indisponible : DatabaseUnavailable, que st.cache_resource ne garde pas
+    """
+    with get_connection() as conn:
+        return LogCodec(conn)
+
+@st.cache_resource
+def get_geoip_db():
+    """Base GeoIP/ASN mappée en mémoire, cache LRU partagé entre sessions"""
+    return GeoIP()
+
+def geo_short(ip):
+    """IP suivie du pays et de l'ASN (enrichissement à l'affichage)"""
+    info = get_geoip_db().lookup(ip)
+    return f"{ip} ({info.pays} · AS{info.asn})" if info else ip
+
+def decode_logs(df, conn, codec):
+    """Remplace les codes (id_type_log, id_statut, ...) par leurs libellés"""
+    df['type_log'] = codec.labels(conn, 'type_log', df.pop('id_type_log').tolist())
+    df['statut'] = codec.labels(conn, 'statut', df.pop('id_statut').tolist())
+    df['utilisateur'] = codec.labels(conn, 'utilisateur', df.pop('id_utilisateur').tolist())
+    templates = codec.labels(conn, 'description', df.pop('id_modele').tolist())
+    df['description'] = [render_description(t, p) for t, p in zip(templates, df.pop('description_param'))]
+    return df
+
+# ========================================
+# CACHE DES DONNÉES (CLÉ = VERSION DES DONNÉES)
+# ========================================
+
+@st.cache_data(ttl=DASHBOARD_VERSION_TTL, show_spinner=False)
+def get_data_version():
+    """
+    Version bon marché des données, partagée par toutes les sessions :
+    logs = MAX(id_log) ; incidents = MAX(id_incident) + compteurs sévérité × statut
+    (un changement de statut déplace un compteur)
+    """
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT MAX(id_log) FROM logs_securite")
+        logs_version = cursor.fetchone()[0]
+        cursor.execute("SELECT MAX(id_incident) FROM incidents")
+        incidents_version = [cursor.fetchone()[0]]
+        cursor.execute("SELECT nombre FROM compteurs_incidents ORDER BY niveau_severite, statut")
+        incidents_version += [row[0] for row in cursor.fetchall()]
+        cursor.close()
+        return {'logs': logs_version, 'incidents': tuple(incidents_version)}
+
+# Marqueur posé par le corps d'une fonction en cache : il ne s'exécute qu'en cas d'échec (miss)
+_cache_probe = threading.local()
+
+def record_timing(name, seconds, hit):
+    """Appels, succès/échecs de cache et durées par fonction, pour la session courante"""
+    timings = st.session_state.setdefault('cache_stats', {})
+    entry = timings.setdefault(name, {'appels': 0, 'succes': 0, 'echecs': 0, 'dernier_ms': 0.0, 'total_ms': 0.0})
+    entry['appels'] += 1
+    entry['succes' if hit else 'echecs'] += 1
+    entry['dernier_ms'] = seconds * 1000
+    entry['total_ms'] += seconds * 1000
+    get_recorder().record_cache(f"{__name__}.{name}", seconds, hit)
+
+@st.cache_data(ttl=DASHBOARD_CACHE_TTL, show_spinner=False, max_entries=256)
+def _cached_call(name, version, args):
+    _cache_probe.miss = True
+    return _CACHED_FUNCTIONS[name](*args)
+
+_CACHED_FUNCTIONS = {}
+
+def versioned_cache(*kinds, fallback=None):
+    """
+    Met en cache (st.cache_data, DASHBOARD_CACHE_TTL) le résultat d'une fonction de données
+    La clé inclut la version des données (kinds: 'logs', 'incidents') : la requête n'est
+    rejouée que si les données ont changé ou si le TTL est écoulé
+    Base indisponible : erreur affichée et fallback renvoyé hors du cache (réessai au rendu suivant)
+    """
+    def decorator(func):
+        _CACHED_FUNCTIONS[func.__name__] = func
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            # Marqueur de l'appel englobant (fonction en cache qui en appelle une autre) : restauré après
+            outer_miss = getattr(_cache_probe, 'miss', False)
+            _cache_probe.miss = False
+            start = time.perf_counter()
+            try:
+                version = get_data_version()
+                result = _cached_call(func.__name__, tuple(version[k] for k in kinds), args)
+                hit = not _cache_probe.miss
+            except DatabaseUnavailable as err:
+                st.error(f"Erreur de connexion MySQL: {err}")
+                return fallback
+            finally:
+                _cache_probe.miss = outer_miss
+            record_timing(func.__name__, time.perf_counter() - start, hit)
+            return result
+        return wrapper
+    return decorator
+
+# ========================================
+# REQUÊTES DU DASHBOARD
+# ========================================
+
+@versioned_cache('logs', 'incidents')
+def get_global_stats():
+    # Résolus avant d'emprunter la connexion : une seule connexion du pool par appel
+    codec = get_log_codec()
+    with get_connection() as conn:
+        cursor = conn.cursor(dictionary=True)
+        stats = {}
+        cursor.execute("SELECT COUNT(*) as total FROM logs_securite")
+        stats['total_logs'] = cursor.fetchone()['total']
+        # Compteurs maintenus par trigger (migration 009) : 9 lignes au lieu d'un COUNT(*) sur incidents
+        cursor.execute("SELECT niveau_severite, statut, nombre FROM compteurs_incidents")
+        counters = cursor.fetchall()
+        stats['incidents_critiques'] = sum(c['nombre'] for c in counters
+                                           if c['niveau_severite'] == 'critique' and c['statut'] == 'nouveau')
+        stats['total_incidents'] = sum(c['nombre'] for c in counters)
+        cursor.execute("SELECT COUNT(DISTINCT adresse_ip_source) as total FROM logs_securite WHERE id_statut = %s",
+                       (codec.code(conn, 'statut', 'echec'),))
+        stats['ips_suspectes'] = cursor.fetchone()['total']
+        cursor.close()
+        return stats
+
+@versioned_cache('logs')
+def get_logs_by_type():
+    codec = get_log_codec()
+    with get_connection() as conn:
+        query = "SELECT id_type_log, COUNT(*) as count FROM logs_securite GROUP BY id_type_log ORDER BY count DESC"
+        df = pd.read_sql(query, conn)
+        df.insert(0, 'type_log', codec.labels(conn, 'type_log', df.pop('id_type_log').tolist()))
+        return df
+
+@versioned_cache('logs')
+def get_recent_logs(limit=50):
+    codec = get_log_codec()
+    with get_connection() as conn:
+        query = """
+            SELECT l.date_heure, s.nom_serveur, l.id_type_log,
+                   l.adresse_ip_source, l.id_utilisateur, l.id_statut, l.id_modele, l.description_param
+            FROM logs_securite l
+            JOIN serveurs s ON l.id_serveur = s.id_serveur
+            ORDER BY l.date_heure DESC, l.id_log DESC LIMIT %(limit)s
+        """
+        df = decode_logs(pd.read_sql(query, conn, params={'limit': int(limit)}), conn, codec)
+        return df[['date_heure', 'nom_serveur', 'type_log', 'adresse_ip_source', 'utilisateur', 'statut', 'description']]
+
+LOG_COLUMNS = ['date_heure', 'nom_serveur', 'type_log', 'adresse_ip_source', 'utilisateur', 'statut', 'description']
+
+# Filtres de la page Logs : nom -> (condition SQL, colonne encodée à traduire en code ou None)
+LOG_FILTERS = {
+    'type_log': ("l.id_type_log = %s", 'type_log'),
+    'statut': ("l.id_statut = %s", 'statut'),
+    'utilisateur': ("l.id_utilisateur = %s", 'utilisateur'),
+    'id_serveur': ("l.id_serveur = %s", None),
+    'adresse_ip_source': ("l.adresse_ip_source = %s", None),
+    'debut': ("l.date_heure >= %s", None),
+    'fin': ("l.date_heure < %s", None),
+}
+
+def build_log_filters(conn, filtres, codec):
+    """
+    Conditions SQL paramétrées pour les filtres renseignés
+    Les libellés sont traduits en codes sans créer de référence ; un libellé inconnu
+    ne peut correspondre à aucun log
+
+    Returns:
+        (conditions, paramètres), ou None si un libellé est inconnu
+    """
+    conditions, params = [], []
+    for name, value in filtres:
+        if value is None or value == "":
+            continue
+        condition, column = LOG_FILTERS[name]
+        if column:
+            value = codec.code(conn, column, value, create=False)
+            if value is None:
+                return None
+        conditions.append(condition)
+        params.append(value)
+    return conditions, params
+
+LOG_PAGE_SELECT = """l.id_log, l.date_heure, s.nom_serveur, l.id_type_log,
+                   l.adresse_ip_source, l.id_utilisateur, l.id_statut, l.id_modele, l.description_param"""
+LOG_PAGE_FIELDS = ['id_log', 'date_heure', 'nom_serveur', 'id_type_log', 'adresse_ip_source',
+                   'id_utilisateur', 'id_statut', 'id_modele', 'description_param']
+
+@versioned_cache('logs', fallback=(None, None))
+def get_logs_page(filtres, cursor=None, page_size=50):
+    """
+    Une page de logs filtrés côté serveur, du plus récent au plus ancien
+    Pagination par clé (date_heure, id_log) : la page suivante repart du dernier log
+    affiché, en temps constant quelle que soit sa profondeur (index idx_logs_date)
+    Le filtre 'recherche' (mots de la description) passe par l'index de log_search
+
+    Args:
+        filtres: Tuple de paires (nom, valeur), voir LOG_FILTERS, plus ('recherche', texte)
+        cursor: (date_heure, id_log) du dernier log de la page précédente, None pour la première
+        page_size: Logs par page
+
+    Returns:
+        (DataFrame, curseur de la page suivante ou None)
+    """
+    codec = get_log_codec()
+    with get_connection() as conn:
+        recherche = dict(filtres).get('recherche')
+        built = build_log_filters(conn, [(name, value) for name, value in filtres if name != 'recherche'],
+                                  codec)
+        if built is None:
+            return pd.DataFrame(columns=LOG_COLUMNS), None
+        conditions, params = built
+        joins = "JOIN serveurs s ON l.id_serveur = s.id_serveur"
+        # Une ligne de plus pour savoir s'il existe une page suivante
+        if recherche:
+            templates = codec.label_map(conn, 'description')
+            rows = log_search.search_logs(conn, recherche, templates, LOG_PAGE_SELECT, joins,
+                                          conditions, params, cursor, int(page_size) + 1)
+            df = pd.DataFrame(rows, columns=LOG_PAGE_FIELDS)
+            df['date_heure'] = pd.to_datetime(df['date_heure'])
+        else:
+            if cursor is not None:
+                conditions.append("(l.date_heure < %s OR (l.date_heure = %s AND l.id_log < %s))")
+                params += [cursor[0], cursor[0], cursor[1]]
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            query = f"""
+                SELECT {LOG_PAGE_SELECT}
+                FROM logs_securite l
+                {joins}
+                {where}
+                ORDER BY l.date_heure DESC, l.id_log DESC
+                LIMIT %s
+            """
+            df = pd.read_sql(query, conn, params=params + [int(page_size) + 1])
+        next_cursor = None
+        if len(df) > page_size:
+            df = df.iloc[:page_size]
+            last = df.iloc[-1]
+            next_cursor = (last['date_heure'].to_pydatetime(), int(last['id_log']))
+        return decode_logs(df, conn, codec)[LOG_COLUMNS], next_cursor
+
+@versioned_cache()
+def get_servers():
+    with get_connection() as conn:
+        return pd.read_sql("SELECT id_serveur, nom_serveur FROM serveurs ORDER BY nom_serveur", conn)
+
+@versioned_cache('logs')
+def get_logs_range(start, end, type_log=None, statut=None, limit=50):
+    """Logs d'une période : MySQL pour les données chaudes, archive froide au-delà"""
+    servers = get_servers()
+    if servers is None:
+        raise DatabaseUnavailable("liste des serveurs indisponible")
+    with get_connection() as conn:
+        rows = query_logs_range(conn, start, end, {'type_log': type_log, 'statut': statut}, limit)
+    if not rows:
+        return pd.DataFrame(columns=LOG_COLUMNS)
+    df = pd.DataFrame(rows).merge(servers, on='id_serveur', how='left')
+    return df[LOG_COLUMNS]
+
+INCIDENT_COLUMNS = ['id_incident', 'date_detection', 'derniere_activite', 'niveau_severite', 'statut',
+                    'nb_evenements', 'description', 'nom_serveur', 'adresse_ip_source']
+
+@versioned_cache('incidents', fallback=(None, None))
+def get_incidents_page(severite=None, statut=None, cursor=None, page_size=50):
+    """
+    Une page du registre des incidents (filtres et limite en SQL), du plus récent au plus ancien
+    Pagination par clé (date_detection, id_incident), voir migration 010
+
+    Returns:
+        (DataFrame, curseur de la page suivante ou None)
+    """
+    with get_connection() as conn:
+        conditions, params = [], []
+        if severite:
+            conditions.append("i.niveau_severite = %s")
+            params.append(severite)
+        if statut:
+            conditions.append("i.statut = %s")
+            params.append(statut)
+        if cursor is not None:
+            conditions.append("(i.date_detection < %s OR (i.date_detection = %s AND i.id_incident < %s))")
+            params += [cursor[0], cursor[0], cursor[1]]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        query = f"""
+            SELECT i.id_incident, i.date_detection, i.derniere_activite, i.niveau_severite,
+                   i.statut, i.nb_evenements, i.description, s.nom_serveur, i.adresse_ip_source
+            FROM incidents i
+            LEFT JOIN serveurs s ON i.id_serveur = s.id_serveur
+            {where}
+            ORDER BY i.date_detection DESC, i.id_incident DESC
+            LIMIT %s
+        """
+        df = pd.read_sql(query, conn, params=params + [int(page_size) + 1])
+        next_cursor = None
+        if len(df) > page_size:
+            df = df.iloc[:page_size]
+            last = df.iloc[-1]
+            next_cursor = (last['date_detection'].to_pydatetime(), int(last['id_incident']))
+        return df[INCIDENT_COLUMNS], next_cursor
+
+@versioned_cache('incidents')
+def get_incident_counts():
+    """Nombre d'incidents par (sévérité, statut), depuis compteurs_incidents (9 lignes)"""
+    with get_connection() as conn:
+        return pd.read_sql("SELECT niveau_severite, statut, nombre FROM compteurs_incidents", conn)
+
+# ========================================
+# SÉRIES TEMPORELLES (AGRÉGÉES CÔTÉ SERVEUR)
+# ========================================
+
+# Pas possibles (s) : le plus fin qui tient dans le nombre de points demandé
+SERIES_STEPS = [60, 300, 900, 1800, 3600, 3 * 3600, 6 * 3600, 12 * 3600, 86400, 7 * 86400]
+
+# Période affichée -> durée
+SERIES_RANGES = {"1 h": timedelta(hours=1), "6 h": timedelta(hours=6), "24 h": timedelta(days=1),
+                 "7 j": timedelta(days=7), "30 j": timedelta(days=30), "1 an": timedelta(days=365)}
+
+def choose_step(start, end, width_px, min_step=60):
+    """Pas des buckets : au plus min(DASHBOARD_SERIES_MAX_POINTS, largeur en pixels) points"""
+    max_points = max(1, min(DASHBOARD_SERIES_MAX_POINTS, int(width_px)))
+    span = (end - start).total_seconds()
+    for step in SERIES_STEPS:
+        if step >= min_step and span / step <= max_points:
+            return step
+    return SERIES_STEPS[-1]
+
+def align_start(start, step):
+    """Début du premier bucket, aligné sur minuit local (buckets d'un jour ou plus : minuit)"""
+    midnight = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    if step >= 86400:
+        return midnight
+    offset = int((start - midnight).total_seconds())
+    return midnight + timedelta(seconds=offset - offset % step)
+
+def format_step(step):
+    """Pas lisible : 5 min, 3 h, 1 j"""
+    if step >= 86400:
+        return f"{step // 86400} j"
+    return f"{step // 3600} h" if step >= 3600 else f"{step // 60} min"
+
+def series_window(period):
+    """(début, fin) d'une période de SERIES_RANGES finissant à la minute courante"""
+    end = datetime.now().replace(second=0, microsecond=0) + timedelta(minutes=1)
+    return end - SERIES_RANGES[period], end
+
+def fill_series(rows, origin, step, nb_buckets):
+    """
+    Lignes (bucket, libellé, nombre) -> tableaux compacts pour Plotly
+
+    Returns:
+        {'pas': secondes, 'x': [début de chaque bucket], 'series': {libellé: [nombres]}}
+    """
+    series = {}
+    for bucket, label, count in rows:
+        if 0 <= bucket < nb_buckets:
+            series.setdefault(label, [0] * nb_buckets)[int(bucket)] += int(count)
+    x = [origin + timedelta(seconds=step * i) for i in range(nb_buckets)]
+    return {'pas': step, 'x': x, 'series': series}
+
+@versioned_cache('logs')
+def get_event_series(start, end, width_px=1000, group='statut'):
+    """
+    Nombre de logs par bucket de temps et par statut (ou type), agrégé en SQL
+    Pas >= 1 h ou période hors rétention des minutes : logs_par_heure ; sinon logs_par_minute.
+    Les logs pas encore agrégés (id_log > etat_agregats) sont comptés directement.
+    Jamais de lignes brutes renvoyées : au plus ~DASHBOARD_SERIES_MAX_POINTS buckets par série
+    """
+    codec = get_log_codec()
+    with get_connection() as conn:
+        minutes_kept = datetime.now() - timedelta(days=ROLLUP_MINUTE_RETENTION_DAYS)
+        step = choose_step(start, end, width_px, 3600 if start < minutes_kept else 60)
+        origin = align_start(start, step)
+        table, time_column = ('logs_par_heure', 'heure') if step >= 3600 else ('logs_par_minute', 'minute')
+        code_column = 'id_statut' if group == 'statut' else 'id_type_log'
+        query = f"""
+            SELECT b, {code_column}, SUM(nombre) FROM (
+                SELECT TIMESTAMPDIFF(SECOND, %(origine)s, {time_column}) DIV %(pas)s AS b,
+                       {code_column}, nombre
+                FROM {table}
+                WHERE {time_column} >= %(origine)s AND {time_column} < %(fin)s
+                UNION ALL
+                SELECT TIMESTAMPDIFF(SECOND, %(origine)s, date_heure) DIV %(pas)s,
+                       {code_column}, 1
+                FROM logs_securite
+                WHERE id_log > (SELECT dernier_id FROM etat_agregats WHERE nom = 'logs')
+                AND date_heure >= %(origine)s AND date_heure < %(fin)s
+            ) s
+            GROUP BY b, {code_column}
+        """
+        cursor = conn.cursor()
+        cursor.execute(query, {'origine': origin, 'fin': end, 'pas': step})
+        rows = cursor.fetchall()
+        cursor.close()
+        labels = codec.labels(conn, group, [code for _, code, _ in rows])
+        nb_buckets = -(-int((end - origin).total_seconds()) // step)
+        return fill_series([(b, label, n) for (b, _, n), label in zip(rows, labels)], origin, step, nb_buckets)
+
+@versioned_cache('incidents')
+def get_incident_series(start, end, width_px=1000):
+    """Incidents détectés par bucket de temps et par sévérité (agrégé en SQL, index sur date_detection)"""
+    with get_connection() as conn:
+        step = choose_step(start, end, width_px)
+        origin = align_start(start, step)
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT TIMESTAMPDIFF(SECOND, %(origine)s, date_detection) DIV %(pas)s AS b,
+                   niveau_severite, COUNT(*)
+            FROM incidents
+            WHERE date_detection >= %(origine)s AND date_detection < %(fin)s
+            GROUP BY b, niveau_severite
+        """, {'origine': origin, 'fin': end, 'pas': step})
+        rows = cursor.fetchall()
+        cursor.close()
+        nb_buckets = -(-int((end - origin).total_seconds()) // step)
+        return fill_series(rows, origin, step, nb_buckets)
+
+@versioned_cache('logs')
+def get_top_suspect_ips():
+    codec = get_log_codec()
+    with get_connection() as conn:
+        query = """
+            SELECT adresse_ip_source, COUNT(*) as tentatives
+            FROM logs_securite WHERE id_statut = %(echec)s
+            GROUP BY adresse_ip_source ORDER BY tentatives DESC LIMIT 10
+        """
+        return pd.read_sql(query, conn, params={'echec': codec.code(conn, 'statut', 'echec')})
+
+# ========================================
+# CUBE D'ACTIVITÉ (TRANCHES EN MÉMOIRE)
+# ========================================
+
+WEEKDAYS = ['Lun', 'Mar', 'Mer', 'Jeu', 'Ven', 'Sam', 'Dim']
+
+@st.cache_resource
+def get_activity_cube():
+    """Cube d'activité partagé par toutes les sessions (tableaux numpy)"""
+    return ActivityCube()
+
+def refresh_activity_cube():
+    """Recharge la fin du cube quand la version des logs a changé (chargement complet la première fois)"""
+    cube = get_activity_cube()
+    start = time.perf_counter()
+    try:
+        version = get_data_version()['logs']
+        with cube.lock:
+            stale = cube.version != version or cube.stable_until is None
+            if stale:
+                with get_connection() as conn:
+                    cube.load(conn, version)
+    except DatabaseUnavailable as err:
+        st.error(f"Erreur de connexion MySQL: {err}")
+        return cube    # Dernier état chargé
+    record_timing('cube_activite', time.perf_counter() - start, not stale)
+    return cube
+
+def axis_labels(name, size):
+    """Libellés d'un axe du cube, indexés par code"""
+    if name == 'heure_semaine':
+        return [f"{WEEKDAYS[i // 24]} {i % 24:02d}h" for i in range(size)]
+    if name == 'heure_jour':
+        return [f"{i:02d}h" for i in range(size)]
+    if name == 'serveur':
+        servers = get_servers()
+        names = {} if servers is None else dict(zip(servers['id_serveur'], servers['nom_serveur']))
+        return [names.get(code, str(code)) for code in range(size)]
+    try:
+        codec = get_log_codec()
+        with get_connection() as conn:
+            labels = codec.label_map(conn, name)
+    except DatabaseUnavailable:
+        labels = {}    # Codes affichés tels quels
+    if name == 'utilisateur':
+        labels[0] = '(aucun)'
+    return [labels.get(code, str(code)) for code in range(size)]
+
+def get_activity_slice(rows, columns, start=None, end=None):
+    """
+    Matrice de comptes rows × columns sur [start, end), depuis le cube en mémoire
+    Les codes sans aucune activité sont retirés (les axes de temps restent complets)
+
+    Returns:
+        DataFrame (index: libellés de rows, colonnes: libellés de columns)
+    """
+    cube = refresh_activity_cube()
+    started = time.perf_counter()
+    with cube.lock:
+        matrix = cube.slice(rows, columns, start, end)
+    df = pd.DataFrame(matrix, index=axis_labels(rows, matrix.shape[0]),
+                      columns=axis_labels(columns, matrix.shape[1]))
+    if rows not in TIME_AXES:
+        df = df[df.sum(axis=1) > 0]
+    if columns not in TIME_AXES:
+        df = df.loc[:, df.sum(axis=0) > 0]
+    record_timing(f'tranche_{rows}_{columns}', time.perf_counter() - started, True)
+    return df
+
+# ========================================
+# MODE DIRECT (DELTAS PAR IDENTIFIANT)
+# ========================================
+
+# Non mis en cache : chaque session suit ses propres derniers identifiants vus
+
+def get_max_ids():
+    """(MAX(id_log), MAX(id_incident)) : bornes hautes du prochain delta (lecture d'index)"""
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        cursor.execute("SELECT (SELECT MAX(id_log) FROM logs_securite), (SELECT MAX(id_incident) FROM incidents)")
+        max_log, max_incident = cursor.fetchone()
+        cursor.close()
+        return max_log or 0, max_incident or 0
+
+def fetch_log_delta(last_id, upper, max_rows, seen=frozenset()):
+    """
+    Logs de l'intervalle ]last_id, upper] : comptes par statut et au plus max_rows lignes
+    (les plus récentes), par parcours de la clé primaire. Le coût suit le nombre de
+    nouveaux logs, pas l'historique affiché. last_id None : amorçage sans comptes
+    Un id_log est attribué à l'insertion mais visible au commit : un log commité après un
+    id plus grand (collecteur et pipeline en parallèle) apparaît sous last_id. Les
+    DASHBOARD_LIVE_OVERLAP_IDS ids sous last_id sont relus et ceux absents de seen ajoutés
+
+    Args:
+        seen: Ids déjà comptés dans ]last_id - DASHBOARD_LIVE_OVERLAP_IDS, last_id]
+
+    Returns:
+        (DataFrame des nouveaux logs, du plus récent au plus ancien ; {statut: nombre} ;
+        ids présents dans ]upper - DASHBOARD_LIVE_OVERLAP_IDS, upper], seen du passage suivant)
+    """
+    codec = get_log_codec()
+    with get_connection() as conn:
+        cursor = conn.cursor()
+        base = upper if last_id is None else last_id
+        cursor.execute("""
+            SELECT id_log, id_statut FROM logs_securite
+            WHERE (id_log > %s AND id_log <= %s) OR (id_log > %s AND id_log <= %s)
+        """, (base - DASHBOARD_LIVE_OVERLAP_IDS, base, max(base, upper - DASHBOARD_LIVE_OVERLAP_IDS), upper))
+        window = cursor.fetchall()
+        recent = {id_log for id_log, _ in window if id_log > upper - DASHBOARD_LIVE_OVERLAP_IDS}
+        late = [] if last_id is None else [(id_log, code) for id_log, code in window
+                                           if id_log <= last_id and id_log not in seen]
+        by_code = {}
+        if last_id is not None and upper > last_id:
+            cursor.execute("""
+                SELECT id_statut, COUNT(*) FROM logs_securite
+                WHERE id_log > %s AND id_log <= %s GROUP BY id_statut
+            """, (last_id, upper))
+            by_code = dict(cursor.fetchall())
+        cursor.close()
+        for _, code in late:
+            by_code[code] = by_code.get(code, 0) + 1
+        labels = codec.labels(conn, 'statut', list(by_code))
+        counts = dict(zip(labels, by_code.values()))
+        condition, params = "l.id_log > %s AND l.id_log <= %s", [last_id or 0, upper]
+        if late:
+            condition = f"({condition}) OR l.id_log IN ({', '.join(['%s'] * len(late))})"
+            params += [id_log for id_log, _ in late]
+        query = f"""
+            SELECT l.id_log, l.date_heure, s.nom_serveur, l.id_type_log,
+                   l.adresse_ip_source, l.id_utilisateur, l.id_statut, l.id_modele, l.description_param
+            FROM logs_securite l
+            JOIN serveurs s ON l.id_serveur = s.id_serveur
+            WHERE {condition}
+            ORDER BY l.id_log DESC
+            LIMIT %s
+        """
+        df = pd.read_sql(query, conn, params=params + [int(max_rows)])
+        return decode_logs(df, conn, codec)[['id_log'] + LOG_COLUMNS], counts, recent
+
+def fetch_incident_delta(last_id, upper, max_rows):
+    """Incidents créés dans ]last_id, upper] : comptes par sévérité et lignes les plus récentes"""
+    with get_connection() as conn:
+        counts = {}
+        if last_id is not None:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT niveau_severite, COUNT(*) FROM incidents
+                WHERE id_incident > %s AND id_incident <= %s GROUP BY niveau_severite
+            """, (last_id, upper))
+            counts = dict(cursor.fetchall())
+            cursor.close()
+        query = """
+            SELECT i.id_incident, i.date_detection, i.derniere_activite, i.niveau_severite,
+                   i.statut, i.nb_evenements, i.description, s.nom_serveur, i.adresse_ip_source
+            FROM incidents i
+            LEFT JOIN serveurs s ON i.id_serveur = s.id_serveur
+            WHERE i.id_incident > %s AND i.id_incident <= %s
+            ORDER BY i.id_incident DESC
+            LIMIT %s
+        """
+        df = pd.read_sql(query, conn, params=[last_id or 0, upper, int(max_rows)])
+        return df[INCIDENT_COLUMNS], counts
+
+def refresh_live_state():
+    """
+    Applique le delta depuis le dernier passage à l'état de session 'direct' :
+    nouvelles lignes en tête des DataFrames bornés, compteurs incrémentés
+    """
+    live = st.session_state.setdefault('direct', {
+        'dernier_log': None, 'dernier_incident': None,
+        'logs': pd.DataFrame(columns=['id_log'] + LOG_COLUMNS),
+        'incidents': pd.DataFrame(columns=INCIDENT_COLUMNS),
+        'compteurs_logs': {}, 'compteurs_incidents': {}, 'ids_recents': set(),
+        'depuis': datetime.now(), 'rafraichissements': 0, 'dernier_delta': (0, 0)
+    })
+    start = time.perf_counter()
+    try:
+        new_logs, new_incidents = apply_live_delta(live)
+    except DatabaseUnavailable as err:
+        # Derniers identifiants inchangés : le delta sera lu au passage suivant
+        st.error(f"Erreur de connexion MySQL: {err}")
+        return live
+
+    live['rafraichissements'] += 1
+    live['dernier_delta'] = (new_logs, new_incidents)
+    record_timing('direct_delta', time.perf_counter() - start, False)
+    return live
+
+def apply_live_delta(live):
+    """Lit et applique les deltas de logs et d'incidents ; (nouveaux logs, nouveaux incidents)"""
+    max_log, max_incident = get_max_ids()
+    new_logs, new_incidents = 0, 0
+    # Lu même sans nouvel id : la fenêtre de chevauchement peut contenir un commit tardif
+    last_log = live['dernier_log']
+    upper = max_log if last_log is None else max(max_log, last_log)
+    df, counts, live['ids_recents'] = fetch_log_delta(last_log, upper, DASHBOARD_LIVE_MAX_ROWS,
+                                                      live['ids_recents'])
+    if not df.empty:
+        live['logs'] = pd.concat([df, live['logs']], ignore_index=True).head(DASHBOARD_LIVE_MAX_ROWS)
+    for statut, nombre in counts.items():
+        live['compteurs_logs'][statut] = live['compteurs_logs'].get(statut, 0) + nombre
+    new_logs = sum(counts.values())
+    live['dernier_log'] = upper
+    if live['dernier_incident'] is None or max_incident > live['dernier_incident']:
+        df, counts = fetch_incident_delta(live['dernier_incident'], max_incident, DASHBOARD_LIVE_MAX_INCIDENTS)
+        live['incidents'] = pd.concat([df, live['incidents']], ignore_index=True).head(DASHBOARD_LIVE_MAX_INCIDENTS)
+        for severite, nombre in counts.items():
+            live['compteurs_incidents'][severite] = live['compteurs_incidents'].get(severite, 0) + nombre
+        new_incidents = sum(counts.values())
+        live['dernier_incident'] = max_incident
+    return new_logs, new_incidents
+
+# ========================================
+# EXPORT À LA DEMANDE
+# ========================================
+
+def render_export(kind, filtres):
+    """
+    Export gzip de toute la sélection, généré seulement au clic
+    Flux depuis une connexion dédiée (la connexion partagée reste libre), mémoire bornée
+    """
+    col1, col2 = st.columns([1, 2])
+    with col1:
+        fmt = st.selectbox("Format", log_export.FORMATS, key=f"export_format_{kind}")
+    with col2:
+        st.write("")
+        prepare = st.button("Préparer l'export", use_container_width=True, key=f"export_{kind}")
+
+    state_key = f"export_fichier_{kind}"
+    if prepare:
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        path = os.path.join(EXPORT_DIR, f'{kind}_{datetime.now().strftime("%Y%m%d_%H%M%S")}.{fmt}.gz')
+        bar = st.progress(0.0, text="Export en cours…")
+        try:
+            conn = mysql.connector.connect(**DB_CONFIG)
+            try:
+                total = log_export.export(
+                    conn, kind, path, fmt, filtres,
+                    progress=lambda rows, fraction: bar.progress(min(fraction, 1.0), text=f"{rows:,} ligne(s)")
+                )
+            finally:
+                conn.close()
+            st.session_state[state_key] = (path, total, filtres)
+        except mysql.connector.Error as err:
+            st.error(f"Erreur export: {err}")
+
+    exported = st.session_state.get(state_key)
+    if not exported or exported[2] != filtres or not os.path.exists(exported[0]):
+        return
+    path, total, _ = exported
+    size_mb = os.path.getsize(path) / 1024 / 1024
+    if size_mb > EXPORT_DOWNLOAD_MAX_MB:
+        st.info(f"{total:,} lignes exportées ({size_mb:.0f} Mo) : fichier disponible sur le serveur, {path}")
+        return
+    # st.download_button garde le fichier en mémoire à chaque rendu : il n'est lu que sur
+    # demande, pour un seul rendu, et oublié une fois le téléchargement lancé
+    ready_key = f"export_pret_{kind}"
+    if st.session_state.get(ready_key) != path:
+        if st.button(f"Préparer le téléchargement ({total:,} lignes, {size_mb:.1f} Mo)",
+                     use_container_width=True, key=f"export_preparer_{kind}"):
+            st.session_state[ready_key] = path
+            st.rerun()
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    if st.download_button(
+        f"Télécharger ({total:,} lignes, {size_mb:.1f} Mo)",
+        data,
+        os.path.basename(path),
+        'application/gzip',
+        use_container_width=True,
+        key=f"export_telecharger_{kind}"
+    ):
+        st.session_state.pop(ready_key, None)
+
+# ========================================
+# PERFORMANCE DES REQUÊTES
+# ========================================
+
+def explain_statement(sql, params):
+    """Plan d'exécution d'une requête notée par query_stats (SELECT seulement), jamais mis en cache"""
+    if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+        raise ValueError("EXPLAIN limité aux requêtes SELECT")
+    with get_connection() as conn:
+        return pd.DataFrame(explain_query(conn, sql, params or ()))
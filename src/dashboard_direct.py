@@ -0,0 +1,50 @@
+"""
+CloudSecMonitor - Dashboard : page Direct (suivi en direct)
+Importée seulement quand la page est affichée (voir PAGES dans dashboard.py)
+"""
+
+import streamlit as st
+
+from config.config import DASHBOARD_LIVE_INTERVAL
+from dashboard_data import refresh_live_state
+
+
+def render():
+    """Rendu de la page Direct"""
+    st.markdown('<p class="main-title">Suivi <span>en direct</span></p>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle">Nouveaux événements et incidents depuis l\'ouverture de la page</p>', unsafe_allow_html=True)
+
+    col1, col2, col3 = st.columns([1, 1, 1])
+    with col1:
+        live_enabled = st.toggle("Actualisation automatique", value=True)
+    with col2:
+        live_interval = st.select_slider("Intervalle (s)", [2, 5, 10, 30, 60], DASHBOARD_LIVE_INTERVAL)
+    with col3:
+        if st.button("Réinitialiser", use_container_width=True):
+            st.session_state.pop('direct', None)
+
+    live = refresh_live_state()
+    new_logs, new_incidents = live['dernier_delta']
+    logs_counts, incidents_counts = live['compteurs_logs'], live['compteurs_incidents']
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Nouveaux logs", f"{sum(logs_counts.values()):,}", f"+{new_logs:,}")
+    with col2:
+        st.metric("Échecs", f"{logs_counts.get('echec', 0):,}")
+    with col3:
+        st.metric("Nouveaux incidents", sum(incidents_counts.values()), f"+{new_incidents}")
+    with col4:
+        st.metric("Critiques", incidents_counts.get('critique', 0), delta_color="inverse")
+    st.caption(f"Depuis {live['depuis']:%H:%M:%S} · {live['rafraichissements']} actualisation(s) · "
+               f"dernier log #{live['dernier_log']}")
+
+    st.markdown('<hr>', unsafe_allow_html=True)
+    st.markdown('<div class="section-label">Nouveaux incidents</div>', unsafe_allow_html=True)
+    st.dataframe(live['incidents'], use_container_width=True, height=220)
+
+    st.markdown('<div class="section-label">Derniers événements</div>', unsafe_allow_html=True)
+    st.dataframe(live['logs'].drop(columns='id_log'), use_container_width=True, height=480)
+
+    if live_enabled:
+        st.session_state['direct_rerun'] = live_interval
@@ -0,0 +1,121 @@
+"""
+CloudSecMonitor - Dashboard : page Incidents (gestion des incidents)
+Importée seulement quand la page est affichée (voir PAGES dans dashboard.py)
+"""
+
+import streamlit as st
+import pandas as pd
+import plotly.express as px
+
+from dashboard_data import (get_incident_counts, get_incident_series, get_incidents_page,
+                            get_geoip_db, render_export, series_window, format_step, SERIES_RANGES)
+from dashboard_charts import PLOT_LAYOUT, SEVERITY_COLORS, series_figure
+
+
+def render():
+    """Rendu de la page Incidents"""
+    st.markdown('<p class="main-title">Gestion des <span>Incidents</span></p>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle">Surveillance et réponse aux menaces de sécurité</p>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        severity_filter = st.selectbox("Sévérité", ["Tous", "critique", "moyen", "faible"])
+    with col2:
+        status_filter = st.selectbox("Statut", ["Tous", "nouveau", "en_cours", "resolu"])
+
+    st.markdown('<hr>', unsafe_allow_html=True)
+
+    severite = None if severity_filter == "Tous" else severity_filter
+    statut = None if status_filter == "Tous" else status_filter
+
+    # Indicateurs et répartition depuis les compteurs (agrégats), jamais depuis la table entière
+    counts = get_incident_counts()
+
+    if counts is not None and counts['nombre'].sum() > 0:
+        if severite:
+            counts = counts[counts['niveau_severite'] == severite]
+        if statut:
+            counts = counts[counts['statut'] == statut]
+        by_severity = counts.groupby('niveau_severite')['nombre'].sum()
+
+        col1, col2, col3, col4 = st.columns(4)
+        with col1:
+            st.metric("Critiques", int(by_severity.get('critique', 0)))
+        with col2:
+            st.metric("Moyens", int(by_severity.get('moyen', 0)))
+        with col3:
+            st.metric("Faibles", int(by_severity.get('faible', 0)))
+        with col4:
+            st.metric("En cours", int(counts[counts['statut'].isin(['nouveau', 'en_cours'])]['nombre'].sum()))
+
+        st.markdown('<hr>', unsafe_allow_html=True)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.markdown('<div class="section-label">Répartition par sévérité</div>', unsafe_allow_html=True)
+            severity_counts = by_severity[by_severity > 0]
+            fig = px.pie(
+                values=severity_counts.values,
+                names=severity_counts.index,
+                color=severity_counts.index,
+                color_discrete_map={
+                    'critique': 'rgba(239,68,68,0.75)',
+                    'moyen': 'rgba(245,158,11,0.75)',
+                    'faible': 'rgba(16,185,129,0.7)'
+                },
+                hole=0.6
+            )
+            fig.update_traces(
+                textfont=dict(family='DM Mono, monospace', size=10, color='rgba(255,255,255,0.5)'),
+                marker=dict(line=dict(color='#05080f', width=3))
+            )
+            fig.update_layout(
+                height=300,
+                legend=dict(font=dict(size=10, color='rgba(255,255,255,0.4)', family='DM Mono, monospace')),
+                **PLOT_LAYOUT
+            )
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        with col2:
+            st.markdown('<div class="section-label">Évolution temporelle</div>', unsafe_allow_html=True)
+            period = st.selectbox("Période", list(SERIES_RANGES), index=4, key="incidents_periode",
+                                  label_visibility="collapsed")
+            incident_series = get_incident_series(*series_window(period), width_px=500)
+            if incident_series is not None and incident_series['series']:
+                fig = series_figure(incident_series, SEVERITY_COLORS, height=260)
+                st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+                st.caption(f"Pas : {format_step(incident_series['pas'])}")
+
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<div class="section-label">Registre des incidents</div>', unsafe_allow_html=True)
+
+        page_size = st.select_slider("Incidents par page", [25, 50, 100, 200], 50)
+        if st.session_state.get('incidents_filtres') != (severite, statut, page_size):
+            st.session_state['incidents_filtres'] = (severite, statut, page_size)
+            st.session_state['incidents_curseurs'] = [None]
+        cursors = st.session_state['incidents_curseurs']
+        incidents_df, next_cursor = get_incidents_page(severite, statut, cursors[-1], page_size)
+
+        if incidents_df is None:
+            st.warning("Registre indisponible (base de données) : nouvelle lecture au prochain rendu")
+        else:
+            incidents_df['date_detection'] = pd.to_datetime(incidents_df['date_detection']).dt.strftime('%Y-%m-%d %H:%M:%S')
+            incidents_df['origine'] = incidents_df['adresse_ip_source'].map(get_geoip_db().label)
+            st.dataframe(incidents_df, use_container_width=True, height=400)
+
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                if st.button("← Précédent", disabled=len(cursors) == 1, use_container_width=True, key="incidents_prec"):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                st.caption(f"Page {len(cursors)}")
+            with col3:
+                if st.button("Suivant →", disabled=next_cursor is None, use_container_width=True, key="incidents_suiv"):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<div class="section-label">Export de la sélection (toutes les pages)</div>', unsafe_allow_html=True)
+        render_export('incidents', {'niveau_severite': severite, 'statut': statut})
@@ -0,0 +1,118 @@
+"""
+CloudSecMonitor - Dashboard : page Logs (registre des événements)
+Importée seulement quand la page est affichée (voir PAGES dans dashboard.py)
+"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime, timedelta
+
+from dashboard_data import get_logs_page, get_logs_range, get_servers, render_export
+
+
+def render():
+    """Rendu de la page Logs"""
+    st.markdown('<p class="main-title">Registre des <span>Événements</span></p>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle">Consultation et analyse des logs de sécurité</p>', unsafe_allow_html=True)
+
+    servers = get_servers()
+    server_names = {} if servers is None else dict(zip(servers['nom_serveur'], servers['id_serveur']))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        type_filter = st.selectbox("Type d'événement", ["Tous", "SSH", "scan_port", "acces_fichier"])
+    with col2:
+        status_filter = st.selectbox("Statut", ["Tous", "succes", "echec", "detecte"])
+    with col3:
+        server_filter = st.selectbox("Serveur", ["Tous"] + list(server_names))
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        ip_filter = st.text_input("IP source").strip()
+    with col2:
+        user_filter = st.text_input("Utilisateur").strip()
+    with col3:
+        limit = st.slider("Logs par page", 10, 500, 50, 10)
+
+    search_text = st.text_input("Recherche dans la description",
+                                placeholder="ex: /root/.ssh/id_rsa, Mot de passe incorrect").strip()
+
+    today = datetime.now().date()
+    use_range = st.checkbox("Filtrer sur une période")
+    if use_range:
+        period = st.date_input("Période", (today - timedelta(days=7), today))
+    use_archive = use_range and st.checkbox("Inclure les archives froides (sans pagination)")
+
+    st.markdown('<hr>', unsafe_allow_html=True)
+
+    period_bounds = (None, None)
+    if use_range and len(period) == 2:
+        period_bounds = (datetime.combine(period[0], datetime.min.time()),
+                         datetime.combine(period[1] + timedelta(days=1), datetime.min.time()))
+
+    filtres = (
+        ('type_log', None if type_filter == "Tous" else type_filter),
+        ('statut', None if status_filter == "Tous" else status_filter),
+        ('id_serveur', server_names.get(server_filter)),
+        ('adresse_ip_source', ip_filter or None),
+        ('utilisateur', user_filter or None),
+        ('debut', period_bounds[0]),
+        ('fin', period_bounds[1]),
+        ('recherche', search_text or None),
+    )
+
+    next_cursor = None
+    if use_archive and search_text:
+        st.caption("La recherche ne porte pas sur les archives froides : seule la base chaude est interrogée")
+        use_archive = False
+    if use_archive and period_bounds[0]:
+        # Filtres appliqués à la source (MySQL et archive) avant la limite
+        logs_df = get_logs_range(
+            period_bounds[0], period_bounds[1],
+            None if type_filter == "Tous" else type_filter,
+            None if status_filter == "Tous" else status_filter,
+            limit
+        )
+    else:
+        # Pile des curseurs des pages précédentes, remise à zéro quand les filtres changent
+        if st.session_state.get('logs_filtres') != (filtres, limit):
+            st.session_state['logs_filtres'] = (filtres, limit)
+            st.session_state['logs_curseurs'] = [None]
+        cursors = st.session_state['logs_curseurs']
+        logs_df, next_cursor = get_logs_page(filtres, cursors[-1], limit)
+
+    if logs_df is not None and not logs_df.empty:
+        logs_df['date_heure'] = pd.to_datetime(logs_df['date_heure']).dt.strftime('%Y-%m-%d %H:%M:%S')
+
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.metric("Affichés", len(logs_df))
+        with col2:
+            st.metric("Échecs", len(logs_df[logs_df['statut'] == 'echec']))
+        with col3:
+            st.metric("Succès", len(logs_df[logs_df['statut'] == 'succes']))
+
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<div class="section-label">Tableau des événements</div>', unsafe_allow_html=True)
+        st.dataframe(logs_df, use_container_width=True, height=560)
+
+        if not use_archive:
+            col1, col2, col3 = st.columns([1, 1, 1])
+            with col1:
+                if st.button("← Précédent", disabled=len(cursors) == 1, use_container_width=True):
+                    cursors.pop()
+                    st.rerun()
+            with col2:
+                st.caption(f"Page {len(cursors)}")
+            with col3:
+                if st.button("Suivant →", disabled=next_cursor is None, use_container_width=True):
+                    cursors.append(next_cursor)
+                    st.rerun()
+
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<div class="section-label">Export de la sélection (base chaude, toutes les pages)</div>', unsafe_allow_html=True)
+        render_export('logs', dict(filtres))
+    elif logs_df is None:
+        st.warning("Logs indisponibles (base de données) : nouvelle lecture au prochain rendu")
+    else:
+        st.info("Aucun log pour ces filtres")
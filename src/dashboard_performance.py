@@ -0,0 +1,104 @@
+"""
+CloudSecMonitor - Dashboard : page Performance (chronométrage des requêtes SQL)
+Importée seulement quand la page est affichée (voir PAGES dans dashboard.py)
+Tampon du processus du dashboard en direct, instantanés des autres processus
+(analyseur, pipeline) lus dans QUERY_STATS_DIR
+"""
+
+import streamlit as st
+import pandas as pd
+from datetime import datetime
+import mysql.connector
+
+from dashboard_data import DatabaseUnavailable, explain_statement
+from query_stats import get_recorder, load_snapshots, normalize_sql, summarize
+
+DASHBOARD_SOURCE = "dashboard (ce processus)"
+
+
+def load_source(source):
+    """(entrées, requêtes, échantillonnage, écrit le) d'une source"""
+    if source == DASHBOARD_SOURCE:
+        recorder = get_recorder()
+        return recorder.entries(), recorder.statements(), recorder.sample_rate, None
+    snapshot = load_snapshots().get(source)
+    if snapshot is None:
+        return [], {}, 1.0, None
+    return (snapshot['entrees'], snapshot['requetes'], snapshot['echantillonnage'],
+            datetime.fromtimestamp(snapshot['ecrit_le']))
+
+
+def render():
+    """Rendu de la page Performance"""
+    st.markdown('<p class="main-title">Performance des <span>Requêtes</span></p>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle">Durée, volume et plan des requêtes SQL récentes</p>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        source = st.selectbox("Processus", [DASHBOARD_SOURCE] + list(load_snapshots()))
+    with col2:
+        if source == DASHBOARD_SOURCE and st.button("Vider le tampon", use_container_width=True):
+            get_recorder().clear()
+
+    entries, statements, sample_rate, written = load_source(source)
+    if written:
+        st.caption(f"Instantané écrit le {written:%Y-%m-%d %H:%M:%S}")
+    queries = [e for e in entries if e['empreinte'] is not None]
+    calls = [e for e in entries if e['empreinte'] is None]
+
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Requêtes notées", len(queries))
+    with col2:
+        st.metric("Temps SQL", f"{sum(e['duree_ms'] for e in queries) / 1000:.1f} s")
+    with col3:
+        st.metric("Succès du cache", f"{sum(e['cache'] for e in calls) / len(calls):.0%}" if calls else "—")
+    with col4:
+        st.metric("Échantillonnage", f"{sample_rate:.0%}")
+
+    if not entries:
+        st.info("Aucune requête notée pour ce processus")
+        return
+
+    st.markdown('<hr>', unsafe_allow_html=True)
+
+    if queries:
+        st.markdown('<div class="section-label">p95 par requête</div>', unsafe_allow_html=True)
+        summary = pd.DataFrame(summarize(queries))
+        summary['requete'] = [normalize_sql(statements.get(key, {}).get('sql', ''))[:120]
+                              for key in summary['empreinte']]
+        st.dataframe(summary[['nom', 'requete', 'executions', 'p50_ms', 'p95_ms', 'max_ms', 'total_ms',
+                              'lignes_moy']].round(1), use_container_width=True, height=360)
+
+        st.markdown('<div class="section-label">Exécutions les plus lentes</div>', unsafe_allow_html=True)
+        slowest = pd.DataFrame(sorted(queries, key=lambda e: e['duree_ms'], reverse=True)[:20])
+        slowest['horodatage'] = [datetime.fromtimestamp(t).strftime('%H:%M:%S') for t in slowest['horodatage']]
+        st.dataframe(slowest[['horodatage', 'nom', 'duree_ms', 'lignes', 'empreinte']].round(1),
+                     use_container_width=True)
+
+    if calls:
+        st.markdown('<div class="section-label">Cache des fonctions de données</div>', unsafe_allow_html=True)
+        cache = pd.DataFrame(calls).groupby('nom').agg(
+            appels=('cache', 'size'), succes=('cache', 'sum'), duree_moy_ms=('duree_ms', 'mean'))
+        cache['taux_succes'] = (cache['succes'] / cache['appels']).round(2)
+        st.dataframe(cache.sort_values('appels', ascending=False).round(1), use_container_width=True)
+
+    if queries:
+        st.markdown('<hr>', unsafe_allow_html=True)
+        st.markdown('<div class="section-label">Plan d\'exécution (EXPLAIN)</div>', unsafe_allow_html=True)
+        keys = [key for key in summary['empreinte'] if key in statements]
+        if not keys:
+            st.caption("Texte des requêtes indisponible")
+            return
+        key = st.selectbox(
+            "Requête", keys,
+            format_func=lambda k: f"{statements[k]['nom']} — {normalize_sql(statements[k]['sql'])[:90]}"
+        )
+        statement = statements[key]
+        st.code(statement['sql'].strip(), language='sql')
+        st.caption(f"Paramètres de la dernière exécution : {statement['params']}")
+        if st.button("Exécuter EXPLAIN", key="explain_requete"):
+            try:
+                st.dataframe(explain_statement(statement['sql'], statement['params']), use_container_width=True)
+            except (ValueError, DatabaseUnavailable, mysql.connector.Error) as e:
+                st.warning(f"EXPLAIN impossible: {e}")
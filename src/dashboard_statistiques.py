@@ -0,0 +1,68 @@
+"""
+CloudSecMonitor - Dashboard : page Statistiques (statistiques)
+Importée seulement quand la page est affichée (voir PAGES dans dashboard.py)
+"""
+
+import streamlit as st
+import plotly.graph_objects as go
+
+from dashboard_data import (get_event_series, get_activity_slice, series_window, format_step,
+                            SERIES_RANGES)
+from dashboard_charts import PLOT_LAYOUT, STATUS_COLORS, series_figure, heatmap_figure
+
+
+def render():
+    """Rendu de la page Statistiques"""
+    st.markdown('<p class="main-title">Analyse <span>Avancée</span></p>', unsafe_allow_html=True)
+    st.markdown('<p class="page-subtitle">Statistiques détaillées par serveur et par activité</p>', unsafe_allow_html=True)
+
+    st.markdown('<div class="section-label">Événements dans le temps</div>', unsafe_allow_html=True)
+    col1, col2 = st.columns([1, 1])
+    with col1:
+        period = st.selectbox("Période", list(SERIES_RANGES), index=2, key="series_periode")
+    with col2:
+        group = st.radio("Répartition", ['statut', 'type_log'], horizontal=True, key="series_groupe")
+    event_series = get_event_series(*series_window(period), width_px=1000, group=group)
+    if event_series is not None and event_series['series']:
+        fig = series_figure(event_series, STATUS_COLORS, height=320)
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+        st.caption(f"Pas : {format_step(event_series['pas'])} · {len(event_series['x'])} points")
+
+    st.markdown('<hr>', unsafe_allow_html=True)
+    st.markdown('<div class="section-label">Activité par serveur</div>', unsafe_allow_html=True)
+
+    # Tranches du cube d'activité en mémoire : aucune requête sur logs_securite
+    cube_period = st.selectbox("Période", list(SERIES_RANGES) + ["Tout l'historique"], index=5,
+                               key="cube_periode")
+    start, end = (None, None) if cube_period not in SERIES_RANGES else series_window(cube_period)
+
+    server_status = get_activity_slice('serveur', 'statut', start, end)
+    if not server_status.empty:
+        fig = go.Figure()
+        for statut in server_status.columns:
+            fig.add_trace(go.Bar(
+                name=statut, x=server_status.index, y=server_status[statut],
+                marker_color=STATUS_COLORS.get(statut, 'rgba(59,130,246,0.65)'),
+                marker_line_width=0
+            ))
+        fig.update_layout(
+            barmode='stack',
+            height=380,
+            legend=dict(font=dict(size=10, color='rgba(255,255,255,0.35)', family='DM Mono')),
+            **PLOT_LAYOUT
+        )
+        st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
+
+        st.markdown('<div class="section-label">Serveur × heure de la semaine</div>', unsafe_allow_html=True)
+        st.plotly_chart(heatmap_figure(get_activity_slice('serveur', 'heure_semaine', start, end), 260),
+                        use_container_width=True, config={'displayModeBar': False})
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.markdown('<div class="section-label">Type × statut</div>', unsafe_allow_html=True)
+            st.plotly_chart(heatmap_figure(get_activity_slice('type_log', 'statut', start, end), 260),
+                            use_container_width=True, config={'displayModeBar': False})
+        with col2:
+            st.markdown('<div class="section-label">Utilisateur × serveur</div>', unsafe_allow_html=True)
+            st.plotly_chart(heatmap_figure(get_activity_slice('utilisateur', 'serveur', start, end), 260),
+                            use_container_width=True, config={'displayModeBar': False})
@@ -0,0 +1,385 @@
+"""
+CloudSecMonitor - Migrations du schéma et contrôle des plans d'exécution
+
+Applique dans l'ordre les scripts database/migrations/NNN_nom.sql non encore
+appliqués et enregistre chaque version dans la table schema_version.
+Le contrôle EXPLAIN vérifie qu'aucune requête critique (HOT_QUERIES) ne
+dégénère en parcours complet de table.
+
+Usage:
+    python src/db_migrations.py migrate    # appliquer les migrations en attente
+    python src/db_migrations.py status     # afficher les versions appliquées
+    python src/db_migrations.py explain    # contrôle des plans (code retour 1 si échec)
+"""
+
+import mysql.connector
+from mysql.connector import Error
+import argparse
+import re
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DB_CONFIG
+
+MIGRATIONS_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "database", "migrations"
+)
+
+# Un parcours complet est toléré sous ce nombre de lignes estimées si un index était
+# utilisable (petites tables de test : l'optimiseur préfère alors le parcours).
+# --min-rows 0 rend le contrôle strict sur une base de développement
+EXPLAIN_MIN_ROWS = 1000
+
+# Requêtes critiques : même SQL que dans log_analyzer.py / alert_system.py / dashboard.py
+# Codes fixés par la migration 003 : SSH=1, scan_port=2 ; succes=1, echec=2, detecte=3
+HOT_QUERIES = {
+    "detect_brute_force": {
+        "sql": """
+            SELECT id_log, id_serveur, adresse_ip_source, id_utilisateur, date_heure
+            FROM logs_securite
+            WHERE id_type_log = 1
+            AND id_statut = 2
+            AND date_heure >= DATE_SUB(NOW(), INTERVAL 5 MINUTE)
+            ORDER BY adresse_ip_source, date_heure DESC
+        """,
+        "params": (),
+        "elagage": True,
+    },
+    "detect_port_scan": {
+        "sql": """
+            SELECT id_log, id_serveur, adresse_ip_source, date_heure
+            FROM logs_securite
+            WHERE id_type_log = 2
+            AND id_statut = 3
+            AND date_heure >= DATE_SUB(NOW(), INTERVAL 10 MINUTE)
+            ORDER BY adresse_ip_source, date_heure DESC
+        """,
+        "params": (),
+        "elagage": True,
+    },
+    "record_incident": {
+        "sql": """
+            SELECT id_incident, dernier_log
+            FROM incidents
+            WHERE id_regle = %s
+            AND adresse_ip_source = %s
+            AND id_serveur = %s
+            AND statut != 'resolu'
+            AND derniere_activite >= DATE_SUB(NOW(), INTERVAL 900 SECOND)
+            ORDER BY derniere_activite DESC
+            LIMIT 1
+        """,
+        "params": (1, "203.45.12.88", 1),
+    },
+    "dashboard_recent_logs": {
+        "sql": """
+            SELECT l.date_heure, s.nom_serveur, l.id_type_log,
+                   l.adresse_ip_source, l.id_utilisateur, l.id_statut, l.id_modele, l.description_param
+            FROM logs_securite l
+            JOIN serveurs s ON l.id_serveur = s.id_serveur
+            ORDER BY l.date_heure DESC, l.id_log DESC LIMIT 50
+        """,
+        "params": (),
+        "tables_autorisees": ("s",),
+    },
+    "dashboard_logs_page": {
+        "sql": """
+            SELECT l.id_log, l.date_heure, s.nom_serveur, l.id_type_log,
+                   l.adresse_ip_source, l.id_utilisateur, l.id_statut, l.id_modele, l.description_param
+            FROM logs_securite l
+            JOIN serveurs s ON l.id_serveur = s.id_serveur
+            WHERE l.id_statut = 2
+            AND (l.date_heure < NOW() OR (l.date_heure = NOW() AND l.id_log < %s))
+            ORDER BY l.date_heure DESC, l.id_log DESC
+            LIMIT 51
+        """,
+        "params": (2 ** 31,),
+        "tables_autorisees": ("s",),
+    },
+    "dashboard_recherche_logs": {
+        "sql": """
+            SELECT l.id_log, l.date_heure, s.nom_serveur, l.id_modele, l.description_param
+            FROM index_recherche_logs i
+            JOIN logs_securite l ON l.id_log = i.id_log AND l.date_heure = i.date_heure
+            JOIN serveurs s ON l.id_serveur = s.id_serveur
+            WHERE i.token = %s AND l.id_statut = 2
+            ORDER BY i.date_heure DESC, i.id_log DESC
+            LIMIT 51
+        """,
+        "params": ("root",),
+        "tables_autorisees": ("s",),
+    },
+    "dashboard_top_suspect_ips": {
+        "sql": """
+            SELECT adresse_ip_source, COUNT(*) as tentatives
+            FROM logs_securite WHERE id_statut = 2
+            GROUP BY adresse_ip_source ORDER BY tentatives DESC LIMIT 10
+        """,
+        "params": (),
+    },
+    "dashboard_ips_suspectes": {
+        "sql": "SELECT COUNT(DISTINCT adresse_ip_source) as total FROM logs_securite WHERE id_statut = 2",
+        "params": (),
+    },
+    "dashboard_incidents_page": {
+        "sql": """
+            SELECT i.id_incident, i.date_detection, i.derniere_activite, i.niveau_severite,
+                   i.statut, i.nb_evenements, i.description, s.nom_serveur, i.adresse_ip_source
+            FROM incidents i
+            LEFT JOIN serveurs s ON i.id_serveur = s.id_serveur
+            WHERE i.niveau_severite = 'critique'
+            ORDER BY i.date_detection DESC, i.id_incident DESC
+            LIMIT 51
+        """,
+        "params": (),
+        "tables_autorisees": ("s",),
+    },
+}
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+def list_migrations():
+    """Liste les fichiers de migration triés par version: [(version, nom, chemin)]"""
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = re.match(r"^(\d+)_(.+)\.sql$", filename)
+        if match:
+            migrations.append((int(match.group(1)), match.group(2), os.path.join(MIGRATIONS_DIR, filename)))
+    return sorted(migrations)
+
+
+def split_sql_statements(script):
+    """
+    Découpe un script SQL en instructions
+    Gère la directive DELIMITER (procédures, triggers) comme le client mysql
+    """
+    statements = []
+    delimiter = ";"
+    current = []
+
+    for line in script.splitlines():
+        stripped = line.strip()
+
+        if not current and (not stripped or stripped.startswith("--")):
+            continue
+
+        if stripped.upper().startswith("DELIMITER "):
+            delimiter = stripped.split(None, 1)[1]
+            continue
+
+        current.append(line)
+
+        if stripped.endswith(delimiter):
+            statement = "\n".join(current).rstrip()
+            statement = statement[: -len(delimiter)].strip()
+            if statement:
+                statements.append(statement)
+            current = []
+
+    if "\n".join(current).strip():
+        statements.append("\n".join(current).strip())
+
+    return statements
+
+
+def ensure_version_table(connection):
+    """Crée la table schema_version si elle n'existe pas"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INT PRIMARY KEY,
+            nom VARCHAR(255) NOT NULL,
+            date_application DATETIME DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    connection.commit()
+    cursor.close()
+
+
+def get_applied_versions(connection):
+    """Retourne l'ensemble des versions déjà appliquées"""
+    ensure_version_table(connection)
+    cursor = connection.cursor()
+    cursor.execute("SELECT version FROM schema_version")
+    versions = {row[0] for row in cursor.fetchall()}
+    cursor.close()
+    return versions
+
+
+def apply_migrations(connection, target=None):
+    """
+    Applique les migrations en attente jusqu'à la version cible (incluse)
+
+    Les instructions DDL de MySQL sont validées implicitement : en cas d'erreur,
+    la version n'est pas enregistrée et la migration doit être corrigée puis relancée.
+
+    Returns:
+        Liste des versions appliquées
+    """
+    applied = get_applied_versions(connection)
+    newly_applied = []
+
+    for version, nom, path in list_migrations():
+        if version in applied or (target is not None and version > target):
+            continue
+
+        print(f"→ Migration {version:03d} : {nom}")
+        with open(path, encoding="utf-8") as f:
+            statements = split_sql_statements(f.read())
+
+        cursor = connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+                if cursor.with_rows:
+                    cursor.fetchall()
+            cursor.execute(
+                "INSERT INTO schema_version (version, nom) VALUES (%s, %s)",
+                (version, nom)
+            )
+            connection.commit()
+        except Error as e:
+            connection.rollback()
+            print(f"✗ Échec de la migration {version:03d}: {e}")
+            raise
+        finally:
+            cursor.close()
+
+        print(f"  ✓ Version {version:03d} appliquée ({len(statements)} instruction(s))")
+        newly_applied.append(version)
+
+    return newly_applied
+
+
+def explain_query(connection, sql, params=()):
+    """Retourne le plan d'exécution (EXPLAIN) d'une requête sous forme de liste de dict"""
+    cursor = connection.cursor(dictionary=True)
+    cursor.execute("EXPLAIN " + sql, params)
+    plan = cursor.fetchall()
+    cursor.close()
+    return plan
+
+
+def find_full_scans(plan, tables_autorisees=(), min_rows=EXPLAIN_MIN_ROWS):
+    """
+    Retourne les lignes du plan correspondant à un parcours complet de table
+    Sans index utilisable (possible_keys vide), le parcours est signalé quelle que soit
+    la taille de la table : un index manquant se voit aussi sur une base de test
+    """
+    full_scans = []
+    for step in plan:
+        table = step.get("table") or ""
+        if table.startswith("<") or table in tables_autorisees:
+            continue  # Table dérivée/temporaire ou petite table de référence
+        if step.get("type") == "ALL" and (not step.get("possible_keys")
+                                          or (step.get("rows") or 0) >= min_rows):
+            full_scans.append(step)
+    return full_scans
+
+
+def count_partitions(connection, table):
+    """Nombre de partitions d'une table (0 si elle n'est pas partitionnée)"""
+    cursor = connection.cursor()
+    cursor.execute("""
+        SELECT COUNT(PARTITION_NAME) FROM information_schema.PARTITIONS
+        WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s
+    """, (table,))
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def find_unpruned(plan, total_partitions, table="logs_securite"):
+    """Retourne les lignes du plan qui lisent toutes les partitions (pas d'élagage)"""
+    if total_partitions <= 1:
+        return []
+    return [step for step in plan
+            if step.get("table") == table
+            and len((step.get("partitions") or "").split(",")) >= total_partitions]
+
+
+def check_hot_queries(connection, min_rows=EXPLAIN_MIN_ROWS):
+    """
+    Contrôle le plan de chaque requête critique
+    Les requêtes marquées "elagage" doivent aussi ne lire qu'une partie des partitions
+
+    Returns:
+        Dictionnaire {nom_requete: [étapes en parcours complet]} (vide si tout est indexé)
+    """
+    failures = {}
+    total_partitions = count_partitions(connection, "logs_securite")
+
+    for name, query in HOT_QUERIES.items():
+        plan = explain_query(connection, query["sql"], query.get("params", ()))
+        full_scans = find_full_scans(plan, query.get("tables_autorisees", ()), min_rows)
+        unpruned = find_unpruned(plan, total_partitions) if query.get("elagage") else []
+
+        if full_scans:
+            failures[name] = full_scans
+            print(f"✗ {name}: parcours complet sur "
+                  f"{', '.join(step['table'] for step in full_scans)}")
+        elif unpruned:
+            failures[name] = unpruned
+            print(f"✗ {name}: aucune partition élaguée ({total_partitions} lues)")
+        else:
+            keys = ", ".join(str(step.get("key")) for step in plan)
+            print(f"✓ {name}: index utilisé(s) → {keys}")
+
+    return failures
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Migrations CloudSecMonitor")
+    parser.add_argument("commande", choices=["migrate", "status", "explain"])
+    parser.add_argument("--target", type=int, default=None, help="Version cible (migrate)")
+    parser.add_argument("--min-rows", type=int, default=EXPLAIN_MIN_ROWS,
+                        help="Lignes estimées à partir desquelles un parcours complet est signalé "
+                             "même si un index était utilisable (explain ; 0 = strict)")
+    args = parser.parse_args()
+
+    connection = connect_db()
+    if not connection:
+        print("✗ Impossible de continuer sans connexion MySQL")
+        sys.exit(1)
+
+    try:
+        if args.commande == "migrate":
+            applied = apply_migrations(connection, args.target)
+            print(f"✓ {len(applied)} migration(s) appliquée(s)")
+
+        elif args.commande == "status":
+            applied = get_applied_versions(connection)
+            for version, nom, _ in list_migrations():
+                state = "✓ appliquée" if version in applied else "… en attente"
+                print(f"{version:03d} {nom:<45} {state}")
+
+        elif args.commande == "explain":
+            failures = check_hot_queries(connection, args.min_rows)
+            if failures:
+                print(f"✗ {len(failures)} requête(s) critique(s) en parcours complet")
+                sys.exit(1)
+            print("✓ Toutes les requêtes critiques utilisent un index")
+
+    except Error as e:
+        print(f"✗ Erreur MySQL: {e}")
+        sys.exit(1)
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
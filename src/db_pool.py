@@ -0,0 +1,196 @@
+"""
+CloudSecMonitor - Pool de connexions MySQL borné et thread-safe (dashboard)
+
+Chaque requête emprunte une connexion le temps d'un bloc with puis la rend :
+    - au plus `size` connexions ouvertes ; au-delà, l'appelant attend une
+      connexion libre jusqu'à `checkout_timeout` secondes (PoolTimeout)
+    - une connexion restée inactive plus de `ping_after` secondes est vérifiée
+      (ping) avant d'être prêtée ; une connexion morte est remplacée
+    - une connexion sur laquelle une erreur MySQL s'est produite est fermée
+    - autocommit activé : chaque lecture voit les données validées les plus récentes
+    - MAX_EXECUTION_TIME borne la durée des SELECT côté serveur
+
+Usage:
+    python src/db_pool.py benchmark --threads 40 --requetes 50
+"""
+
+from mysql.connector import Error
+from contextlib import contextmanager
+import mysql.connector
+import threading
+import argparse
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (DB_CONFIG, DASHBOARD_POOL_SIZE, DASHBOARD_POOL_TIMEOUT,
+                           DASHBOARD_POOL_PING_AFTER, DASHBOARD_QUERY_TIMEOUT_MS)
+
+
+class PoolTimeout(Exception):
+    """Aucune connexion libérée dans le délai d'attente"""
+
+
+class ConnectionPool:
+    """Connexions réutilisables, empruntées une requête à la fois"""
+
+    def __init__(self, config=None, size=DASHBOARD_POOL_SIZE, checkout_timeout=DASHBOARD_POOL_TIMEOUT,
+                 ping_after=DASHBOARD_POOL_PING_AFTER, query_timeout_ms=DASHBOARD_QUERY_TIMEOUT_MS):
+        self.config = dict(config or DB_CONFIG)
+        self.size = size
+        self.checkout_timeout = checkout_timeout
+        self.ping_after = ping_after
+        self.query_timeout_ms = query_timeout_ms
+        self._slots = threading.BoundedSemaphore(size)
+        self._idle = []          # (connexion, dernière utilisation), la plus récente en fin
+        self._lock = threading.Lock()
+        self._stats = {"creees": 0, "reutilisees": 0, "verifiees": 0, "remplacees": 0,
+                       "fermees": 0, "attentes_depassees": 0, "empruntees": 0}
+
+    def _count(self, name, n=1):
+        with self._lock:
+            self._stats[name] += n
+
+    def _connect(self):
+        connection = mysql.connector.connect(**self.config, autocommit=True,
+                                             connection_timeout=max(1, int(self.checkout_timeout)))
+        if self.query_timeout_ms:
+            cursor = connection.cursor()
+            cursor.execute("SET SESSION MAX_EXECUTION_TIME = %s", (int(self.query_timeout_ms),))
+            cursor.close()
+        self._count("creees")
+        return connection
+
+    @staticmethod
+    def _close(connection):
+        try:
+            connection.close()
+        except Error:
+            pass
+
+    def acquire(self):
+        """
+        Emprunte une connexion (à rendre avec release)
+
+        Raises:
+            PoolTimeout: toutes les connexions sont occupées au-delà du délai
+            mysql.connector.Error: connexion impossible
+        """
+        if not self._slots.acquire(timeout=self.checkout_timeout):
+            self._count("attentes_depassees")
+            raise PoolTimeout(f"Aucune connexion libre après {self.checkout_timeout} s "
+                              f"({self.size} connexions occupées)")
+        try:
+            while True:
+                with self._lock:
+                    connection, last_used = self._idle.pop() if self._idle else (None, None)
+                if connection is None:
+                    connection = self._connect()
+                    break
+                if time.monotonic() - last_used < self.ping_after:
+                    self._count("reutilisees")
+                    break
+                self._count("verifiees")
+                try:
+                    connection.ping(reconnect=False)
+                    self._count("reutilisees")
+                    break
+                except Error:
+                    self._close(connection)
+                    self._count("remplacees")
+        except BaseException:
+            self._slots.release()
+            raise
+        self._count("empruntees")
+        return connection
+
+    def release(self, connection, broken=False):
+        """Rend une connexion ; broken=True la ferme (état incertain après une erreur)"""
+        try:
+            if broken:
+                self._close(connection)
+                self._count("fermees")
+            else:
+                with self._lock:
+                    self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    @contextmanager
+    def connection(self):
+        """Connexion empruntée pour la durée du bloc with"""
+        connection = self.acquire()
+        broken = False
+        try:
+            yield connection
+        except BaseException:
+            # Toute erreur du bloc (pandas.errors.DatabaseError enveloppe celles du pilote,
+            # MAX_EXECUTION_TIME, interruption) laisse la connexion dans un état incertain
+            broken = True
+            raise
+        finally:
+            self.release(connection, broken)
+
+    def close_all(self):
+        """Ferme les connexions inactives"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, _ in idle:
+            self._close(connection)
+
+    def stats(self):
+        """Compteurs du pool et connexions inactives"""
+        with self._lock:
+            return dict(self._stats, inactives=len(self._idle), taille=self.size)
+
+
+def benchmark(nb_threads=40, nb_queries=50, size=DASHBOARD_POOL_SIZE):
+    """Latence d'une requête courte avec nb_threads analystes simultanés"""
+    pool = ConnectionPool(size=size)
+    latencies = []
+    lock = threading.Lock()
+
+    def analyst():
+        for _ in range(nb_queries):
+            start = time.perf_counter()
+            with pool.connection() as connection:
+                cursor = connection.cursor()
+                cursor.execute("SELECT MAX(id_log) FROM logs_securite")
+                cursor.fetchall()
+                cursor.close()
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=analyst) for _ in range(nb_threads)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    pool.close_all()
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95)] * 1000
+    print(f"{len(latencies):,} requêtes, {nb_threads} threads, pool de {size}: "
+          f"{len(latencies) / elapsed:,.0f} req/s, p50 {p50:.1f} ms, p95 {p95:.1f} ms")
+    print(f"Pool: {pool.stats()}")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Pool de connexions CloudSecMonitor")
+    parser.add_argument("commande", choices=["benchmark"])
+    parser.add_argument("--threads", type=int, default=40)
+    parser.add_argument("--requetes", type=int, default=50)
+    parser.add_argument("--taille", type=int, default=DASHBOARD_POOL_SIZE)
+    args = parser.parse_args()
+
+    benchmark(args.threads, args.requetes, args.taille)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+CloudSecMonitor - Enrichissement GeoIP / ASN des IP sources
+
+La base est un fichier binaire de plages IPv4 triées (construit à partir d'un
+fichier ip2asn TSV) :
+    en-tête  : MAGIC, nombre de plages
+    plages   : (début uint32, fin uint32, pays 2 octets, ASN uint32, offset du nom uint32)
+    noms     : noms d'organisation terminés par un octet nul
+
+Le fichier est ouvert en mémoire mappée : le démarrage ne lit que l'en-tête,
+chaque recherche est une dichotomie sur les plages. Un cache LRU (avec taux
+de succès) évite la dichotomie pour les IP déjà vues.
+
+Usage:
+    python src/geoip.py build database/geoip/exemple_ip2asn.tsv
+    python src/geoip.py lookup 203.45.12.88
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+import argparse
+import mmap
+import socket
+import struct
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import GEOIP_DATABASE, GEOIP_CACHE_SIZE
+
+MAGIC = b"CSMGEO1\0"
+HEADER = struct.Struct("<8sI")
+RECORD = struct.Struct("<II2sII")
+START = struct.Struct("<I")
+
+GeoInfo = namedtuple("GeoInfo", ["pays", "asn", "organisation"])
+
+
+def build_database(tsv_path, out_path=GEOIP_DATABASE):
+    """
+    Convertit un fichier ip2asn (range_start, range_end, AS_number, country_code,
+    AS_description) en base binaire triée
+
+    Returns:
+        Nombre de plages écrites
+    """
+    ranges = []
+    names = bytearray()
+    name_offsets = {}
+
+    with open(tsv_path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 5 or ":" in fields[0]:
+                continue  # Ligne incomplète ou plage IPv6
+            asn = int(fields[2])
+            country = fields[3] if len(fields[3]) == 2 else ""
+            if asn == 0 and not country:
+                continue  # Plage non routée
+            name = fields[4].encode("utf-8")
+            if name not in name_offsets:
+                name_offsets[name] = len(names)
+                names += name + b"\0"
+            ranges.append((
+                int.from_bytes(socket.inet_aton(fields[0]), "big"),
+                int.from_bytes(socket.inet_aton(fields[1]), "big"),
+                country.encode("ascii") or b"--",
+                asn,
+                name_offsets[name]
+            ))
+
+    ranges.sort()
+    os.makedirs(os.path.dirname(out_path) or ".", exist_ok=True)
+    tmp_path = out_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, len(ranges)))
+        for record in ranges:
+            f.write(RECORD.pack(*record))
+        f.write(names)
+    os.replace(tmp_path, out_path)
+    return len(ranges)
+
+
+class GeoIP:
+    """Base GeoIP/ASN en mémoire mappée avec cache LRU"""
+
+    def __init__(self, path=GEOIP_DATABASE, cache_size=GEOIP_CACHE_SIZE):
+        self.path = path
+        self._mm = None
+        self._count = 0
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self._count = HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path}: base GeoIP invalide")
+            self._names_offset = HEADER.size + self._count * RECORD.size
+        # Cache propre à l'instance (cache_info() fournit succès / échecs)
+        self.lookup = lru_cache(maxsize=cache_size)(self._lookup)
+
+    @property
+    def available(self):
+        return self._mm is not None
+
+    def _lookup(self, ip):
+        """Dichotomie sur les plages (sans cache)"""
+        if self._mm is None:
+            return None
+        try:
+            value = int.from_bytes(socket.inet_aton(ip), "big")
+        except (OSError, TypeError):
+            return None
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if START.unpack_from(self._mm, HEADER.size + mid * RECORD.size)[0] <= value:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo == 0:
+            return None
+
+        start, end, country, asn, name_offset = RECORD.unpack_from(
+            self._mm, HEADER.size + (lo - 1) * RECORD.size
+        )
+        if value > end:
+            return None
+        name_start = self._names_offset + name_offset
+        name = self._mm[name_start:self._mm.find(b"\0", name_start)].decode("utf-8")
+        return GeoInfo(country.decode("ascii"), asn, name)
+
+    def enrich(self, logs, ip_key="adresse_ip_source"):
+        """Ajoute code_pays et asn à une liste de logs (dict)"""
+        lookup = self.lookup
+        for log in logs:
+            info = lookup(log[ip_key])
+            log["code_pays"] = info.pays if info else None
+            log["asn"] = info.asn if info else None
+        return logs
+
+    def label(self, ip):
+        """Libellé court pour l'affichage (ex: 'AU · AS1221 ASN-TELSTRA'), '' si inconnu"""
+        info = self.lookup(ip)
+        return f"{info.pays} · AS{info.asn} {info.organisation}" if info else ""
+
+    def stats(self):
+        """Statistiques du cache LRU"""
+        info = self.lookup.cache_info()
+        total = info.hits + info.misses
+        return {
+            "plages": self._count,
+            "succes": info.hits,
+            "echecs": info.misses,
+            "taux_succes": info.hits / total if total else 0.0,
+            "taille_cache": info.currsize
+        }
+
+
+_shared_geoip = None
+
+
+def get_geoip():
+    """Instance partagée par le processus"""
+    global _shared_geoip
+    if _shared_geoip is None:
+        _shared_geoip = GeoIP()
+    return _shared_geoip
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Base GeoIP/ASN CloudSecMonitor")
+    parser.add_argument("commande", choices=["build", "lookup"])
+    parser.add_argument("valeur", help="Fichier TSV (build) ou adresse IP (lookup)")
+    parser.add_argument("--out", default=GEOIP_DATABASE)
+    args = parser.parse_args()
+
+    if args.commande == "build":
+        count = build_database(args.valeur, args.out)
+        print(f"✓ {count} plage(s) écrite(s) dans {args.out}")
+    else:
+        geoip = GeoIP(args.out)
+        if not geoip.available:
+            print(f"✗ Base absente: {args.out} (python src/geoip.py build <fichier.tsv>)")
+            sys.exit(1)
+        print(geoip.lookup(args.valeur) or f"{args.valeur}: aucune plage")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 import mysql.connector
 from mysql.connector import Error
 from datetime import datetime, timedelta
+import logging
 import sys
 import os
 import time
@@ -8,6 +9,20 @@ import time
 # Importer config et alert_system
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config.config import DB_CONFIG
+from log_archive import query_logs_range
+from log_codec import get_codec
+from correlation import CorrelationEngine, correlate_new_logs
+from log_rollup import refresh_rollups
+from log_search import refresh_index
+from query_stats import instrumented, save_snapshot
+from structured_logging import get_logger, log_event, setup_logging
+
+logger = get_logger("analyseur")
+
+# État de corrélation conservé entre deux analyses (surveillance continue)
+_correlation_engine = None
+_last_correlated_id = None
+_correlated_ids = set()    # Ids traités sous _last_correlated_id (fenêtre relue, voir correlation)
 
 
 def connect_db():
@@ -21,36 +36,44 @@ def connect_db():
         return None
 
 
+@instrumented
 def detect_brute_force(connection):
     """
     Détecte les attaques brute force SSH
     Critère: 5+ tentatives échouées en 5 minutes depuis la même IP
     """
     try:
+        codec = get_codec(connection)
         cursor = connection.cursor(dictionary=True)
         
-        # Récupérer les logs SSH échoués des 5 dernières minutes
+        # Récupérer les logs SSH échoués des 5 dernières minutes (colonnes encodées)
         query = """
         SELECT 
             id_log,
             id_serveur,
             adresse_ip_source,
-            utilisateur,
-            date_heure,
-            description
+            id_utilisateur,
+            date_heure
         FROM logs_securite
-        WHERE type_log = 'SSH'
-        AND statut = 'echec'
+        WHERE id_type_log = %s
+        AND id_statut = %s
         AND date_heure >= DATE_SUB(NOW(), INTERVAL 5 MINUTE)
         ORDER BY adresse_ip_source, date_heure DESC
         """
         
-        cursor.execute(query)
+        cursor.execute(query, (
+            codec.code(connection, 'type_log', 'SSH'),
+            codec.code(connection, 'statut', 'echec')
+        ))
         logs = cursor.fetchall()
         
         if not logs:
             return []
         
+        utilisateurs = codec.labels(connection, 'utilisateur', [log['id_utilisateur'] for log in logs])
+        for log, utilisateur in zip(logs, utilisateurs):
+            log['utilisateur'] = utilisateur
+        
         # Compter les tentatives par IP
         ip_attempts = {}
         for log in logs:
@@ -69,6 +92,7 @@ def detect_brute_force(connection):
                     'id_serveur': attempts[0]['id_serveur'],
                     'premier_log': attempts[-1]['id_log'],  # Plus ancien
                     'dernier_log': attempts[0]['id_log'],   # Plus récent
+                    'ids_logs': [a['id_log'] for a in attempts],
                     'utilisateurs': list(set([a['utilisateur'] for a in attempts if a['utilisateur']])),
                     'periode': f"{attempts[-1]['date_heure']} → {attempts[0]['date_heure']}"
                 })
@@ -81,12 +105,14 @@ def detect_brute_force(connection):
         return []
 
 
+@instrumented
 def detect_port_scan(connection):
     """
     Détecte les scans de ports massifs
     Critère: 3+ scans détectés en 10 minutes depuis la même IP
     """
     try:
+        codec = get_codec(connection)
         cursor = connection.cursor(dictionary=True)
         
         query = """
@@ -94,16 +120,18 @@ def detect_port_scan(connection):
             id_log,
             id_serveur,
             adresse_ip_source,
-            date_heure,
-            description
+            date_heure
         FROM logs_securite
-        WHERE type_log = 'scan_port'
-        AND statut = 'detecte'
+        WHERE id_type_log = %s
+        AND id_statut = %s
         AND date_heure >= DATE_SUB(NOW(), INTERVAL 10 MINUTE)
         ORDER BY adresse_ip_source, date_heure DESC
         """
         
-        cursor.execute(query)
+        cursor.execute(query, (
+            codec.code(connection, 'type_log', 'scan_port'),
+            codec.code(connection, 'statut', 'detecte')
+        ))
         logs = cursor.fetchall()
         
         if not logs:
@@ -126,7 +154,8 @@ def detect_port_scan(connection):
                     'nb_scans': len(scans),
                     'id_serveur': scans[0]['id_serveur'],
                     'premier_log': scans[-1]['id_log'],
-                    'dernier_log': scans[0]['id_log']
+                    'dernier_log': scans[0]['id_log'],
+                    'ids_logs': [s['id_log'] for s in scans]
                 })
         
         cursor.close()
@@ -137,6 +166,7 @@ def detect_port_scan(connection):
         return []
 
 
+@instrumented
 def get_server_name(connection, id_serveur):
     """Récupère le nom du serveur depuis son ID"""
     try:
@@ -150,114 +180,209 @@ def get_server_name(connection, id_serveur):
         return f"Serveur {id_serveur}"
 
 
-def check_if_incident_exists(connection, id_log, id_regle):
-    """Vérifie si un incident existe déjà pour ce log et cette règle"""
-    try:
-        cursor = connection.cursor()
-        query = """
-        SELECT COUNT(*) FROM incidents 
-        WHERE id_log = %s AND id_regle = %s
-        """
-        cursor.execute(query, (id_log, id_regle))
-        count = cursor.fetchone()[0]
-        cursor.close()
-        return count > 0
-    except:
-        return False
+@instrumented
+def _record(connection, attack, id_regle, type_incident, description, niveau_severite):
+    """
+    Enregistre une détection dans l'incident de sa campagne (voir record_incident)
+    
+    Returns:
+        1 si un nouvel incident a été créé, 0 sinon
+    """
+    from alert_system import record_incident
+    
+    incident_id, created = record_incident(
+        connection,
+        id_regle,
+        attack['ip_source'],
+        attack['id_serveur'],
+        attack['ids_logs'],
+        type_incident,
+        description,
+        niveau_severite,
+        nb_events=attack.get('nb_evenements')
+    )
+    if created:
+        log_event(logger, logging.INFO, "   ✓ Incident créé dans la base de données",
+                  incident=incident_id, ip=attack['ip_source'])
+        return 1
+    if incident_id:
+        log_event(logger, logging.DEBUG, "   ↻ Incident de la campagne mis à jour",
+                  incident=incident_id, ip=attack['ip_source'])
+    else:
+        log_event(logger, logging.DEBUG, "   ℹ️  Aucun nouvel événement depuis la dernière analyse",
+                  ip=attack['ip_source'])
+    return 0
 
 
+@instrumented
 def analyze_logs(connection):
     """
     Fonction principale d'analyse
     Appelle les fonctions de détection et crée des incidents
+    Les messages passent par la journalisation structurée (non bloquante)
     """
-    print("\n" + "="*60)
-    print("   ANALYSE DES LOGS EN COURS...")
-    print("="*60)
+    log_event(logger, logging.INFO, "ANALYSE DES LOGS EN COURS...")
     
     total_incidents = 0
     
     # 1. Détection Brute Force
-    print("\n🔍 Recherche d'attaques Brute Force SSH...")
     brute_force_attacks = detect_brute_force(connection)
     
     if brute_force_attacks:
-        print(f"⚠️  {len(brute_force_attacks)} attaque(s) brute force détectée(s)!")
+        log_event(logger, logging.WARNING, f"⚠️  {len(brute_force_attacks)} attaque(s) brute force détectée(s)!")
         
         for attack in brute_force_attacks:
-            server_name = get_server_name(connection, attack['id_serveur'])
+            log_event(logger, logging.WARNING, "🔴 ATTAQUE DÉTECTÉE: Brute Force SSH",
+                      ip=attack['ip_source'],
+                      serveur=get_server_name(connection, attack['id_serveur']),
+                      tentatives=attack['nb_tentatives'],
+                      utilisateurs=attack['utilisateurs'],
+                      periode=attack['periode'])
             
-            print(f"\n🔴 ATTAQUE DÉTECTÉE:")
-            print(f"   IP Source: {attack['ip_source']}")
-            print(f"   Serveur: {server_name}")
-            print(f"   Tentatives: {attack['nb_tentatives']}")
-            print(f"   Utilisateurs testés: {', '.join(attack['utilisateurs'])}")
-            print(f"   Période: {attack['periode']}")
-            
-            # Vérifier si incident existe déjà
-            if not check_if_incident_exists(connection, attack['dernier_log'], 1):
-                # Créer l'incident via alert_system
-                from alert_system import create_incident
-                
-                description = f"Attaque Brute Force SSH détectée - {attack['nb_tentatives']} tentatives depuis {attack['ip_source']}"
-                
-                if create_incident(
-                    connection,
-                    attack['dernier_log'],
-                    1,  # id_regle pour Brute Force SSH
-                    "Brute Force SSH",
-                    description,
-                    'critique'
-                ):
-                    print(f"   ✓ Incident créé dans la base de données")
-                    total_incidents += 1
-            else:
-                print(f"   ℹ️  Incident déjà enregistré pour cette attaque")
+            # Incident de la campagne (règle, IP, serveur) : créé ou mis à jour sur place
+            description = f"Attaque Brute Force SSH détectée - {attack['nb_tentatives']} tentatives depuis {attack['ip_source']}"
+            total_incidents += _record(connection, attack, 1, "Brute Force SSH", description, 'critique')
     else:
-        print("✓ Aucune attaque brute force détectée")
+        log_event(logger, logging.INFO, "✓ Aucune attaque brute force détectée")
     
     # 2. Détection Port Scan
-    print("\n🔍 Recherche de scans de ports...")
     port_scans = detect_port_scan(connection)
     
     if port_scans:
-        print(f"⚠️  {len(port_scans)} scan(s) de ports détecté(s)!")
+        log_event(logger, logging.WARNING, f"⚠️  {len(port_scans)} scan(s) de ports détecté(s)!")
         
         for scan in port_scans:
-            server_name = get_server_name(connection, scan['id_serveur'])
+            log_event(logger, logging.WARNING, "🟠 SCAN DÉTECTÉ",
+                      ip=scan['ip_source'],
+                      serveur=get_server_name(connection, scan['id_serveur']),
+                      scans=scan['nb_scans'])
             
-            print(f"\n🟠 SCAN DÉTECTÉ:")
-            print(f"   IP Source: {scan['ip_source']}")
-            print(f"   Serveur: {server_name}")
-            print(f"   Nombre de scans: {scan['nb_scans']}")
+            description = f"Scan de ports massif détecté - {scan['nb_scans']} scans depuis {scan['ip_source']}"
+            total_incidents += _record(connection, scan, 2, "Port Scan Detection", description, 'moyen')
+    else:
+        log_event(logger, logging.INFO, "✓ Aucun scan de ports détecté")
+    
+    # 3. Corrélation multi-étapes (automates par IP source)
+    global _correlation_engine, _last_correlated_id, _correlated_ids
+    if _correlation_engine is None:
+        _correlation_engine = CorrelationEngine()
+    campaigns, _last_correlated_id, _correlated_ids = correlate_new_logs(
+        connection, _correlation_engine, _last_correlated_id, _correlated_ids
+    )
+    
+    if campaigns:
+        log_event(logger, logging.WARNING, f"⚠️  {len(campaigns)} campagne(s) d'attaque complète(s)!")
+        
+        for campaign in campaigns:
+            log_event(logger, logging.ERROR, f"🔴 CAMPAGNE DÉTECTÉE: {campaign['nom']}",
+                      ip=campaign['ip_source'],
+                      serveur=get_server_name(connection, campaign['id_serveur']),
+                      periode=campaign['periode'])
             
-            if not check_if_incident_exists(connection, scan['dernier_log'], 2):
-                from alert_system import create_incident
-                
-                description = f"Scan de ports massif détecté - {scan['nb_scans']} scans depuis {scan['ip_source']}"
-                
-                if create_incident(
-                    connection,
-                    scan['dernier_log'],
-                    2,  # id_regle pour Port Scan
-                    "Port Scan Detection",
-                    description,
-                    'moyen'
-                ):
-                    print(f"   ✓ Incident créé dans la base de données")
-                    total_incidents += 1
-            else:
-                print(f"   ℹ️  Incident déjà enregistré pour ce scan")
+            description = (f"Campagne multi-étapes '{campaign['nom']}' - {campaign['nb_etapes']} étapes, "
+                           f"{campaign['nb_evenements']} événements depuis {campaign['ip_source']} (logs #{campaign['premier_log']} → "
+                           f"#{campaign['dernier_log']})")
+            # Bornes de la campagne ; nb_evenements donne le nombre réel de logs
+            campaign['ids_logs'] = [campaign['premier_log'], campaign['dernier_log']]
+            total_incidents += _record(connection, campaign, campaign['id_regle'],
+                                       "Campagne multi-étapes", description, campaign['severite'])
     else:
-        print("✓ Aucun scan de ports détecté")
+        log_event(logger, logging.INFO, "✓ Aucune séquence d'attaque complète")
     
-    print("\n" + "="*60)
-    print(f"✓ ANALYSE TERMINÉE - {total_incidents} nouveau(x) incident(s) créé(s)")
-    print("="*60)
+    # 4. Agrégats temporels (séries du dashboard) et index de recherche des descriptions
+    refresh_rollups(connection)
+    refresh_index(connection)
+    
+    # 5. Chronométrage des requêtes du cycle, lu par la page Performance du dashboard
+    try:
+        save_snapshot("analyseur")
+    except OSError as e:
+        log_event(logger, logging.WARNING, f"⚠️  Instantané des requêtes non écrit: {e}")
+    
+    log_event(logger, logging.INFO, f"✓ ANALYSE TERMINÉE - {total_incidents} nouveau(x) incident(s) créé(s)",
+              nouveaux_incidents=total_incidents)
     
     return total_incidents
 
 
+def find_bursts(logs, window_seconds, threshold):
+    """
+    Détecte les rafales d'événements par IP sur une période quelconque
+    Critère: threshold+ événements en window_seconds depuis la même IP
+    (fenêtre glissante ; les fenêtres qui se chevauchent forment une seule rafale)
+    """
+    ip_events = {}
+    for log in sorted(logs, key=lambda l: (l['date_heure'], l['id_log'])):
+        ip_events.setdefault(log['adresse_ip_source'], []).append(log)
+
+    bursts = []
+    for ip, events in ip_events.items():
+        burst_start = None
+        burst_end = None
+        left = 0
+        for right in range(len(events)):
+            while (events[right]['date_heure'] - events[left]['date_heure']).total_seconds() > window_seconds:
+                left += 1
+            if right - left + 1 < threshold:
+                continue
+            if burst_start is not None and left <= burst_end:
+                burst_end = right
+            else:
+                if burst_start is not None:
+                    bursts.append(_burst_summary(ip, events[burst_start:burst_end + 1]))
+                burst_start, burst_end = left, right
+        if burst_start is not None:
+            bursts.append(_burst_summary(ip, events[burst_start:burst_end + 1]))
+
+    return bursts
+
+
+def _burst_summary(ip, events):
+    """Résumé d'une rafale (même format que detect_brute_force)"""
+    return {
+        'ip_source': ip,
+        'nb_tentatives': len(events),
+        'id_serveur': events[-1]['id_serveur'],
+        'premier_log': events[0]['id_log'],
+        'dernier_log': events[-1]['id_log'],
+        'utilisateurs': list(set([e['utilisateur'] for e in events if e.get('utilisateur')])),
+        'periode': f"{events[0]['date_heure']} → {events[-1]['date_heure']}"
+    }
+
+
+@instrumented
+def retro_analysis(connection, start, end):
+    """
+    Analyse rétrospective d'une période passée
+    Lit MySQL et, pour les journées hors rétention, l'archive froide
+    Les attaques sont signalées sans créer d'incident (logs éventuellement archivés)
+    """
+    print("\n" + "="*60)
+    print(f"   ANALYSE RÉTROSPECTIVE {start:%Y-%m-%d %H:%M} → {end:%Y-%m-%d %H:%M}")
+    print("="*60)
+
+    ssh_failures = query_logs_range(connection, start, end, {'type_log': 'SSH', 'statut': 'echec'})
+    port_scans = query_logs_range(connection, start, end, {'type_log': 'scan_port', 'statut': 'detecte'})
+    print(f"\n📂 {len(ssh_failures)} échec(s) SSH et {len(port_scans)} scan(s) de ports sur la période")
+
+    brute_force_attacks = find_bursts(ssh_failures, 5 * 60, 5)
+    for attack in brute_force_attacks:
+        print(f"\n🔴 BRUTE FORCE: {attack['ip_source']} - {attack['nb_tentatives']} tentatives")
+        print(f"   Période: {attack['periode']}")
+        print(f"   Utilisateurs testés: {', '.join(attack['utilisateurs'])}")
+
+    scan_attacks = find_bursts(port_scans, 10 * 60, 3)
+    for scan in scan_attacks:
+        print(f"\n🟠 SCAN: {scan['ip_source']} - {scan['nb_tentatives']} scans")
+        print(f"   Période: {scan['periode']}")
+
+    print("\n" + "="*60)
+    print(f"✓ {len(brute_force_attacks)} brute force, {len(scan_attacks)} scan(s) sur la période")
+    print("="*60)
+
+    return brute_force_attacks, scan_attacks
+
+
 def continuous_monitoring(interval=30):
     """
     Mode de surveillance continue
@@ -293,6 +418,7 @@ def continuous_monitoring(interval=30):
 
 def main():
     """Fonction principale"""
+    setup_logging()
     print("=" * 60)
     print("   CLOUDSECMONITOR - ANALYSEUR DE LOGS")
     print("=" * 60)
@@ -306,14 +432,23 @@ def main():
         print("\n📋 MODE D'ANALYSE:")
         print("1. Analyse unique (maintenant)")
         print("2. Surveillance continue (toutes les 30 secondes)")
+        print("3. Analyse rétrospective d'une période (archives incluses)")
         
-        choice = input("\nVotre choix (1/2): ").strip()
+        choice = input("\nVotre choix (1/2/3): ").strip()
         
         if choice == "1":
             analyze_logs(connection)
         elif choice == "2":
             connection.close()  # Fermer pour rouvrir dans continuous_monitoring
             continuous_monitoring(30)
+        elif choice == "3":
+            start = input("Début (AAAA-MM-JJ): ").strip()
+            end = input("Fin exclue (AAAA-MM-JJ): ").strip()
+            retro_analysis(
+                connection,
+                datetime.strptime(start, "%Y-%m-%d"),
+                datetime.strptime(end, "%Y-%m-%d")
+            )
         else:
             print("✗ Choix invalide")
         
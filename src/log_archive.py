@@ -0,0 +1,511 @@
+"""
+CloudSecMonitor - Archive froide des logs de sécurité
+
+Exporte les journées closes de logs_securite dans des fichiers colonnes
+compressés (un fichier par jour : archive/logs_AAAAMMJJ.csma) :
+    * entiers (id_log, date_heure) : encodage delta + zlib
+    * chaînes (type_log, statut, IP, utilisateur, description) et id_serveur :
+      dictionnaire + codes entiers + zlib
+    * en-tête JSON : nombre de lignes, min/max de date_heure et id_log,
+      filtre de Bloom des IP sources
+
+Les lectures passent par mmap : seul l'en-tête est lu pour écarter un fichier
+(période, IP absente du filtre de Bloom, valeur absente du dictionnaire), puis
+seules les colonnes nécessaires sont décompressées.
+
+Usage:
+    python src/log_archive.py archive --start AAAA-MM-JJ --end AAAA-MM-JJ
+    python src/log_archive.py info
+"""
+
+import mysql.connector
+from mysql.connector import Error
+from array import array
+from datetime import date, datetime, timedelta
+import argparse
+import hashlib
+import base64
+import json
+import mmap
+import struct
+import zlib
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DB_CONFIG, ARCHIVE_DIR, ARCHIVE_FETCH_SIZE
+from log_codec import get_codec
+
+MAGIC = b"CSMARCH1"
+FILE_PREFIX = "logs_"
+FILE_SUFFIX = ".csma"
+
+INT_COLUMNS = ["id_log", "date_heure"]
+DICT_COLUMNS = ["id_serveur", "type_log", "adresse_ip_source", "utilisateur", "statut", "description"]
+COLUMNS = INT_COLUMNS + DICT_COLUMNS
+
+BLOOM_BITS_PER_ITEM = 10
+BLOOM_HASHES = 7
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+# ========================================
+# FILTRE DE BLOOM
+# ========================================
+
+def _bloom_positions(value, nb_bits, nb_hashes):
+    """Positions des bits (double hachage sur un condensé blake2b)"""
+    digest = hashlib.blake2b(value.encode("utf-8"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % nb_bits for i in range(nb_hashes)]
+
+
+def build_bloom(values):
+    """Construit un filtre de Bloom sérialisable pour un ensemble de valeurs"""
+    nb_bits = max(64, len(values) * BLOOM_BITS_PER_ITEM)
+    bits = bytearray((nb_bits + 7) // 8)
+    for value in values:
+        for pos in _bloom_positions(value, nb_bits, BLOOM_HASHES):
+            bits[pos >> 3] |= 1 << (pos & 7)
+    return {"m": nb_bits, "k": BLOOM_HASHES, "bits": base64.b64encode(bytes(bits)).decode("ascii")}
+
+
+def bloom_might_contain(bloom, bits, value):
+    """False si la valeur est certainement absente, True si elle est peut-être présente"""
+    return all(bits[pos >> 3] & (1 << (pos & 7))
+               for pos in _bloom_positions(value, bloom["m"], bloom["k"]))
+
+
+# ========================================
+# ÉCRITURE
+# ========================================
+
+def archive_path(day, archive_dir=ARCHIVE_DIR):
+    """Chemin du fichier d'archive d'une journée"""
+    return os.path.join(archive_dir, f"{FILE_PREFIX}{day.strftime('%Y%m%d')}{FILE_SUFFIX}")
+
+
+class ColumnBuilder:
+    """
+    Colonnes d'une journée construites par blocs de lignes, sans garder les lignes :
+    entiers en delta compressés au fil de l'eau, chaînes en dictionnaire + codes entiers
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self._previous = dict.fromkeys(INT_COLUMNS, 0)
+        self._streams = {name: zlib.compressobj(6) for name in INT_COLUMNS}
+        self._int_blocks = {name: [] for name in INT_COLUMNS}
+        self._bounds = {}      # Colonne entière -> [min, max]
+        self._dictionaries = {name: {} for name in DICT_COLUMNS}
+        self._codes = {name: array("I") for name in DICT_COLUMNS}
+
+    def add(self, rows):
+        """Ajoute un bloc de lignes (dict) triées par id_log"""
+        if not rows:
+            return
+        self.rows += len(rows)
+        for name in INT_COLUMNS:
+            values = [row[name] for row in rows]
+            if name == "date_heure":
+                values = [int(d.timestamp()) for d in values]
+            deltas = array("q")
+            previous = self._previous[name]
+            for value in values:
+                deltas.append(value - previous)
+                previous = value
+            self._previous[name] = previous
+            self._int_blocks[name].append(self._streams[name].compress(deltas.tobytes()))
+            bounds = self._bounds.setdefault(name, [values[0], values[0]])
+            bounds[0], bounds[1] = min(bounds[0], min(values)), max(bounds[1], max(values))
+
+        for name in DICT_COLUMNS:
+            dictionary, codes = self._dictionaries[name], self._codes[name]
+            for row in rows:
+                value = row[name]
+                code = dictionary.get(value)
+                if code is None:
+                    code = dictionary[value] = len(dictionary)
+                codes.append(code)
+
+    def encode_ints(self, name):
+        """Bloc compressé d'une colonne d'entiers (delta + zlib)"""
+        return b"".join(self._int_blocks.pop(name)) + self._streams.pop(name).flush()
+
+    def encode_dict(self, name):
+        """(dictionnaire compressé, codes compressés, typecode) d'une colonne de chaînes"""
+        dictionary, codes = self._dictionaries[name], self._codes.pop(name)
+        typecode = "H" if len(dictionary) <= 0xFFFF else "I"
+        if typecode == "H":
+            codes = array("H", codes)
+        entries = json.dumps(list(dictionary), ensure_ascii=False).encode("utf-8")
+        return zlib.compress(entries, 6), zlib.compress(codes.tobytes(), 6), typecode
+
+    def bounds(self, name):
+        return self._bounds.get(name, [None, None])
+
+    def distinct(self, name):
+        return self._dictionaries[name].keys()
+
+
+def write_archive(path, day, chunks):
+    """
+    Écrit un fichier d'archive à partir de blocs de lignes (dict) triées par id_log
+    Seules les colonnes encodées restent en mémoire (ColumnBuilder), pas les lignes
+
+    L'écriture passe par un fichier temporaire renommé : un fichier présent est toujours complet.
+    """
+    columns = ColumnBuilder()
+    for rows in chunks:
+        columns.add(rows)
+
+    blocks = []
+    header_columns = {}
+    offset = 0
+
+    for name in INT_COLUMNS:
+        block = columns.encode_ints(name)
+        header_columns[name] = {"encodage": "delta", "offset": offset, "taille": len(block)}
+        blocks.append(block)
+        offset += len(block)
+
+    for name in DICT_COLUMNS:
+        dict_block, codes_block, typecode = columns.encode_dict(name)
+        header_columns[name] = {
+            "encodage": "dictionnaire", "typecode": typecode,
+            "dict_offset": offset, "dict_taille": len(dict_block),
+            "offset": offset + len(dict_block), "taille": len(codes_block)
+        }
+        blocks.extend([dict_block, codes_block])
+        offset += len(dict_block) + len(codes_block)
+
+    min_date, max_date = columns.bounds("date_heure")
+    min_id, max_id = columns.bounds("id_log")
+    header = {
+        "jour": day.isoformat(),
+        "lignes": columns.rows,
+        "min_date": min_date,
+        "max_date": max_date,
+        "min_id": min_id,
+        "max_id": max_id,
+        "bloom_ip": build_bloom(columns.distinct("adresse_ip_source")),
+        "colonnes": header_columns
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        for block in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)
+    return header
+
+
+def fetch_day_chunks(connection, day, size=ARCHIVE_FETCH_SIZE):
+    """Logs décodés d'une journée par blocs de size lignes (curseur non bufferisé, ordre id_log)"""
+    cursor = connection.cursor(dictionary=True, buffered=False)
+    query = """
+    SELECT id_log, date_heure, id_serveur, type_log, adresse_ip_source,
+           utilisateur, statut, description
+    FROM v_logs_securite
+    WHERE date_heure >= %s AND date_heure < %s
+    ORDER BY id_log
+    """
+    try:
+        cursor.execute(query, (day, day + timedelta(days=1)))
+        while True:
+            rows = cursor.fetchmany(size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def archive_day(connection, day, archive_dir=ARCHIVE_DIR, overwrite=False):
+    """
+    Archive une journée close de logs_securite
+
+    Returns:
+        Nombre de lignes archivées (None si déjà archivée ou journée non close)
+    """
+    if day >= date.today():
+        print(f"✗ {day} n'est pas une journée close")
+        return None
+
+    path = archive_path(day, archive_dir)
+    if os.path.exists(path) and not overwrite:
+        return None
+
+    header = write_archive(path, day, fetch_day_chunks(connection, day))
+    print(f"✓ {day}: {header['lignes']} log(s) archivé(s) → {os.path.basename(path)} "
+          f"({os.path.getsize(path) / 1024:.1f} Ko)")
+    return header['lignes']
+
+
+def archive_range(connection, start, end, archive_dir=ARCHIVE_DIR):
+    """Archive chaque journée close de [start, end) non encore archivée"""
+    archived = 0
+    day = start
+    while day < end and day < date.today():
+        count = archive_day(connection, day, archive_dir)
+        if count is not None:
+            archived += 1
+        day += timedelta(days=1)
+    return archived
+
+
+# ========================================
+# LECTURE (MMAP)
+# ========================================
+
+class ArchiveFile:
+    """Fichier d'archive ouvert en mémoire mappée ; colonnes décodées à la demande"""
+
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mm[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError(f"{path}: fichier d'archive invalide")
+        header_size = struct.unpack_from("<I", self._mm, len(MAGIC))[0]
+        start = len(MAGIC) + 4
+        self.header = json.loads(self._mm[start:start + header_size])
+        self._data_offset = start + header_size
+        self._bloom_bits = base64.b64decode(self.header["bloom_ip"]["bits"])
+        self._columns = {}
+        self._dictionaries = {}
+
+    def close(self):
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _block(self, offset, size):
+        start = self._data_offset + offset
+        return zlib.decompress(memoryview(self._mm)[start:start + size])
+
+    def overlaps(self, start_ts, end_ts):
+        """True si le fichier contient des lignes dans [start_ts, end_ts)"""
+        return (self.header["lignes"] > 0
+                and self.header["max_date"] >= start_ts
+                and self.header["min_date"] < end_ts)
+
+    def might_contain_ip(self, ip):
+        return bloom_might_contain(self.header["bloom_ip"], self._bloom_bits, ip)
+
+    def dictionary(self, name):
+        """Dictionnaire d'une colonne encodée"""
+        if name not in self._dictionaries:
+            meta = self.header["colonnes"][name]
+            self._dictionaries[name] = json.loads(self._block(meta["dict_offset"], meta["dict_taille"]))
+        return self._dictionaries[name]
+
+    def codes(self, name):
+        """Codes bruts d'une colonne (entiers, sans décodage du dictionnaire)"""
+        if name not in self._columns:
+            meta = self.header["colonnes"][name]
+            raw = self._block(meta["offset"], meta["taille"])
+            if meta["encodage"] == "delta":
+                values = array("q")
+                values.frombytes(raw)
+                total = 0
+                for i, delta in enumerate(values):
+                    total += delta
+                    values[i] = total
+            else:
+                values = array(meta["typecode"])
+                values.frombytes(raw)
+            self._columns[name] = values
+        return self._columns[name]
+
+    def value(self, name, index):
+        """Valeur décodée d'une colonne à une ligne donnée"""
+        if name in INT_COLUMNS:
+            return self.codes(name)[index]
+        return self.dictionary(name)[self.codes(name)[index]]
+
+
+def list_archive_files(start_day, end_day, archive_dir=ARCHIVE_DIR):
+    """Fichiers d'archive des journées de [start_day, end_day], du plus récent au plus ancien"""
+    if not os.path.isdir(archive_dir):
+        return []
+    files = []
+    for filename in os.listdir(archive_dir):
+        if not (filename.startswith(FILE_PREFIX) and filename.endswith(FILE_SUFFIX)):
+            continue
+        day = datetime.strptime(filename[len(FILE_PREFIX):-len(FILE_SUFFIX)], "%Y%m%d").date()
+        if start_day <= day <= end_day:
+            files.append((day, os.path.join(archive_dir, filename)))
+    return [path for _, path in sorted(files, reverse=True)]
+
+
+def query_archive(start, end, filtres=None, limit=None, archive_dir=ARCHIVE_DIR):
+    """
+    Lit les logs archivés de [start, end), du plus récent au plus ancien
+
+    Args:
+        start, end: bornes datetime
+        filtres: égalités sur les colonnes (ex: {"type_log": "SSH", "adresse_ip_source": "1.2.3.4"})
+        limit: nombre maximal de lignes
+
+    Returns:
+        Liste de dict (mêmes colonnes que logs_securite)
+    """
+    filtres = {k: v for k, v in (filtres or {}).items() if v is not None}
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+    results = []
+
+    for path in list_archive_files(start.date(), end.date(), archive_dir):
+        with ArchiveFile(path) as archive:
+            # Élimination par les métadonnées, sans décompresser de colonne
+            if not archive.overlaps(start_ts, end_ts):
+                continue
+            ip = filtres.get("adresse_ip_source")
+            if ip is not None and not archive.might_contain_ip(ip):
+                continue
+
+            wanted_codes = {}
+            for name, value in filtres.items():
+                dictionary = archive.dictionary(name)
+                if value not in dictionary:
+                    break
+                wanted_codes[name] = dictionary.index(value)
+            else:
+                dates = archive.codes("date_heure")
+                filter_columns = [(archive.codes(name), code) for name, code in wanted_codes.items()]
+
+                for i in range(len(dates) - 1, -1, -1):
+                    if not start_ts <= dates[i] < end_ts:
+                        continue
+                    if any(codes[i] != code for codes, code in filter_columns):
+                        continue
+                    row = {name: archive.value(name, i) for name in COLUMNS}
+                    row["date_heure"] = datetime.fromtimestamp(row["date_heure"])
+                    results.append(row)
+                    if limit is not None and len(results) >= limit:
+                        break
+
+        if limit is not None and len(results) >= limit:
+            break
+
+    results.sort(key=lambda r: (r["date_heure"], r["id_log"]), reverse=True)
+    return results[:limit] if limit is not None else results
+
+
+def get_hot_boundary(connection):
+    """Plus ancienne date encore présente dans logs_securite (None si table vide)"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT MIN(date_heure) FROM logs_securite")
+    result = cursor.fetchone()[0]
+    cursor.close()
+    return result
+
+
+def query_logs_range(connection, start, end, filtres=None, limit=None, archive_dir=ARCHIVE_DIR):
+    """
+    Logs de [start, end) depuis MySQL et, pour la partie antérieure aux données
+    chaudes, depuis l'archive froide (sans doublon)
+
+    Returns:
+        Liste de dict triée par date_heure décroissante
+    """
+    filtres = {k: v for k, v in (filtres or {}).items() if v is not None}
+    boundary = get_hot_boundary(connection) or end
+
+    rows = []
+    if end > boundary:
+        codec = get_codec(connection)
+        conditions = ["date_heure >= %s", "date_heure < %s"]
+        params = [max(start, boundary), end]
+        for name, value in filtres.items():
+            if name in ("type_log", "statut", "utilisateur"):
+                # Filtre sur le code : un libellé inconnu ne peut correspondre à aucun log
+                code = codec.code(connection, name, value, create=False)
+                conditions.append(f"id_{name} = %s" if code is not None else "FALSE")
+                params += [code] if code is not None else []
+            else:
+                conditions.append(f"{name} = %s")
+                params.append(value)
+
+        query = f"""
+        SELECT id_log, date_heure, id_serveur, id_type_log, adresse_ip_source,
+               id_utilisateur, id_statut, id_modele, description_param
+        FROM logs_securite
+        WHERE {' AND '.join(conditions)}
+        ORDER BY date_heure DESC, id_log DESC
+        """
+        if limit is not None:
+            query += " LIMIT %s"
+            params.append(limit)
+
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(query, params)
+        rows = [codec.decode_row(connection, row) for row in cursor.fetchall()]
+        cursor.close()
+
+    remaining = None if limit is None else limit - len(rows)
+    if start < boundary and (remaining is None or remaining > 0):
+        rows += query_archive(start, min(end, boundary), filtres, remaining, archive_dir)
+
+    return rows
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Archive froide des logs CloudSecMonitor")
+    parser.add_argument("commande", choices=["archive", "info"])
+    parser.add_argument("--start", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date())
+    parser.add_argument("--end", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        help="Jour exclu (défaut: aujourd'hui)")
+    args = parser.parse_args()
+
+    if args.commande == "info":
+        for path in list_archive_files(date.min, date.max):
+            with ArchiveFile(path) as archive:
+                print(f"{os.path.basename(path)}: {archive.header['lignes']} lignes, "
+                      f"{os.path.getsize(path) / 1024:.1f} Ko")
+        return
+
+    connection = connect_db()
+    if not connection:
+        print("✗ Impossible de continuer sans connexion MySQL")
+        sys.exit(1)
+
+    try:
+        start = args.start or (date.today() - timedelta(days=1))
+        end = args.end or date.today()
+        count = archive_range(connection, start, end)
+        print(f"✓ {count} journée(s) archivée(s)")
+    except Error as e:
+        print(f"✗ Erreur archivage: {e}")
+        sys.exit(1)
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+CloudSecMonitor - Encodage dictionnaire des colonnes de logs_securite
+
+type_log, statut et utilisateur sont stockés sous forme de codes entiers
+(tables ref_*), description sous forme d'un modèle (ref_modeles_description)
+et d'un paramètre (migration 003).
+
+LogCodec garde en cache les deux sens de chaque dictionnaire :
+    * collecteur : libellé → code (les valeurs inconnues sont ajoutées à la table,
+      sur une connexion dédiée en autocommit : la transaction de l'appelant n'est
+      jamais validée à sa place)
+    * analyseur / dashboard : code → libellé (rechargement si un code est inconnu)
+"""
+
+import mysql.connector
+import threading
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DB_CONFIG
+
+# colonne logique → (table de référence, colonne code, colonne libellé)
+REFERENCES = {
+    "type_log": ("ref_types_log", "id_type_log", "libelle"),
+    "statut": ("ref_statuts", "id_statut", "libelle"),
+    "utilisateur": ("ref_utilisateurs", "id_utilisateur", "libelle"),
+    "description": ("ref_modeles_description", "id_modele", "modele"),
+}
+
+# Modèle générique : description libre stockée entièrement dans le paramètre
+GENERIC_TEMPLATE = "{}"
+
+
+def render_description(template, param):
+    """Reconstitue une description à partir de son modèle et de son paramètre"""
+    if template is None:
+        return param
+    if param is None:
+        return template
+    return template.replace("{}", str(param), 1)
+
+
+class LogCodec:
+    """Dictionnaires libellé ↔ code des colonnes encodées de logs_securite"""
+
+    def __init__(self, connection=None):
+        self._codes = {column: {} for column in REFERENCES}
+        self._labels = {column: {} for column in REFERENCES}
+        self._missing = {column: set() for column in REFERENCES}    # Libellés absents (create=False)
+        self._lock = threading.Lock()
+        self._writer = None    # Connexion autocommit des ajouts aux tables de référence
+        self._writer_lock = threading.Lock()
+        if connection is not None:
+            self.load(connection)
+
+    def load(self, connection, columns=None):
+        """(Re)charge les dictionnaires depuis les tables de référence"""
+        cursor = connection.cursor()
+        for column in columns or REFERENCES:
+            table, code_col, label_col = REFERENCES[column]
+            cursor.execute(f"SELECT {code_col}, {label_col} FROM {table}")
+            rows = cursor.fetchall()
+            with self._lock:
+                self._codes[column] = {label: code for code, label in rows}
+                self._labels[column] = {code: label for code, label in rows}
+                self._missing[column] = set()
+        cursor.close()
+
+    def code(self, connection, column, label, create=True):
+        """
+        Code d'un libellé (None si le libellé est None)
+        Un libellé inconnu est ajouté à la table de référence si create=True (connexion
+        dédiée, voir _create) ; sinon None, mémorisé jusqu'au prochain rechargement
+        """
+        if label is None:
+            return None
+        code = self._codes[column].get(label)
+        if code is not None:
+            return code
+        if create:
+            return self._create(column, label)
+        if label in self._missing[column]:
+            return None
+
+        self.load(connection, [column])
+        code = self._codes[column].get(label)
+        if code is None:
+            with self._lock:
+                self._missing[column].add(label)
+        return code
+
+    def _create(self, column, label):
+        """
+        Ajoute un libellé à sa table de référence et retourne son code
+        Insertion et relecture sur la connexion autocommit du codec : la transaction
+        ouverte par l'appelant (lot de logs, verrou d'incident) n'est ni validée ni
+        tenue de voir la nouvelle ligne dans son instantané
+        """
+        table, code_col, label_col = REFERENCES[column]
+        with self._writer_lock:
+            if self._writer is None or not self._writer.is_connected():
+                self._writer = mysql.connector.connect(**DB_CONFIG, autocommit=True)
+            cursor = self._writer.cursor()
+            try:
+                cursor.execute(f"INSERT IGNORE INTO {table} ({label_col}) VALUES (%s)", (label,))
+                cursor.execute(f"SELECT {code_col} FROM {table} WHERE {label_col} = %s", (label,))
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+        if row is None:
+            return None
+        with self._lock:
+            self._codes[column][label] = row[0]
+            self._labels[column][row[0]] = label
+            self._missing[column].discard(label)
+        return row[0]
+
+    def label(self, column, code):
+        """Libellé d'un code déjà en cache (None si inconnu)"""
+        return self._labels[column].get(code)
+
+    def labels(self, connection, column, codes):
+        """Décode une liste de codes, avec un seul rechargement si un code est inconnu"""
+        mapping = self._labels[column]
+        if any(code is not None and code not in mapping for code in codes):
+            self.load(connection, [column])
+            mapping = self._labels[column]
+        return [mapping.get(code) for code in codes]
+
+    def label_map(self, connection, column):
+        """Dictionnaire code → libellé complet (rechargé pour inclure les derniers ajouts)"""
+        self.load(connection, [column])
+        return dict(self._labels[column])
+
+    def encode_log(self, connection, log):
+        """
+        Convertit un log (libellés) en valeurs de colonnes encodées
+
+        Le log fournit soit description_modele + description_param,
+        soit une description libre (modèle générique).
+
+        Returns:
+            dict {id_type_log, id_statut, id_utilisateur, id_modele, description_param}
+        """
+        template = log.get("description_modele")
+        param = log.get("description_param")
+        if template is None and log.get("description") is not None:
+            template, param = GENERIC_TEMPLATE, log["description"]
+
+        return {
+            "id_type_log": self.code(connection, "type_log", log["type_log"]),
+            "id_statut": self.code(connection, "statut", log["statut"]),
+            "id_utilisateur": self.code(connection, "utilisateur", log.get("utilisateur")),
+            "id_modele": self.code(connection, "description", template),
+            "description_param": None if param is None else str(param)
+        }
+
+    def decode_row(self, connection, row):
+        """Ajoute à une ligne lue en base les colonnes décodées (type_log, statut, ...)"""
+        if "id_type_log" in row:
+            row["type_log"] = self.labels(connection, "type_log", [row["id_type_log"]])[0]
+        if "id_statut" in row:
+            row["statut"] = self.labels(connection, "statut", [row["id_statut"]])[0]
+        if "id_utilisateur" in row:
+            row["utilisateur"] = self.labels(connection, "utilisateur", [row["id_utilisateur"]])[0]
+        if "id_modele" in row:
+            template = self.labels(connection, "description", [row["id_modele"]])[0]
+            row["description"] = render_description(template, row.get("description_param"))
+        return row
+
+
+_shared_codec = None
+
+
+def get_codec(connection):
+    """Codec partagé par le processus (chargé à la première utilisation)"""
+    global _shared_codec
+    if _shared_codec is None:
+        _shared_codec = LogCodec(connection)
+    return _shared_codec
@@ -2,12 +2,20 @@ import mysql.connector
 from mysql.connector import Error
 import random
 from datetime import datetime, timedelta
+import logging
 import sys
 import os
 
 # Ajouter le dossier parent au path pour importer config
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from config.config import DB_CONFIG, SUSPECT_IPS, TEST_USERS, LOG_TYPES, LOG_STATUS
+from config.config import (DB_CONFIG, SUSPECT_IPS, TEST_USERS, LOG_TYPES, LOG_STATUS,
+                           DESCRIPTION_TEMPLATES)
+from log_codec import get_codec
+from threat_intel import get_threat_intel
+from geoip import get_geoip
+from structured_logging import get_logger, log_event, setup_logging
+
+logger = get_logger("collecteur")
 
 
 def connect_db():
@@ -30,14 +38,16 @@ def generate_ssh_log():
         "adresse_ip_source": random.choice(SUSPECT_IPS + ["192.168.1.100", "10.0.0.50"]),
         "utilisateur": random.choice(TEST_USERS),
         "statut": random.choice(["succes", "echec"]),
-        "description": ""
+        "description_modele": None,
+        "description_param": None
     }
     
-    # Description selon le statut
+    # Description selon le statut (modèle + paramètre)
     if log["statut"] == "echec":
-        log["description"] = f"Tentative de connexion SSH échouée pour {log['utilisateur']}"
+        log["description_modele"] = DESCRIPTION_TEMPLATES["ssh_echec"]
     else:
-        log["description"] = f"Connexion SSH réussie pour {log['utilisateur']}"
+        log["description_modele"] = DESCRIPTION_TEMPLATES["ssh_succes"]
+    log["description_param"] = log["utilisateur"]
     
     return log
 
@@ -50,7 +60,8 @@ def generate_port_scan_log():
         "adresse_ip_source": random.choice(SUSPECT_IPS),
         "utilisateur": None,
         "statut": "detecte",
-        "description": f"Scan de ports détecté - {random.randint(10, 50)} ports analysés"
+        "description_modele": DESCRIPTION_TEMPLATES["scan_port"],
+        "description_param": random.randint(10, 50)
     }
     return log
 
@@ -64,41 +75,118 @@ def generate_file_access_log():
         "adresse_ip_source": random.choice(SUSPECT_IPS + ["192.168.1.100"]),
         "utilisateur": random.choice(TEST_USERS),
         "statut": random.choice(["succes", "echec"]),
-        "description": f"Tentative d'accès au fichier {random.choice(files)}"
+        "description_modele": DESCRIPTION_TEMPLATES["acces_fichier"],
+        "description_param": random.choice(files)
     }
     return log
 
 
+INSERT_LOG_QUERY = """
+INSERT INTO logs_securite 
+(id_serveur, id_type_log, adresse_ip_source, code_pays, asn, id_utilisateur, id_statut,
+ id_modele, description_param, menace)
+VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+"""
+
+
+def prepare_log_values(connection, logs):
+    """
+    Prépare les valeurs à insérer pour une liste de logs :
+    encodage des colonnes (log_codec), enrichissement GeoIP/ASN par lot,
+    étiquette des flux de menaces
+    """
+    codec = get_codec(connection)
+    intel = get_threat_intel()
+    get_geoip().enrich(logs)
+
+    values = []
+    for log in logs:
+        encoded = codec.encode_log(connection, log)
+        log["menace"] = intel.tag(log["adresse_ip_source"])
+        values.append((
+            log["id_serveur"],
+            encoded["id_type_log"],
+            log["adresse_ip_source"],
+            log["code_pays"],
+            log["asn"],
+            encoded["id_utilisateur"],
+            encoded["id_statut"],
+            encoded["id_modele"],
+            encoded["description_param"],
+            log["menace"]
+        ))
+    return values
+
+
 def insert_log(connection, log):
-    """Insère un log dans la base de données"""
+    """
+    Insère un log dans la base de données (colonnes encodées, cf. log_codec)
+    L'IP source est enrichie (GeoIP/ASN) et comparée aux flux de menaces avant l'insertion
+    """
+    cursor = None
     try:
+        values = prepare_log_values(connection, [log])
         cursor = connection.cursor()
-        query = """
-        INSERT INTO logs_securite 
-        (id_serveur, type_log, adresse_ip_source, utilisateur, statut, description)
-        VALUES (%s, %s, %s, %s, %s, %s)
-        """
-        values = (
-            log["id_serveur"],
-            log["type_log"],
-            log["adresse_ip_source"],
-            log["utilisateur"],
-            log["statut"],
-            log["description"]
-        )
-        cursor.execute(query, values)
+        cursor.execute(INSERT_LOG_QUERY, values[0])
         connection.commit()
         return True
     except Error as e:
-        print(f"✗ Erreur insertion: {e}")
+        log_event(logger, logging.ERROR, f"✗ Erreur insertion: {e}", ip=log.get("adresse_ip_source"))
         return False
     finally:
+        if cursor:
+            cursor.close()
+
+
+_autoinc_steps = {}    # connection_id -> @@auto_increment_increment de la session
+
+
+def autoinc_step(connection):
+    """Pas entre deux id_log d'un même INSERT (@@auto_increment_increment, lu une fois par connexion)"""
+    step = _autoinc_steps.get(connection.connection_id)
+    if step is None:
+        cursor = connection.cursor()
+        cursor.execute("SELECT @@SESSION.auto_increment_increment")
+        step = _autoinc_steps[connection.connection_id] = int(cursor.fetchone()[0])
         cursor.close()
+    return step
+
+
+def insert_logs(connection, logs):
+    """
+    Insère un lot de logs en une requête et une transaction
+    Chaque log reçoit son id_log : un INSERT multi-lignes au nombre de lignes connu
+    (« simple insert ») reçoit d'InnoDB un bloc d'identifiants sans trou, même avec
+    innodb_autoinc_lock_mode=2, espacés de auto_increment_increment à partir de lastrowid
+
+    Returns:
+        Nombre de logs insérés (0 en cas d'erreur)
+    """
+    if not logs:
+        return 0
+    cursor = None
+    try:
+        values = prepare_log_values(connection, logs)
+        cursor = connection.cursor()
+        cursor.executemany(INSERT_LOG_QUERY, values)
+        connection.commit()
+        if cursor.lastrowid:
+            step = autoinc_step(connection)
+            for offset, log in enumerate(logs):
+                log["id_log"] = cursor.lastrowid + offset * step
+        return len(values)
+    except Error as e:
+        connection.rollback()
+        log_event(logger, logging.ERROR, f"✗ Erreur insertion du lot: {e}", taille_lot=len(logs))
+        return 0
+    finally:
+        if cursor:
+            cursor.close()
 
 
 def simulate_brute_force(connection, nb_attempts=10):
     """Simule une attaque brute force SSH"""
-    print(f"\n🔴 SIMULATION ATTAQUE BRUTE FORCE ({nb_attempts} tentatives)...")
+    log_event(logger, logging.INFO, f"🔴 SIMULATION ATTAQUE BRUTE FORCE ({nb_attempts} tentatives)...")
     
     attacker_ip = SUSPECT_IPS[0]  # 203.45.12.88
     target_server = 1  # WebServer01
@@ -110,20 +198,24 @@ def simulate_brute_force(connection, nb_attempts=10):
             "adresse_ip_source": attacker_ip,
             "utilisateur": random.choice(TEST_USERS),
             "statut": "echec",
-            "description": f"Tentative brute force #{i+1} - Mot de passe incorrect"
+            "description_modele": DESCRIPTION_TEMPLATES["brute_force"],
+            "description_param": i + 1
         }
         
         if insert_log(connection, log):
-            print(f"  ✓ Tentative {i+1}/{nb_attempts} enregistrée")
+            log_event(logger, logging.INFO, "  ✓ Tentative enregistrée", echantillon=True,
+                      tentative=i + 1, total=nb_attempts, ip=attacker_ip)
     
-    print(f"✓ Attaque brute force simulée avec succès")
+    log_event(logger, logging.INFO, "✓ Attaque brute force simulée avec succès",
+              ip=attacker_ip, tentatives=nb_attempts)
 
 
 def generate_multiple_logs(connection, nb_logs=100):
     """Génère plusieurs logs variés"""
-    print(f"\n📊 GÉNÉRATION DE {nb_logs} LOGS...")
+    log_event(logger, logging.INFO, f"📊 GÉNÉRATION DE {nb_logs} LOGS...")
     
     success_count = 0
+    batch = []
     
     for i in range(nb_logs):
         # Répartition: 60% SSH, 25% scan_port, 15% accès fichier
@@ -136,16 +228,21 @@ def generate_multiple_logs(connection, nb_logs=100):
         else:
             log = generate_file_access_log()
         
-        if insert_log(connection, log):
-            success_count += 1
-            if (i + 1) % 20 == 0:  # Afficher progression tous les 20 logs
-                print(f"  ✓ {i + 1}/{nb_logs} logs générés...")
+        batch.append(log)
+        
+        # Insertion par lots de 20 logs (une requête, une transaction)
+        if len(batch) == 20 or i == nb_logs - 1:
+            success_count += insert_logs(connection, batch)
+            batch = []
+            log_event(logger, logging.INFO, "  ✓ Lot inséré", echantillon=True,
+                      generes=i + 1, total=nb_logs)
     
-    print(f"✓ {success_count}/{nb_logs} logs insérés avec succès")
+    log_event(logger, logging.INFO, f"✓ {success_count}/{nb_logs} logs insérés avec succès")
 
 
 def main():
     """Fonction principale"""
+    setup_logging()
     print("=" * 60)
     print("   CLOUDSECMONITOR - COLLECTEUR DE LOGS")
     print("=" * 60)
@@ -0,0 +1,228 @@
+"""
+CloudSecMonitor - Export en flux des logs et incidents (CSV ou NDJSON compressés gzip)
+
+Les lignes sont lues par un curseur non bufferisé (le serveur les envoie au fil
+de la lecture), par paquets de EXPORT_CHUNK_SIZE, et écrites aussitôt dans le
+flux gzip : la mémoire reste bornée quel que soit le nombre de lignes exportées.
+La progression est estimée sur la plage d'identifiants (MIN/MAX de la clé
+primaire, sans COUNT(*) préalable).
+
+La connexion est occupée pendant tout l'export : utiliser une connexion dédiée.
+
+Usage:
+    python src/log_export.py logs --format csv --out logs.csv.gz --debut 2025-01-01 --filtre statut=echec
+    python src/log_export.py incidents --format ndjson --out incidents.ndjson.gz
+    python src/log_export.py logs --out ssh.csv.gz --filtre "recherche=/root/.ssh"
+"""
+
+import mysql.connector
+from mysql.connector import Error
+from datetime import datetime
+import argparse
+import json
+import gzip
+import csv
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DB_CONFIG, EXPORT_CHUNK_SIZE
+from log_search import query_tokens
+
+# Requêtes d'export : colonnes décodées (comme v_logs_securite), clé de progression, filtres
+EXPORTS = {
+    "logs": {
+        "sql": """
+            SELECT l.id_log, l.date_heure, sv.nom_serveur, t.libelle AS type_log,
+                   l.adresse_ip_source, u.libelle AS utilisateur, st.libelle AS statut,
+                   IF(l.description_param IS NULL, m.modele,
+                      REPLACE(m.modele, '{}', l.description_param)) AS description,
+                   l.code_pays, l.asn, l.menace
+            FROM logs_securite l
+            JOIN serveurs sv ON sv.id_serveur = l.id_serveur
+            JOIN ref_types_log t ON t.id_type_log = l.id_type_log
+            JOIN ref_statuts st ON st.id_statut = l.id_statut
+            LEFT JOIN ref_utilisateurs u ON u.id_utilisateur = l.id_utilisateur
+            LEFT JOIN ref_modeles_description m ON m.id_modele = l.id_modele
+        """,
+        "cle": ("logs_securite", "id_log", "l.id_log"),
+        "filtres": {
+            "type_log": "t.libelle = %s",
+            "statut": "st.libelle = %s",
+            "utilisateur": "u.libelle = %s",
+            "id_serveur": "l.id_serveur = %s",
+            "adresse_ip_source": "l.adresse_ip_source = %s",
+            "debut": "l.date_heure >= %s",
+            "fin": "l.date_heure < %s",
+        },
+        # Filtre 'recherche' : chaque mot (log_search.query_tokens) contenu dans la description
+        "recherche": "IF(l.description_param IS NULL, m.modele, REPLACE(m.modele, '{}', l.description_param))",
+    },
+    "incidents": {
+        "sql": """
+            SELECT i.id_incident, i.date_detection, i.derniere_activite, i.date_resolution,
+                   i.id_regle, i.type_incident, i.niveau_severite, i.statut, i.nb_evenements,
+                   i.premier_log, i.dernier_log, sv.nom_serveur, i.adresse_ip_source,
+                   i.resolu_par, i.notes, i.description
+            FROM incidents i
+            LEFT JOIN serveurs sv ON sv.id_serveur = i.id_serveur
+        """,
+        "cle": ("incidents", "id_incident", "i.id_incident"),
+        "filtres": {
+            "niveau_severite": "i.niveau_severite = %s",
+            "statut": "i.statut = %s",
+            "id_regle": "i.id_regle = %s",
+            "adresse_ip_source": "i.adresse_ip_source = %s",
+            "debut": "i.date_detection >= %s",
+            "fin": "i.date_detection < %s",
+        },
+    },
+}
+
+FORMATS = ("csv", "ndjson")
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+def build_query(kind, filtres):
+    """Requête d'export filtrée, triée par clé primaire ; filtres vides ignorés"""
+    export = EXPORTS[kind]
+    conditions, params = [], []
+    for name, value in (filtres or {}).items():
+        if value is None or value == "":
+            continue
+        if name == "recherche" and "recherche" in export:
+            # Export = parcours complet de toute façon : LIKE plutôt que l'index de recherche
+            for token in query_tokens(value):
+                conditions.append(f"{export['recherche']} LIKE %s")
+                params.append(f"%{token}%")
+            continue
+        if name not in export["filtres"]:
+            raise ValueError(f"Filtre inconnu pour {kind}: {name}")
+        conditions.append(export["filtres"][name])
+        params.append(value)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    return f"{export['sql']} {where} ORDER BY {export['cle'][2]}", params
+
+
+def id_range(connection, kind):
+    """(MIN, MAX) de la clé primaire, pour estimer la progression"""
+    table, column, _ = EXPORTS[kind]["cle"]
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT MIN({column}), MAX({column}) FROM {table}")
+    bounds = cursor.fetchone()
+    cursor.close()
+    return bounds
+
+
+def iter_chunks(connection, kind, filtres=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Colonnes puis paquets de lignes (tuples), lus au fil de l'eau"""
+    query, params = build_query(kind, filtres)
+    cursor = connection.cursor(buffered=False)
+    try:
+        cursor.execute(query, params)
+        yield [column[0] for column in cursor.description]
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                break
+            yield rows
+    finally:
+        cursor.close()
+
+
+def _json_value(value):
+    return value.isoformat(sep=" ") if isinstance(value, datetime) else value
+
+
+def export(connection, kind, out, fmt="csv", filtres=None, chunk_size=EXPORT_CHUNK_SIZE,
+           progress=None):
+    """
+    Exporte une plage filtrée en gzip
+
+    Args:
+        connection: Connexion dédiée (occupée pendant tout l'export)
+        kind: 'logs' ou 'incidents'
+        out: Chemin du fichier ou objet fichier binaire
+        fmt: 'csv' ou 'ndjson'
+        filtres: Dict de filtres (voir EXPORTS[kind]['filtres'])
+        progress: Fonction appelée après chaque paquet avec (lignes écrites, fraction estimée)
+
+    Returns:
+        Nombre de lignes exportées
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"Format inconnu: {fmt}")
+    low, high = id_range(connection, kind)
+    span = (high - low) if low is not None and high != low else None
+
+    total = 0
+    with gzip.open(out, "wt", encoding="utf-8", newline="") as f:
+        chunks = iter_chunks(connection, kind, filtres, chunk_size)
+        columns = next(chunks)
+        writer = csv.writer(f) if fmt == "csv" else None
+        if writer:
+            writer.writerow(columns)
+        for rows in chunks:
+            if writer:
+                writer.writerows(rows)
+            else:
+                f.write("".join(
+                    json.dumps({c: _json_value(v) for c, v in zip(columns, row)},
+                               ensure_ascii=False, default=str) + "\n"
+                    for row in rows
+                ))
+            total += len(rows)
+            if progress:
+                progress(total, (rows[-1][0] - low) / span if span else 1.0)
+    if progress:
+        progress(total, 1.0)
+    return total
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Export CloudSecMonitor (gzip)")
+    parser.add_argument("type", choices=list(EXPORTS))
+    parser.add_argument("--format", choices=FORMATS, default="csv")
+    parser.add_argument("--out", required=True, help="Fichier de sortie (.gz)")
+    parser.add_argument("--debut", help="AAAA-MM-JJ")
+    parser.add_argument("--fin", help="AAAA-MM-JJ (exclue)")
+    parser.add_argument("--filtre", action="append", default=[], metavar="NOM=VALEUR",
+                        help="Filtre supplémentaire (ex: statut=echec), répétable")
+    parser.add_argument("--chunk-size", type=int, default=EXPORT_CHUNK_SIZE)
+    args = parser.parse_args()
+
+    filtres = dict(f.split("=", 1) for f in args.filtre)
+    filtres.update(debut=args.debut, fin=args.fin)
+
+    connection = connect_db()
+    if not connection:
+        sys.exit(1)
+
+    def report(rows, fraction):
+        print(f"\r  {rows:,} ligne(s) - {fraction:.0%}", end="", flush=True)
+
+    try:
+        total = export(connection, args.type, args.out, args.format, filtres, args.chunk_size, report)
+        print(f"\n✓ {total:,} ligne(s) exportée(s) dans {args.out}")
+    except (Error, ValueError) as e:
+        print(f"\n✗ Erreur export: {e}")
+        sys.exit(1)
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
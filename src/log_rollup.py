@@ -0,0 +1,158 @@
+"""
+CloudSecMonitor - Agrégats temporels des logs (logs_par_minute, logs_par_heure, cube_activite)
+
+Les logs d'identifiant supérieur au dernier agrégé (etat_agregats) sont comptés
+en SQL par lots de ROLLUP_BATCH_SIZE et ajoutés aux agrégats, dans la même
+transaction que l'avancement de l'état (la ligne d'état verrouillée sérialise les
+mises à jour concurrentes). Un id_log est attribué à l'insertion mais visible au
+commit : l'état n'avance que jusqu'aux logs de plus de ROLLUP_SAFETY_LAG secondes,
+pour ne pas sauter un log commité après un identifiant plus grand. Appelé par l'analyseur à chaque cycle ; les logs pas
+encore agrégés sont comptés à la lecture (dashboard, get_event_series).
+
+Usage:
+    python src/log_rollup.py            # rattrape tous les logs non agrégés
+"""
+
+import mysql.connector
+from mysql.connector import Error
+from datetime import datetime, timedelta
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DB_CONFIG, ROLLUP_BATCH_SIZE, ROLLUP_MINUTE_RETENTION_DAYS, ROLLUP_SAFETY_LAG
+
+# Agrégat -> (table, colonne de temps, format de troncature de date_heure, colonnes de regroupement)
+ROLLUPS = {
+    "minute": ("logs_par_minute", "minute", "%Y-%m-%d %H:%i:00", ("id_type_log", "id_statut")),
+    "heure": ("logs_par_heure", "heure", "%Y-%m-%d %H:00:00", ("id_serveur", "id_type_log", "id_statut")),
+    "cube": ("cube_activite", "heure", "%Y-%m-%d %H:00:00",
+             ("id_serveur", "id_type_log", "id_statut", "id_utilisateur")),
+}
+
+# Colonnes nullables : valeur de remplacement dans la clé primaire des agrégats
+GROUP_EXPRESSIONS = {"id_utilisateur": "COALESCE(id_utilisateur, 0) AS id_utilisateur"}
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+def rollup_statement(name):
+    """INSERT ... SELECT qui ajoute les comptes d'un intervalle ]id, id] à l'agrégat"""
+    table, time_column, truncate, columns = ROLLUPS[name]
+    group = ", ".join(columns)
+    select = ", ".join(GROUP_EXPRESSIONS.get(column, column) for column in columns)
+    return f"""
+        INSERT INTO {table} ({time_column}, {group}, nombre)
+        SELECT * FROM (
+            SELECT DATE_FORMAT(date_heure, '{truncate}') AS periode, {select}, COUNT(*) AS nombre
+            FROM logs_securite
+            WHERE id_log > %s AND id_log <= %s
+            GROUP BY periode, {group}
+        ) AS n
+        ON DUPLICATE KEY UPDATE nombre = {table}.nombre + n.nombre
+    """
+
+
+def get_watermark(connection):
+    """Dernier id_log agrégé"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT dernier_id FROM etat_agregats WHERE nom = 'logs'")
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else 0
+
+
+def settled_max_id(cursor, lag=ROLLUP_SAFETY_LAG):
+    """
+    Plus grand id_log sous lequel tous les logs sont commités : MAX(id_log) des logs
+    de plus de lag secondes (date_heure posée à l'insertion, transactions plus courtes
+    que lag). Lecture de idx_logs_date limitée à l'heure précédant cette limite ;
+    tous les logs anciens : MAX(id_log)
+
+    Returns:
+        id_log, ou None si aucun log n'est encore assez ancien
+    """
+    cursor.execute("""
+        SELECT MAX(id_log), MAX(date_heure) < NOW() - INTERVAL %s SECOND FROM logs_securite
+    """, (lag,))
+    max_id, all_settled = cursor.fetchone()
+    if max_id is None or all_settled:
+        return max_id
+    cursor.execute("""
+        SELECT MAX(id_log) FROM logs_securite
+        WHERE date_heure >= NOW() - INTERVAL %s SECOND AND date_heure < NOW() - INTERVAL %s SECOND
+    """, (lag + 3600, lag))
+    return cursor.fetchone()[0]
+
+
+def refresh_rollups(connection, batch_size=ROLLUP_BATCH_SIZE, max_batches=None, lag=ROLLUP_SAFETY_LAG):
+    """
+    Agrège les logs insérés depuis le dernier passage, un lot d'id_log par transaction
+
+    Returns:
+        Nombre de logs agrégés
+    """
+    total = 0
+    batches = 0
+    cursor = connection.cursor()
+    try:
+        while max_batches is None or batches < max_batches:
+            cursor.execute("SELECT dernier_id FROM etat_agregats WHERE nom = 'logs' FOR UPDATE")
+            last_id = cursor.fetchone()[0]
+            upper = min(settled_max_id(cursor, lag) or 0, last_id + batch_size)
+            if upper <= last_id:
+                connection.commit()
+                break
+            for name in ROLLUPS:
+                cursor.execute(rollup_statement(name), (last_id, upper))
+            cursor.execute("UPDATE etat_agregats SET dernier_id = %s WHERE nom = 'logs'", (upper,))
+            connection.commit()
+            total += upper - last_id
+            batches += 1
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return total
+
+
+def purge_minutes(connection, today=None, retention_days=ROLLUP_MINUTE_RETENTION_DAYS):
+    """Supprime les agrégats par minute au-delà de la rétention (les agrégats horaires restent)"""
+    limit = (today or datetime.now()) - timedelta(days=retention_days)
+    cursor = connection.cursor()
+    cursor.execute("DELETE FROM logs_par_minute WHERE minute < %s", (limit,))
+    deleted = cursor.rowcount
+    connection.commit()
+    cursor.close()
+    return deleted
+
+
+def main():
+    """Fonction principale"""
+    connection = connect_db()
+    if not connection:
+        sys.exit(1)
+    try:
+        total = refresh_rollups(connection)
+        print(f"✓ Agrégats à jour (intervalle de {total:,} identifiant(s) traité)")
+    except Error as e:
+        print(f"✗ Erreur agrégats: {e}")
+        sys.exit(1)
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+"""
+CloudSecMonitor - Recherche plein texte dans les descriptions de logs
+
+logs_securite est partitionnée : pas d'index FULLTEXT possible. Une description
+est un modèle (ref_modeles_description, quelques dizaines de lignes) et un
+paramètre libre (migration 003) ; un log correspond à la recherche si chaque mot
+cherché apparaît dans son modèle ou dans son paramètre.
+    - mots des modèles : résolus en mémoire en identifiants de modèle, logs lus
+      par idx_logs_modele_date
+    - mots des paramètres : index inversé index_recherche_logs (migration 013),
+      clé (token, date_heure, id_log) déjà triée pour la pagination par clé
+    - logs pas encore indexés (id_log > etat_agregats 'recherche', qui n'avance que
+      sur les logs de plus de ROLLUP_SAFETY_LAG secondes) : LIKE sur la description
+      reconstituée, limité à cette fin de table
+
+Chaque branche lit au plus `limit` lignes après le curseur, dans l'ordre
+(date_heure, id_log) décroissant ; les branches sont fusionnées en Python.
+
+Usage:
+    python src/log_search.py indexer                  # rattrape l'index
+    python src/log_search.py chercher "/root/.ssh/id_rsa" --limite 20
+"""
+
+import mysql.connector
+from mysql.connector import Error
+import unicodedata
+import argparse
+import time
+import sys
+import re
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import DB_CONFIG, SEARCH_INDEX_BATCH_SIZE, SEARCH_MAX_TOKENS, ROLLUP_SAFETY_LAG
+from log_rollup import settled_max_id
+
+TOKEN_PATTERN = re.compile(r"\w+")
+TOKEN_MIN_LENGTH = 2
+TOKEN_MAX_LENGTH = 64    # index_recherche_logs.token
+
+# Description reconstituée (comme v_logs_securite), pour les logs pas encore indexés
+DESCRIPTION_SQL = "IF(l.description_param IS NULL, rm.modele, REPLACE(rm.modele, '{}', l.description_param))"
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+def normalize(text):
+    """Minuscules sans accents ('Échouée' -> 'echouee')"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def tokenize(text):
+    """Ensemble des mots normalisés d'un texte ('/root/.ssh/id_rsa' -> root, ssh, id_rsa)"""
+    if not text:
+        return set()
+    return {token[:TOKEN_MAX_LENGTH] for token in TOKEN_PATTERN.findall(normalize(str(text)))
+            if len(token) >= TOKEN_MIN_LENGTH}
+
+
+def query_tokens(text, max_tokens=SEARCH_MAX_TOKENS):
+    """Mots d'une recherche, les plus longs (les plus sélectifs) d'abord"""
+    return sorted(tokenize(text), key=lambda token: (-len(token), token))[:max_tokens]
+
+
+def get_watermark(connection):
+    """Dernier id_log indexé"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT dernier_id FROM etat_agregats WHERE nom = 'recherche'")
+    row = cursor.fetchone()
+    cursor.close()
+    return row[0] if row else 0
+
+
+def refresh_index(connection, batch_size=SEARCH_INDEX_BATCH_SIZE, max_batches=None, lag=ROLLUP_SAFETY_LAG):
+    """
+    Indexe les paramètres de description des logs insérés depuis le dernier passage,
+    un lot d'id_log par transaction (ligne d'état verrouillée et logs de plus de lag
+    secondes seulement, comme log_rollup)
+
+    Returns:
+        Nombre de tokens ajoutés
+    """
+    total = 0
+    batches = 0
+    cursor = connection.cursor()
+    try:
+        while max_batches is None or batches < max_batches:
+            cursor.execute("SELECT dernier_id FROM etat_agregats WHERE nom = 'recherche' FOR UPDATE")
+            last_id = cursor.fetchone()[0]
+            upper = min(settled_max_id(cursor, lag) or 0, last_id + batch_size)
+            if upper <= last_id:
+                connection.commit()
+                break
+            cursor.execute("""
+                SELECT id_log, date_heure, description_param FROM logs_securite
+                WHERE id_log > %s AND id_log <= %s AND description_param IS NOT NULL
+            """, (last_id, upper))
+            entries = [(token, date_heure, id_log)
+                       for id_log, date_heure, param in cursor.fetchall()
+                       for token in tokenize(param)]
+            if entries:
+                cursor.executemany(
+                    "INSERT IGNORE INTO index_recherche_logs (token, date_heure, id_log) VALUES (%s, %s, %s)",
+                    entries
+                )
+            cursor.execute("UPDATE etat_agregats SET dernier_id = %s WHERE nom = 'recherche'", (upper,))
+            connection.commit()
+            total += len(entries)
+            batches += 1
+    except Error:
+        connection.rollback()
+        raise
+    finally:
+        cursor.close()
+    return total
+
+
+def purge_index(connection, batch_size=SEARCH_INDEX_BATCH_SIZE):
+    """Supprime les tokens des logs disparus (partitions supprimées), par lots"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT MIN(date_heure) FROM logs_securite")
+    oldest = cursor.fetchone()[0]
+    deleted = 0
+    if oldest is not None:
+        while True:
+            cursor.execute("DELETE FROM index_recherche_logs WHERE date_heure < %s LIMIT %s",
+                           (oldest, batch_size))
+            connection.commit()
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                break
+    cursor.close()
+    return deleted
+
+
+def matching_templates(templates, token):
+    """Identifiants des modèles dont le texte contient le mot"""
+    return {code for code, modele in templates.items()
+            if modele and token in tokenize(modele.replace("{}", " "))}
+
+
+def _after(alias, cursor):
+    """Condition de pagination par clé (date_heure, id_log) < curseur"""
+    if cursor is None:
+        return [], []
+    return ([f"({alias}.date_heure < %s OR ({alias}.date_heure = %s AND {alias}.id_log < %s))"],
+            [cursor[0], cursor[0], cursor[1]])
+
+
+def search_queries(text, templates, watermark, select, joins="", conditions=(), params=(),
+                   cursor=None, limit=50):
+    """
+    Requêtes des branches d'une recherche (voir l'en-tête du module)
+
+    Args:
+        text: Texte cherché (mots combinés en ET)
+        templates: {id_modele: modele}
+        watermark: Dernier id_log indexé
+        select, joins: Colonnes (l.id_log et l.date_heure inclus) et jointures de l'appelant
+        conditions, params: Filtres de l'appelant sur l'alias l
+        cursor: (date_heure, id_log) du dernier log de la page précédente
+
+    Returns:
+        Liste de (sql, paramètres), vide si le texte ne contient aucun mot
+    """
+    tokens = query_tokens(text)
+    if not tokens:
+        return []
+    by_token = {token: matching_templates(templates, token) for token in tokens}
+    filters, filter_params = list(conditions), list(params)
+    order = "ORDER BY l.date_heure DESC, l.id_log DESC LIMIT %s"
+    queries = []
+
+    # Tous les mots dans le modèle : un parcours ordonné par modèle (un IN casserait l'ordre de l'index)
+    common = set.intersection(*by_token.values())
+    for code in sorted(common):
+        page, page_params = _after("l", cursor)
+        where = " AND ".join(["l.id_modele = %s"] + filters + page)
+        queries.append((f"SELECT {select} FROM logs_securite l {joins} WHERE {where} {order}",
+                        [code] + filter_params + page_params + [limit]))
+
+    # Au moins un mot dans le paramètre : l'index inversé de ce mot mène le parcours
+    for driver in tokens:
+        others, other_params = [], []
+        for token in tokens:
+            if token == driver:
+                continue
+            exists = ("EXISTS (SELECT 1 FROM index_recherche_logs x WHERE x.token = %s "
+                      "AND x.date_heure = i.date_heure AND x.id_log = i.id_log)")
+            codes = sorted(by_token[token])
+            if codes:
+                others.append(f"(l.id_modele IN ({', '.join(['%s'] * len(codes))}) OR {exists})")
+                other_params += codes + [token]
+            else:
+                others.append(exists)
+                other_params.append(token)
+        page, page_params = _after("i", cursor)
+        where = " AND ".join(["i.token = %s"] + page + others + filters)
+        queries.append((f"""
+            SELECT {select} FROM index_recherche_logs i
+            JOIN logs_securite l ON l.id_log = i.id_log AND l.date_heure = i.date_heure
+            {joins}
+            WHERE {where}
+            ORDER BY i.date_heure DESC, i.id_log DESC LIMIT %s
+        """, [driver] + page_params + other_params + filter_params + [limit]))
+
+    # Logs pas encore indexés : fin de table, lue par la clé primaire
+    page, page_params = _after("l", cursor)
+    likes = [f"{DESCRIPTION_SQL} LIKE %s"] * len(tokens)
+    where = " AND ".join(["l.id_log > %s"] + likes + filters + page)
+    queries.append((f"""
+        SELECT {select} FROM logs_securite l
+        LEFT JOIN ref_modeles_description rm ON rm.id_modele = l.id_modele
+        {joins}
+        WHERE {where} {order}
+    """, [watermark] + [f"%{token}%" for token in tokens] + filter_params + page_params + [limit]))
+    return queries
+
+
+def search_logs(connection, text, templates, select, joins="", conditions=(), params=(),
+                cursor=None, limit=50):
+    """
+    Logs dont la description contient tous les mots de text, filtrés, du plus récent au plus ancien
+
+    Returns:
+        Liste de dicts (au plus limit), triée par (date_heure, id_log) décroissant
+    """
+    queries = search_queries(text, templates, get_watermark(connection), select, joins,
+                             conditions, params, cursor, limit)
+    rows = {}
+    db_cursor = connection.cursor(dictionary=True)
+    try:
+        for query, query_params in queries:
+            db_cursor.execute(query, query_params)
+            for row in db_cursor.fetchall():
+                rows[row["id_log"]] = row
+    finally:
+        db_cursor.close()
+    ordered = sorted(rows.values(), key=lambda row: (row["date_heure"], row["id_log"]), reverse=True)
+    return ordered[:limit]
+
+
+def load_templates(connection):
+    """{id_modele: modele} depuis ref_modeles_description"""
+    cursor = connection.cursor()
+    cursor.execute("SELECT id_modele, modele FROM ref_modeles_description")
+    templates = dict(cursor.fetchall())
+    cursor.close()
+    return templates
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Recherche dans les descriptions de logs")
+    parser.add_argument("commande", choices=["indexer", "chercher"])
+    parser.add_argument("texte", nargs="?", default="")
+    parser.add_argument("--limite", type=int, default=20)
+    args = parser.parse_args()
+
+    connection = connect_db()
+    if not connection:
+        sys.exit(1)
+    try:
+        if args.commande == "indexer":
+            total = refresh_index(connection)
+            print(f"✓ Index de recherche à jour ({total:,} token(s) ajouté(s))")
+            return
+        start = time.perf_counter()
+        rows = search_logs(connection, args.texte, load_templates(connection),
+                           "l.id_log, l.date_heure, l.adresse_ip_source, "
+                           f"{DESCRIPTION_SQL.replace('rm.', 'd.')} AS description",
+                           "LEFT JOIN ref_modeles_description d ON d.id_modele = l.id_modele",
+                           limit=args.limite)
+        elapsed = (time.perf_counter() - start) * 1000
+        for row in rows:
+            print(f"  {row['date_heure']}  #{row['id_log']}  {row['adresse_ip_source']}  {row['description']}")
+        print(f"✓ {len(rows)} log(s) en {elapsed:.0f} ms")
+    except Error as e:
+        print(f"✗ Erreur recherche: {e}")
+        sys.exit(1)
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,315 @@
+"""
+CloudSecMonitor - Distribution des notifications (outbox)
+
+Le trigger after_incident_notification écrit une ligne dans notifications à
+chaque incident. Ce processus, indépendant de l'analyseur :
+    1. réclame un lot de notifications non lues (FOR UPDATE SKIP LOCKED :
+       plusieurs distributeurs peuvent tourner en parallèle)
+    2. livre le lot à chaque sortie (terminal, fichier JSON lines, webhook)
+    3. marque tout le lot lu en une requête, dans la même transaction
+
+Si une sortie échoue, la transaction est annulée : le lot reste non lu et
+sera relivré (livraison au moins une fois). La détection n'attend jamais
+l'affichage des alertes.
+
+En cas de tempête, AlertSuppressor (alert_system.py) limite le débit par
+(règle, sévérité) : les alertes en excès sont marquées lues mais livrées sous
+forme de résumés périodiques.
+
+Usage:
+    python src/notification_dispatcher.py [--sinks terminal,file,webhook] [--once] [--no-suppression]
+    python src/notification_dispatcher.py --stub      # webhook local de test
+"""
+
+import mysql.connector
+from mysql.connector import Error
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from urllib.parse import urlparse
+import urllib.request
+import argparse
+import json
+import time
+import sys
+import os
+
+# Importer config et alert_system
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (DB_CONFIG, NOTIFICATION_BATCH_SIZE, NOTIFICATION_POLL_INTERVAL,
+                           NOTIFICATION_RECONNECT_ATTEMPTS, NOTIFICATION_FILE,
+                           NOTIFICATION_WEBHOOK_URL)
+from alert_system import display_alert, display_digest, AlertSuppressor
+from structured_logging import setup_logging
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+# ========================================
+# SORTIES (SINKS)
+# ========================================
+
+class TerminalSink:
+    """Affiche chaque notification avec display_alert() (résumés : display_digest())"""
+
+    name = "terminal"
+
+    def deliver(self, notifications):
+        for notif in notifications:
+            if notif.get('nb_supprimees'):
+                display_digest(notif)
+                continue
+            display_alert(
+                notif['id_incident'],
+                notif['type_incident'] or notif['type_notification'],
+                notif['description'] or notif['message'],
+                notif['niveau_severite'] or 'faible'
+            )
+
+
+class FileSink:
+    """Ajoute les notifications à un fichier JSON lines (une écriture par lot)"""
+
+    name = "file"
+
+    def __init__(self, path=NOTIFICATION_FILE):
+        self.path = path
+
+    def deliver(self, notifications):
+        lines = "".join(json.dumps(notif, default=str, ensure_ascii=False) + "\n"
+                        for notif in notifications)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(lines)
+
+
+class WebhookSink:
+    """Envoie le lot en une requête HTTP POST (JSON)"""
+
+    name = "webhook"
+
+    def __init__(self, url=NOTIFICATION_WEBHOOK_URL, timeout=5):
+        self.url = url
+        self.timeout = timeout
+
+    def deliver(self, notifications):
+        payload = json.dumps({"notifications": notifications}, default=str).encode("utf-8")
+        request = urllib.request.Request(
+            self.url, data=payload, headers={"Content-Type": "application/json"}, method="POST"
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            if response.status >= 300:
+                raise IOError(f"Webhook {self.url}: HTTP {response.status}")
+
+
+SINKS = {
+    "terminal": TerminalSink,
+    "file": FileSink,
+    "webhook": WebhookSink,
+}
+
+
+# ========================================
+# DISTRIBUTION
+# ========================================
+
+def claim_notifications(connection, batch_size=NOTIFICATION_BATCH_SIZE):
+    """
+    Réclame un lot de notifications non lues (verrouillées jusqu'au commit)
+    Les lignes déjà verrouillées par un autre distributeur sont ignorées
+    """
+    cursor = connection.cursor(dictionary=True)
+    query = """
+    SELECT
+        n.id_notification,
+        n.id_incident,
+        n.id_regle,
+        n.type_notification,
+        n.niveau_severite,
+        n.message,
+        n.date_notification,
+        i.type_incident,
+        i.description
+    FROM notifications n
+    LEFT JOIN incidents i ON i.id_incident = n.id_incident
+    WHERE n.lu = FALSE
+    ORDER BY n.id_notification
+    LIMIT %s
+    FOR UPDATE OF n SKIP LOCKED
+    """
+    cursor.execute(query, (batch_size,))
+    notifications = cursor.fetchall()
+    cursor.close()
+    return notifications
+
+
+def mark_as_read(connection, notification_ids):
+    """Marque un lot de notifications comme lues (une seule requête)"""
+    cursor = connection.cursor()
+    placeholders = ", ".join(["%s"] * len(notification_ids))
+    cursor.execute(
+        f"UPDATE notifications SET lu = TRUE WHERE id_notification IN ({placeholders})",
+        notification_ids
+    )
+    cursor.close()
+
+
+def dispatch_once(connection, sinks, batch_size=NOTIFICATION_BATCH_SIZE, suppressor=None):
+    """
+    Réclame, livre et marque lu un lot de notifications
+    Avec un suppressor, seules les alertes autorisées et les résumés échus sont livrés ;
+    tout le lot est marqué lu. Les décisions sont prises sur une copie du suppressor,
+    adoptée après le commit : un lot annulé est relivré avec les mêmes jetons et résumés
+
+    Returns:
+        Nombre de notifications réclamées (0 si l'outbox est vide ou en cas d'échec)
+    """
+    try:
+        connection.start_transaction()
+        notifications = claim_notifications(connection, batch_size)
+        working = suppressor.copy() if suppressor else None
+        deliverable = working.filter(notifications) if working else notifications
+        if deliverable:
+            for sink in sinks:
+                sink.deliver(deliverable)
+
+        if notifications:
+            mark_as_read(connection, [n['id_notification'] for n in notifications])
+        connection.commit()
+        if working:
+            suppressor.adopt(working)
+        return len(notifications)
+
+    except Exception as e:
+        # Connexion perdue : le rollback échoue aussi (le serveur annule la transaction)
+        try:
+            connection.rollback()
+        except Error:
+            pass
+        print(f"✗ Erreur distribution (lot conservé pour relivraison): {e}")
+        return 0
+
+
+def run_dispatcher(connection, sinks, batch_size=NOTIFICATION_BATCH_SIZE,
+                   interval=NOTIFICATION_POLL_INTERVAL, once=False, suppressor=None):
+    """
+    Boucle de distribution ; enchaîne les lots tant que l'outbox est pleine
+    La connexion est vérifiée (et rétablie si perdue) avant chaque lot : un redémarrage
+    de MySQL n'arrête pas le démon
+    """
+    total = 0
+    try:
+        while True:
+            try:
+                connection.ping(reconnect=True, attempts=NOTIFICATION_RECONNECT_ATTEMPTS,
+                                delay=interval)
+            except Error as e:
+                print(f"✗ MySQL injoignable, nouvelle tentative dans {interval} s: {e}")
+                time.sleep(interval)
+                continue
+            delivered = dispatch_once(connection, sinks, batch_size, suppressor)
+            total += delivered
+            if once and delivered < batch_size:
+                break
+            if delivered < batch_size:
+                time.sleep(interval)
+    except KeyboardInterrupt:
+        print("\n⏹️  Distribution arrêtée par l'utilisateur")
+    finally:
+        # Résumés en cours livrés avant de quitter
+        digests = suppressor.flush(force=True) if suppressor else []
+        if digests:
+            for sink in sinks:
+                sink.deliver(digests)
+    return total
+
+
+# ========================================
+# WEBHOOK LOCAL DE TEST
+# ========================================
+
+class _StubHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        notifications = payload.get("notifications", [])
+        print(f"📨 Webhook: {len(notifications)} notification(s) reçue(s)")
+        for notif in notifications[:5]:
+            print(f"   #{notif.get('id_notification')} [{notif.get('niveau_severite')}] {notif.get('message')}")
+        self.send_response(204)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_webhook_stub(url=NOTIFICATION_WEBHOOK_URL):
+    """Serveur HTTP local qui affiche les lots reçus par WebhookSink"""
+    parsed = urlparse(url)
+    server = HTTPServer((parsed.hostname, parsed.port or 80), _StubHandler)
+    print(f"✓ Webhook de test à l'écoute sur {url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Distributeur de notifications CloudSecMonitor")
+    parser.add_argument("--sinks", default="terminal",
+                        help="Sorties séparées par des virgules: terminal,file,webhook")
+    parser.add_argument("--batch-size", type=int, default=NOTIFICATION_BATCH_SIZE)
+    parser.add_argument("--interval", type=float, default=NOTIFICATION_POLL_INTERVAL)
+    parser.add_argument("--file", default=NOTIFICATION_FILE)
+    parser.add_argument("--webhook-url", default=NOTIFICATION_WEBHOOK_URL)
+    parser.add_argument("--once", action="store_true", help="Vider l'outbox puis quitter")
+    parser.add_argument("--stub", action="store_true", help="Lancer le webhook local de test")
+    parser.add_argument("--no-suppression", action="store_true",
+                        help="Livrer toutes les alertes (sans limitation ni résumés)")
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.stub:
+        run_webhook_stub(args.webhook_url)
+        return
+
+    sinks = []
+    for name in args.sinks.split(","):
+        name = name.strip()
+        if name == "file":
+            sinks.append(FileSink(args.file))
+        elif name == "webhook":
+            sinks.append(WebhookSink(args.webhook_url))
+        elif name in SINKS:
+            sinks.append(SINKS[name]())
+        else:
+            print(f"✗ Sortie inconnue: {name}")
+            sys.exit(1)
+
+    connection = connect_db()
+    if not connection:
+        print("✗ Impossible de continuer sans connexion MySQL")
+        sys.exit(1)
+
+    suppressor = None if args.no_suppression else AlertSuppressor()
+    print(f"✓ Distribution vers: {', '.join(sink.name for sink in sinks)}")
+    try:
+        total = run_dispatcher(connection, sinks, args.batch_size, args.interval, args.once, suppressor)
+        print(f"✓ {total} notification(s) traitée(s)")
+        if suppressor:
+            stats = suppressor.stats()
+            print(f"✓ {stats['emises']} alerte(s) émise(s), {stats['supprimees']} regroupée(s) en résumés")
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
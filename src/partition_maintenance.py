@@ -0,0 +1,317 @@
+"""
+CloudSecMonitor - Maintenance des partitions de logs_securite
+
+La table est partitionnée par plage sur TO_DAYS(date_heure) (migration 002).
+Ce job, à lancer une fois par jour (cron / timer systemd) :
+    1. découpe la partition pmax pour créer les partitions futures à l'avance
+    2. supprime les partitions dont toutes les lignes sont hors rétention
+       (DROP PARTITION instantané au lieu de DELETE massifs)
+    3. réconcilie les compteurs d'incidents (compteurs_incidents, migration 009)
+
+Les partitions sont nommées pAAAAMMJJ d'après le premier jour qu'elles contiennent.
+
+Usage:
+    python src/partition_maintenance.py [--dry-run] [--today AAAA-MM-JJ]
+"""
+
+import mysql.connector
+from mysql.connector import Error
+from datetime import date, datetime, timedelta
+import argparse
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (DB_CONFIG, LOG_PARTITION_INTERVAL, LOG_PARTITIONS_AHEAD,
+                           LOG_RETENTION_DAYS, ARCHIVE_BEFORE_DROP)
+from log_archive import archive_range
+from alert_system import reconcile_incident_counters
+from log_rollup import refresh_rollups, purge_minutes
+from log_search import purge_index
+
+# TO_DAYS('0001-01-01') = 366 dans MySQL, date(1, 1, 1).toordinal() = 1 en Python
+TO_DAYS_OFFSET = 365
+
+
+def connect_db():
+    """Connexion à la base de données MySQL"""
+    try:
+        connection = mysql.connector.connect(**DB_CONFIG)
+        if connection.is_connected():
+            return connection
+    except Error as e:
+        print(f"✗ Erreur de connexion MySQL: {e}")
+        return None
+
+
+def to_days(day):
+    """Équivalent Python de TO_DAYS() de MySQL"""
+    return day.toordinal() + TO_DAYS_OFFSET
+
+
+def from_days(days):
+    """Équivalent Python de FROM_DAYS() de MySQL"""
+    return date.fromordinal(days - TO_DAYS_OFFSET)
+
+
+def period_start(day, interval=LOG_PARTITION_INTERVAL):
+    """Premier jour de la période (jour ou semaine commençant le lundi) contenant day"""
+    if interval == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def period_length(interval=LOG_PARTITION_INTERVAL):
+    """Durée d'une partition"""
+    return timedelta(days=7 if interval == "week" else 1)
+
+
+def partition_name(start):
+    """Nom de la partition commençant au jour start"""
+    return f"p{start.strftime('%Y%m%d')}"
+
+
+def get_partitions(connection, table="logs_securite"):
+    """
+    Liste les partitions de la table, triées par borne
+
+    Returns:
+        Liste de dict {nom, borne (TO_DAYS exclusif, None pour MAXVALUE), lignes}
+    """
+    cursor = connection.cursor(dictionary=True)
+    query = """
+    SELECT PARTITION_NAME, PARTITION_DESCRIPTION, TABLE_ROWS
+    FROM information_schema.PARTITIONS
+    WHERE TABLE_SCHEMA = DATABASE()
+    AND TABLE_NAME = %s
+    AND PARTITION_NAME IS NOT NULL
+    ORDER BY PARTITION_ORDINAL_POSITION
+    """
+    cursor.execute(query, (table,))
+    partitions = []
+    for row in cursor.fetchall():
+        description = row['PARTITION_DESCRIPTION']
+        partitions.append({
+            'nom': row['PARTITION_NAME'],
+            'borne': None if description == 'MAXVALUE' else int(description),
+            'lignes': row['TABLE_ROWS'] or 0
+        })
+    cursor.close()
+    return partitions
+
+
+def get_oldest_log_date(connection, table="logs_securite"):
+    """Date du plus ancien log (None si la table est vide)"""
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT MIN(date_heure) FROM {table}")
+    result = cursor.fetchone()[0]
+    cursor.close()
+    return result.date() if result else None
+
+
+def plan_future_partitions(partitions, today, oldest=None, interval=LOG_PARTITION_INTERVAL,
+                           ahead=LOG_PARTITIONS_AHEAD, retention_days=LOG_RETENTION_DAYS):
+    """
+    Calcule les partitions à découper dans pmax
+
+    Returns:
+        Liste de (nom, borne TO_DAYS) à créer, dans l'ordre
+    """
+    step = period_length(interval)
+    horizon = period_start(today, interval) + step * (ahead + 1)
+    bounds = [p['borne'] for p in partitions if p['borne'] is not None]
+
+    new_partitions = []
+    if bounds:
+        start = from_days(max(bounds))
+    else:
+        # Premier découpage : les logs hors rétention restent dans une partition
+        # d'historique qui sera supprimée au prochain passage
+        start = period_start(today - timedelta(days=retention_days), interval)
+        if oldest is not None and oldest >= start:
+            start = period_start(oldest, interval)
+        elif oldest is not None:
+            new_partitions.append((f"p_hist_{start.strftime('%Y%m%d')}", to_days(start)))
+
+    while start < horizon:
+        new_partitions.append((partition_name(start), to_days(start + step)))
+        start += step
+
+    return new_partitions
+
+
+def ensure_future_partitions(connection, today, dry_run=False, table="logs_securite"):
+    """Découpe pmax pour que les partitions futures existent déjà à l'insertion"""
+    partitions = get_partitions(connection, table)
+    if not any(p['borne'] is None for p in partitions):
+        print(f"✗ {table} n'est pas partitionnée (migration 002 non appliquée ?)")
+        return []
+
+    oldest = None
+    if not any(p['borne'] is not None for p in partitions):
+        oldest = get_oldest_log_date(connection, table)
+
+    new_partitions = plan_future_partitions(partitions, today, oldest)
+    if not new_partitions:
+        print("✓ Partitions futures déjà présentes")
+        return []
+
+    definitions = ",\n".join(
+        f"PARTITION {nom} VALUES LESS THAN ({borne})" for nom, borne in new_partitions
+    )
+    query = f"""
+    ALTER TABLE {table} REORGANIZE PARTITION pmax INTO (
+        {definitions},
+        PARTITION pmax VALUES LESS THAN MAXVALUE
+    )
+    """
+
+    if dry_run:
+        print(f"[dry-run] Création de {len(new_partitions)} partition(s): "
+              f"{new_partitions[0][0]} → {new_partitions[-1][0]}")
+        return new_partitions
+
+    cursor = connection.cursor()
+    cursor.execute(query)
+    cursor.close()
+    print(f"✓ {len(new_partitions)} partition(s) créée(s): "
+          f"{new_partitions[0][0]} → {new_partitions[-1][0]}")
+    return new_partitions
+
+
+def count_open_incidents(connection, partition):
+    """Nombre d'incidents non résolus qui référencent un log de la partition"""
+    cursor = connection.cursor()
+    query = f"""
+    SELECT COUNT(*)
+    FROM incidents i
+    JOIN logs_securite PARTITION ({partition}) l ON l.id_log = i.id_log
+    WHERE i.statut != 'resolu'
+    """
+    cursor.execute(query)
+    count = cursor.fetchone()[0]
+    cursor.close()
+    return count
+
+
+def archive_partition(connection, partition):
+    """Archive (archive froide) les journées d'une partition avant sa suppression"""
+    cursor = connection.cursor()
+    cursor.execute(f"SELECT MIN(date_heure) FROM logs_securite PARTITION ({partition['nom']})")
+    oldest = cursor.fetchone()[0]
+    cursor.close()
+    if oldest is None:
+        return 0
+    return archive_range(connection, oldest.date(), from_days(partition['borne']))
+
+
+def delete_partition_incidents(connection, partition):
+    """Émule le ON DELETE CASCADE : supprime les incidents liés aux logs de la partition"""
+    cursor = connection.cursor()
+    query = f"""
+    DELETE i FROM incidents i
+    JOIN logs_securite PARTITION ({partition}) l ON l.id_log = i.id_log
+    """
+    cursor.execute(query)
+    deleted = cursor.rowcount
+    connection.commit()
+    cursor.close()
+    return deleted
+
+
+def drop_expired_partitions(connection, today, dry_run=False, table="logs_securite",
+                            retention_days=LOG_RETENTION_DAYS):
+    """
+    Supprime les partitions dont la borne haute est antérieure à la limite de rétention
+
+    Returns:
+        Liste des partitions supprimées
+    """
+    cutoff = to_days(today - timedelta(days=retention_days))
+    expired = [p for p in get_partitions(connection, table)
+               if p['borne'] is not None and p['borne'] <= cutoff]
+
+    dropped = []
+    for partition in expired:
+        nom = partition['nom']
+
+        if table == "logs_securite":
+            open_incidents = count_open_incidents(connection, nom)
+            if open_incidents:
+                print(f"⚠️  {nom} conservée : {open_incidents} incident(s) non résolu(s)")
+                continue
+
+        if dry_run:
+            print(f"[dry-run] Suppression de {nom} (~{partition['lignes']} lignes)")
+            dropped.append(nom)
+            continue
+
+        if table == "logs_securite":
+            if ARCHIVE_BEFORE_DROP:
+                archive_partition(connection, partition)
+            deleted = delete_partition_incidents(connection, nom)
+            if deleted:
+                print(f"  ✓ {deleted} incident(s) résolu(s) supprimé(s) avec {nom}")
+
+        cursor = connection.cursor()
+        cursor.execute(f"ALTER TABLE {table} DROP PARTITION {nom}")
+        cursor.close()
+        print(f"✓ Partition {nom} supprimée (~{partition['lignes']} lignes)")
+        dropped.append(nom)
+
+    if not expired:
+        print("✓ Aucune partition expirée")
+
+    return dropped
+
+
+def run_maintenance(connection, today=None, dry_run=False):
+    """Création des partitions futures, suppression des partitions expirées, réconciliation"""
+    today = today or date.today()
+    created = ensure_future_partitions(connection, today, dry_run)
+    if not dry_run:
+        # Agréger avant de supprimer : les séries horaires couvrent aussi les partitions supprimées
+        refresh_rollups(connection)
+    dropped = drop_expired_partitions(connection, today, dry_run)
+    if not dry_run:
+        drift = reconcile_incident_counters(connection)
+        if drift is not None:
+            print(f"✓ Compteurs d'incidents réconciliés ({len(drift)} écart(s) corrigé(s))")
+        purged = purge_minutes(connection, datetime.combine(today, datetime.min.time()))
+        print(f"✓ {purged} agrégat(s) par minute hors rétention supprimé(s)")
+        if dropped:
+            purged = purge_index(connection)
+            print(f"✓ {purged} token(s) de recherche des partitions supprimées effacé(s)")
+    return created, dropped
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Maintenance des partitions de logs_securite")
+    parser.add_argument("--dry-run", action="store_true", help="Afficher sans modifier")
+    parser.add_argument("--today", type=lambda s: datetime.strptime(s, "%Y-%m-%d").date(),
+                        default=None, help="Date de référence (AAAA-MM-JJ)")
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("   CLOUDSECMONITOR - MAINTENANCE DES PARTITIONS")
+    print("=" * 60)
+
+    connection = connect_db()
+    if not connection:
+        print("✗ Impossible de continuer sans connexion MySQL")
+        sys.exit(1)
+
+    try:
+        run_maintenance(connection, args.today, args.dry_run)
+    except Error as e:
+        print(f"✗ Erreur maintenance: {e}")
+        sys.exit(1)
+    finally:
+        if connection.is_connected():
+            connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,473 @@
+"""
+CloudSecMonitor - Démon de pipeline (collecte, détection et alertes dans un processus)
+
+    collecteur ─┬▶ [ingestion] ─▶ persistance ─────────────────────────┐
+                │                 (INSERT par lots, nouvelles           │ id_log
+                │                  tentatives puis déversement)         ▼
+                └▶ [détection] ─▶ détecteurs ─▶ [alertes] ─▶ alertes (incidents, sorties)
+                                  (fenêtres glissantes
+                                   + corrélation)
+
+Les étapes sont des threads reliés par des files bornées : si une étape ne suit
+pas, la file se remplit et l'étape précédente attend (contre-pression) au lieu
+d'accumuler en mémoire. Les événements ne sont jamais relus depuis MySQL : la
+détection travaille sur les logs en mémoire, en parallèle de leur persistance,
+avec le numéro de séquence attribué par le collecteur. Seule l'étape d'alertes
+attend que les logs d'une détection soient persistés pour enregistrer l'incident
+avec leurs id_log.
+
+Configuration par options ou variables d'environnement (CSM_*), sans menu :
+adapté à systemd (SIGTERM vide les files puis arrête proprement) et aux tests de charge.
+
+Usage:
+    python src/pipeline_daemon.py --rate 200 --sinks terminal,file
+    CSM_RATE=0 CSM_DURATION=60 python src/pipeline_daemon.py     # débit maximal, 60 s
+"""
+
+from collections import deque
+from datetime import datetime
+import argparse
+import bisect
+import json
+import logging
+import signal
+import random
+import queue
+import threading
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (CORRELATION_MAX_SOURCES, PIPELINE_INSERT_RETRIES,
+                           PIPELINE_RETRY_DELAY, PIPELINE_SPILL_FILE)
+from log_collector import (connect_db, generate_ssh_log, generate_port_scan_log,
+                           generate_file_access_log, insert_logs)
+from log_codec import render_description
+from correlation import CorrelationEngine
+from alert_system import record_incident, AlertSuppressor
+from query_stats import save_snapshot
+from notification_dispatcher import SINKS
+from structured_logging import get_logger, log_event, setup_logging
+
+logger = get_logger("pipeline")
+
+# Fin de flux : propagée d'étape en étape à l'arrêt
+END = None
+
+
+def env(name, default, cast=str):
+    """Valeur par défaut d'une option lue dans l'environnement (CSM_<NOM>)"""
+    value = os.environ.get(f"CSM_{name}")
+    return cast(value) if value is not None else default
+
+
+class SlidingWindowDetector:
+    """
+    Détecteur en mémoire : threshold+ événements (type, statut) en window secondes depuis une IP
+    Même critère que detect_brute_force / detect_port_scan, sans relire la base
+    """
+
+    def __init__(self, id_regle, type_incident, severite, type_log, statut, window, threshold,
+                 max_sources=CORRELATION_MAX_SOURCES):
+        self.id_regle = id_regle
+        self.type_incident = type_incident
+        self.severite = severite
+        self.type_log = type_log
+        self.statut = statut
+        self.window = window
+        self.threshold = threshold
+        self.max_sources = max_sources
+        # IP -> [deque[(horodatage, séquence)], événements depuis la dernière détection], ordre de dernière activité
+        self._events = {}
+
+    def process(self, event):
+        """Attaque détectée (format de _record dans log_analyzer) ou None"""
+        if event['type_log'] != self.type_log or event['statut'] != self.statut:
+            return None
+        ip = event['adresse_ip_source']
+        ts = event['date_heure'].timestamp()
+        state = self._events.pop(ip, None) or [deque(), 0]
+        self._events[ip] = state
+        if len(self._events) > self.max_sources:
+            del self._events[next(iter(self._events))]
+
+        events = state[0]
+        events.append((ts, event['seq']))
+        state[1] += 1
+        while ts - events[0][0] > self.window:
+            events.popleft()
+
+        # Une détection au passage du seuil, puis tous les threshold nouveaux événements
+        # tant que la fenêtre reste au-dessus : l'incident de la campagne est mis à jour
+        # sur place (record_incident)
+        if len(events) < self.threshold or state[1] < self.threshold:
+            return None
+        state[1] = 0
+        return {
+            'id_regle': self.id_regle,
+            'type_incident': self.type_incident,
+            'severite': self.severite,
+            'ip_source': ip,
+            'id_serveur': event['id_serveur'],
+            'seqs': [seq for _, seq in events],
+            'description': f"{self.type_incident} - {len(events)} événements en "
+                           f"{self.window // 60} min depuis {ip}"
+        }
+
+
+class LogIds:
+    """
+    Correspondance numéro de séquence du collecteur → id_log, une plage par lot persisté
+    Un lot reçoit d'InnoDB un bloc d'identifiants espacés d'un pas constant (insert_logs) :
+    (première séquence, taille, premier id_log, pas) suffit à retrouver chaque id_log
+    """
+
+    def __init__(self, retention):
+        self.retention = retention      # Secondes de plages conservées (fenêtre de détection la plus longue)
+        self._starts = []               # Première séquence de chaque lot, croissante
+        self._ranges = []               # (taille, premier id_log ou None si déversé, pas, instant)
+        self._settled = 0               # Séquences inférieures : persistées ou déversées
+        self._condition = threading.Condition()
+
+    def settle(self, first_seq, count, first_id=None, step=1):
+        """Lot persisté (first_id) ou déversé (None) : réveille l'étape d'alertes"""
+        now = time.monotonic()
+        with self._condition:
+            self._starts.append(first_seq)
+            self._ranges.append((count, first_id, step, now))
+            if now - self._ranges[0][3] > 2 * self.retention:
+                keep = bisect.bisect_left([r[3] for r in self._ranges], now - self.retention)
+                del self._starts[:keep], self._ranges[:keep]
+            self._settled = first_seq + count
+            self._condition.notify_all()
+
+    def close(self):
+        """Fin de la persistance : plus aucune attente"""
+        with self._condition:
+            self._settled = float("inf")
+            self._condition.notify_all()
+
+    def resolve(self, seqs):
+        """
+        id_log des séquences, après leur persistance (attente)
+        Les logs déversés, sans identifiant connu ou hors rétention sont omis
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self._settled > max(seqs))
+            ids = []
+            for seq in seqs:
+                i = bisect.bisect_right(self._starts, seq) - 1
+                if i < 0:
+                    continue
+                count, first_id, step, _ = self._ranges[i]
+                offset = seq - self._starts[i]
+                if first_id is not None and offset < count:
+                    ids.append(first_id + offset * step)
+            return ids
+
+
+def build_detectors():
+    """Détecteurs équivalents aux règles 1 et 2 de log_analyzer"""
+    return [
+        SlidingWindowDetector(1, "Brute Force SSH", 'critique', 'SSH', 'echec', 5 * 60, 5),
+        SlidingWindowDetector(2, "Port Scan Detection", 'moyen', 'scan_port', 'detecte', 10 * 60, 3),
+    ]
+
+
+class PipelineDaemon:
+    """Étapes du pipeline (threads) et files bornées qui les relient"""
+
+    def __init__(self, rate, duration, queue_size, batch_size, sinks, suppressor):
+        self.rate = rate
+        self.duration = duration
+        self.batch_size = batch_size
+        self.sinks = sinks
+        self.suppressor = suppressor
+        self.ingest_queue = queue.Queue(queue_size)
+        self.detect_queue = queue.Queue(queue_size)
+        self.alert_queue = queue.Queue(queue_size)
+        self.stop_event = threading.Event()
+        self.detectors = build_detectors()
+        self.engine = CorrelationEngine(id_key='seq')
+        self.log_ids = LogIds(max([self.engine.max_window] + [d.window for d in self.detectors]))
+        self.counters = {'generes': 0, 'persistes': 0, 'echecs_insertion': 0, 'deverses': 0,
+                         'detections': 0, 'incidents': 0, 'echecs_alertes': 0}
+
+    def stop(self, *_):
+        """Arrêt demandé (signal) : le collecteur s'arrête, les files se vident"""
+        self.stop_event.set()
+
+    # ---- Étapes ----
+
+    def collect(self):
+        """Génère des logs au débit demandé (0 = maximal)"""
+        generators = (generate_ssh_log, generate_port_scan_log, generate_file_access_log)
+        weights = (60, 25, 15)
+        started = time.monotonic()
+        while not self.stop_event.is_set():
+            if self.duration and time.monotonic() - started >= self.duration:
+                break
+            log = random.choices(generators, weights)[0]()
+            log['date_heure'] = datetime.now()
+            log['description'] = render_description(log['description_modele'], log['description_param'])
+            log['seq'] = self.counters['generes']
+            self.ingest_queue.put(log)
+            self.detect_queue.put(log)
+            self.counters['generes'] += 1
+            if self.rate:
+                delay = started + self.counters['generes'] / self.rate - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+        self.ingest_queue.put(END)
+        self.detect_queue.put(END)
+
+    def persist(self, connection):
+        """Insère les logs par lots et publie leurs id_log (LogIds) pour l'étape d'alertes"""
+        # close() même sur erreur imprévue : l'étape d'alertes n'attend jamais indéfiniment
+        try:
+            self._persist_batches(connection)
+        finally:
+            self.log_ids.close()
+
+    def _persist_batches(self, connection):
+        finished = False
+        while not finished:
+            batch = []
+            item = self.ingest_queue.get()
+            while True:
+                if item is END:
+                    finished = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.batch_size:
+                    break
+                try:
+                    item = self.ingest_queue.get_nowait()
+                except queue.Empty:
+                    break
+            if not batch:
+                continue
+
+            if self._insert(connection, batch):
+                self.counters['persistes'] += len(batch)
+                # id_log inconnus si lastrowid manque : le lot est inséré mais non résolu
+                first_id = batch[0].get('id_log')
+                step = batch[1]['id_log'] - first_id if first_id and len(batch) > 1 else 1
+                self.log_ids.settle(batch[0]['seq'], len(batch), first_id, step)
+            else:
+                self.counters['deverses'] += len(batch)
+                self._spill(batch)
+                self.log_ids.settle(batch[0]['seq'], len(batch))
+
+    def _insert(self, connection, batch):
+        """
+        INSERT du lot, retenté PIPELINE_INSERT_RETRIES fois (délai doublé, reconnexion)
+
+        Returns:
+            True si le lot est inséré
+        """
+        delay = PIPELINE_RETRY_DELAY
+        for attempt in range(PIPELINE_INSERT_RETRIES):
+            if attempt:
+                time.sleep(delay)
+                delay *= 2
+            try:
+                if attempt:
+                    connection.ping(reconnect=True, attempts=1, delay=0)
+                if insert_logs(connection, batch):
+                    return True
+            except Exception as e:
+                log_event(logger, logging.ERROR, f"✗ Erreur insertion du lot: {e}", taille_lot=len(batch))
+            self.counters['echecs_insertion'] += 1
+        return False
+
+    def _spill(self, batch):
+        """Lot abandonné après ses tentatives : ajouté à PIPELINE_SPILL_FILE (une ligne JSON par log)"""
+        try:
+            with open(PIPELINE_SPILL_FILE, "a", encoding="utf-8") as f:
+                for log in batch:
+                    f.write(json.dumps(log, default=str, ensure_ascii=False) + "\n")
+            log_event(logger, logging.WARNING, "⚠️  Lot non inséré déversé", taille_lot=len(batch),
+                      fichier=PIPELINE_SPILL_FILE)
+        except OSError as e:
+            log_event(logger, logging.ERROR, f"✗ Lot perdu (déversement impossible): {e}",
+                      taille_lot=len(batch))
+
+    def detect(self):
+        """Fenêtres glissantes par IP et corrélation multi-étapes"""
+        detectors, engine = self.detectors, self.engine
+        last_expire = time.monotonic()
+        while True:
+            event = self.detect_queue.get()
+            if event is END:
+                break
+            for detector in detectors:
+                attack = detector.process(event)
+                if attack:
+                    self.alert_queue.put(attack)
+            for campaign in engine.process(event):
+                self.alert_queue.put({
+                    'id_regle': campaign['id_regle'],
+                    'type_incident': "Campagne multi-étapes",
+                    'severite': campaign['severite'],
+                    'ip_source': campaign['ip_source'],
+                    'id_serveur': campaign['id_serveur'],
+                    'seqs': [campaign['premier_log'], campaign['dernier_log']],
+                    'nb_evenements': campaign['nb_evenements'],
+                    'description': f"Campagne multi-étapes '{campaign['nom']}' depuis "
+                                   f"{campaign['ip_source']} ({campaign['periode']})"
+                })
+            if time.monotonic() - last_expire > 60:
+                engine.expire()
+                last_expire = time.monotonic()
+        self.alert_queue.put(END)
+
+    def alert(self, connection):
+        """Enregistre les incidents de campagne et livre les nouvelles alertes aux sorties"""
+        while True:
+            attack = self.alert_queue.get()
+            if attack is END:
+                break
+            self.counters['detections'] += 1
+            # Une erreur ne doit pas arrêter l'étape : la file d'alertes se remplirait et
+            # bloquerait tout le pipeline (SIGTERM ne pourrait plus vider les files)
+            try:
+                self._alert(connection, attack)
+            except Exception as e:
+                self.counters['echecs_alertes'] += 1
+                try:
+                    connection.rollback()
+                except Exception:
+                    pass
+                log_event(logger, logging.ERROR, f"✗ Alerte non enregistrée: {e}",
+                          regle=attack['id_regle'], ip=attack['ip_source'])
+
+        if self.suppressor:
+            self._deliver(self.suppressor.flush(force=True))
+
+    def _alert(self, connection, attack):
+        """Enregistre une détection ; incident créé : notification marquée lue et alerte livrée"""
+        # Attend la persistance des logs de la détection (les logs déversés sont omis)
+        log_ids = self.log_ids.resolve(attack['seqs'])
+        if not log_ids:
+            raise RuntimeError("aucun log de la détection n'a été persisté")
+        incident_id, created = record_incident(
+            connection, attack['id_regle'], attack['ip_source'], attack['id_serveur'],
+            log_ids, attack['type_incident'], attack['description'], attack['severite'],
+            nb_events=attack.get('nb_evenements')
+        )
+        if not created:
+            return
+        self.counters['incidents'] += 1
+
+        # Alerte livrée ici : la notification de l'outbox est marquée lue (index de la migration 014)
+        cursor = connection.cursor()
+        try:
+            cursor.execute("UPDATE notifications SET lu = TRUE WHERE id_incident = %s", (incident_id,))
+            connection.commit()
+        finally:
+            cursor.close()
+
+        alert = {'id_notification': None, 'id_incident': incident_id,
+                 'id_regle': attack['id_regle'], 'type_notification': None,
+                 'niveau_severite': attack['severite'], 'message': None,
+                 'date_notification': datetime.now(), 'type_incident': attack['type_incident'],
+                 'description': attack['description']}
+        self._deliver(self.suppressor.filter([alert]) if self.suppressor else [alert])
+
+    def _deliver(self, alerts):
+        for sink in self.sinks:
+            if alerts:
+                try:
+                    sink.deliver(alerts)
+                except Exception as e:
+                    log_event(logger, logging.ERROR, f"✗ Sortie {sink.name} en échec: {e}")
+
+    def report(self, interval):
+        """Débit et profondeur des files, toutes les interval secondes"""
+        previous = dict(self.counters)
+        while not self.stop_event.wait(interval):
+            current = dict(self.counters)
+            log_event(logger, logging.INFO, "Pipeline",
+                      logs_par_s=round((current['persistes'] - previous['persistes']) / interval),
+                      file_ingestion=self.ingest_queue.qsize(),
+                      file_detection=self.detect_queue.qsize(),
+                      file_alertes=self.alert_queue.qsize(),
+                      **current)
+            previous = current
+            try:
+                save_snapshot("pipeline")    # Requêtes d'alert_system (page Performance)
+            except OSError as e:
+                log_event(logger, logging.WARNING, f"⚠️  Instantané des requêtes non écrit: {e}")
+
+    def run(self, persist_connection, alert_connection, report_interval):
+        """Démarre les étapes et attend la fin du flux"""
+        stages = [
+            threading.Thread(target=self.collect, name="collecteur"),
+            threading.Thread(target=self.persist, args=(persist_connection,), name="persistance"),
+            threading.Thread(target=self.detect, name="detection"),
+            threading.Thread(target=self.alert, args=(alert_connection,), name="alertes"),
+        ]
+        threading.Thread(target=self.report, args=(report_interval,), name="rapport", daemon=True).start()
+        started = time.monotonic()
+        for stage in stages:
+            stage.start()
+        for stage in stages:
+            stage.join()
+        self.stop_event.set()
+        return time.monotonic() - started
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Démon de pipeline CloudSecMonitor")
+    parser.add_argument("--rate", type=float, default=env("RATE", 100, float),
+                        help="Logs générés par seconde (0 = débit maximal)")
+    parser.add_argument("--duration", type=float, default=env("DURATION", 0, float),
+                        help="Durée en secondes (0 = jusqu'à SIGTERM)")
+    parser.add_argument("--queue-size", type=int, default=env("QUEUE_SIZE", 10_000, int))
+    parser.add_argument("--batch-size", type=int, default=env("BATCH_SIZE", 500, int),
+                        help="Logs par INSERT")
+    parser.add_argument("--sinks", default=env("SINKS", "terminal"),
+                        help="Sorties d'alertes: terminal,file,webhook (vide = aucune)")
+    parser.add_argument("--no-suppression", action="store_true",
+                        default=env("NO_SUPPRESSION", False, lambda v: v == "1"))
+    parser.add_argument("--report-interval", type=float, default=env("REPORT_INTERVAL", 10, float))
+    args = parser.parse_args()
+    setup_logging()
+
+    sinks = []
+    for name in filter(None, (n.strip() for n in args.sinks.split(","))):
+        if name not in SINKS:
+            print(f"✗ Sortie inconnue: {name}")
+            sys.exit(1)
+        sinks.append(SINKS[name]())
+
+    persist_connection = connect_db()
+    alert_connection = connect_db()
+    if not persist_connection or not alert_connection:
+        print("✗ Impossible de continuer sans connexion MySQL")
+        sys.exit(1)
+
+    daemon = PipelineDaemon(args.rate, args.duration, args.queue_size, args.batch_size, sinks,
+                            None if args.no_suppression else AlertSuppressor())
+    signal.signal(signal.SIGTERM, daemon.stop)
+    signal.signal(signal.SIGINT, daemon.stop)
+
+    log_event(logger, logging.INFO, "✓ Pipeline démarré", debit=args.rate or "max",
+              sorties=[sink.name for sink in sinks])
+    try:
+        elapsed = daemon.run(persist_connection, alert_connection, args.report_interval)
+        log_event(logger, logging.INFO, "✓ Pipeline arrêté", duree_s=round(elapsed, 1),
+                  logs_par_s=round(daemon.counters['persistes'] / elapsed) if elapsed else 0,
+                  **daemon.counters)
+    finally:
+        for connection in (persist_connection, alert_connection):
+            if connection.is_connected():
+                connection.close()
+
+
+if __name__ == "__main__":
+    main()
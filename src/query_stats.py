@@ -0,0 +1,295 @@
+"""
+CloudSecMonitor - Chronométrage des requêtes SQL (tampon circulaire en mémoire)
+
+instrument(connection) enveloppe une connexion : chaque execute() est chronométré
+avec la lecture de ses lignes et noté dans un tampon circulaire de
+QUERY_STATS_CAPACITY entrées, au nom de la fonction du projet qui l'a lancé
+(module.fonction, trouvé dans la pile) et de l'empreinte de la requête (texte SQL
+normalisé). QUERY_STATS_SAMPLE_RATE < 1 n'en note qu'une partie.
+    - dashboard : connexions du pool enveloppées par get_connection, succès de
+      cache notés par versioned_cache
+    - log_analyzer, alert_system : fonctions décorées par @instrumented
+Les autres processus (analyseur, pipeline) écrivent un instantané JSON dans
+QUERY_STATS_DIR, lu par la page Performance du dashboard.
+
+Usage:
+    python src/query_stats.py                 # résumé des instantanés présents
+"""
+
+from collections import OrderedDict, deque
+import functools
+import threading
+import hashlib
+import random
+import json
+import time
+import sys
+import re
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import QUERY_STATS_CAPACITY, QUERY_STATS_SAMPLE_RATE, QUERY_STATS_DIR
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+MAX_STATEMENTS = 500    # Requêtes distinctes gardées pour EXPLAIN (les plus récentes)
+
+# Entrée du tampon : [horodatage, nom, empreinte (None = appel servi par le cache), durée ms, lignes, cache]
+FIELDS = ("horodatage", "nom", "empreinte", "duree_ms", "lignes", "cache")
+
+_WHITESPACE = re.compile(r"\s+")
+_PLACEHOLDER_LIST = re.compile(r"%s(?:\s*,\s*%s)+")
+_module_names = {}
+
+
+def normalize_sql(sql):
+    """Texte SQL sur une ligne, listes de paramètres (IN (%s, %s, ...)) réduites à un seul"""
+    return _PLACEHOLDER_LIST.sub("%s…", _WHITESPACE.sub(" ", sql).strip())
+
+
+def fingerprint(sql):
+    return hashlib.md5(normalize_sql(sql).encode("utf-8")).hexdigest()[:12]
+
+
+def _module_name(filename):
+    """Nom du module si le fichier est dans src/, None sinon (pandas, mysql, ...)"""
+    name = _module_names.get(filename, False)
+    if name is False:
+        path = os.path.abspath(filename)
+        name = (os.path.splitext(os.path.basename(path))[0]
+                if os.path.dirname(path) == SRC_DIR and path != os.path.abspath(__file__) else None)
+        _module_names[filename] = name
+    return name
+
+
+def caller_name():
+    """module.fonction du projet le plus proche dans la pile"""
+    frame = sys._getframe(2)
+    while frame is not None:
+        module = _module_name(frame.f_code.co_filename)
+        if module:
+            return f"{module}.{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "inconnu"
+
+
+class QueryRecorder:
+    """Tampon circulaire des requêtes chronométrées (thread-safe)"""
+
+    def __init__(self, capacity=QUERY_STATS_CAPACITY, sample_rate=QUERY_STATS_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self._entries = deque(maxlen=capacity)
+        self._statements = OrderedDict()    # empreinte -> (nom, sql, paramètres) de la dernière exécution
+        self._lock = threading.Lock()
+        self.started = time.time()
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    def record_query(self, name, sql, params, seconds, rows):
+        """Note une exécution ; retourne l'entrée (complétée par la lecture des lignes)"""
+        key = fingerprint(sql)
+        entry = [time.time(), name, key, seconds * 1000, rows, False]
+        with self._lock:
+            self._entries.append(entry)
+            self._statements[key] = (name, sql, params)
+            self._statements.move_to_end(key)
+            if len(self._statements) > MAX_STATEMENTS:
+                self._statements.popitem(last=False)
+        return entry
+
+    def record_cache(self, name, seconds, hit):
+        """Appel d'une fonction de données en cache (succès : aucune requête exécutée)"""
+        if self.sampled():
+            with self._lock:
+                self._entries.append([time.time(), name, None, seconds * 1000, None, hit])
+
+    def entries(self):
+        """Copie des entrées, de la plus ancienne à la plus récente (dicts)"""
+        with self._lock:
+            return [dict(zip(FIELDS, entry)) for entry in self._entries]
+
+    def statements(self):
+        """{empreinte: {nom, sql, params}}"""
+        with self._lock:
+            return {key: {"nom": name, "sql": sql, "params": params}
+                    for key, (name, sql, params) in self._statements.items()}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._statements.clear()
+
+    def snapshot(self, process):
+        return {"processus": process, "pid": os.getpid(), "ecrit_le": time.time(),
+                "depuis": self.started, "echantillonnage": self.sample_rate,
+                "entrees": self.entries(), "requetes": self.statements()}
+
+
+_recorder = QueryRecorder()
+
+
+def get_recorder():
+    """Tampon du processus"""
+    return _recorder
+
+
+class TimedCursor:
+    """Curseur dont execute() et les lectures de lignes sont chronométrés"""
+
+    def __init__(self, cursor, recorder):
+        self._cursor = cursor
+        self._recorder = recorder
+        self._entry = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def _execute(self, method, operation, params, many, *args, **kwargs):
+        call_args = (operation,) if params is None else (operation, params)
+        if not self._recorder.sampled():
+            self._entry = None
+            return method(*call_args, *args, **kwargs)
+        start = time.perf_counter()
+        try:
+            return method(*call_args, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            rows = max(self._cursor.rowcount, 0) if many or not getattr(self._cursor, "with_rows", True) else 0
+            # Les lots d'executemany ne sont pas gardés (EXPLAIN impossible, taille non bornée)
+            self._entry = self._recorder.record_query(caller_name(), operation, None if many else params,
+                                                      elapsed, rows)
+
+    def execute(self, operation, params=None, *args, **kwargs):
+        return self._execute(self._cursor.execute, operation, params, False, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        return self._execute(self._cursor.executemany, operation, seq_params, True, *args, **kwargs)
+
+    def _fetch(self, method, *args):
+        if self._entry is None:
+            return method(*args)
+        start = time.perf_counter()
+        result = method(*args)
+        self._entry[3] += (time.perf_counter() - start) * 1000
+        if isinstance(result, list):
+            self._entry[4] += len(result)
+        elif result is not None:
+            self._entry[4] += 1
+        return result
+
+    def fetchone(self):
+        return self._fetch(self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._fetch(self._cursor.fetchall)
+
+    def fetchmany(self, *args):
+        return self._fetch(self._cursor.fetchmany, *args)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._cursor.close()
+
+
+class TimedConnection:
+    """Connexion dont les curseurs sont chronométrés (le reste est délégué)"""
+
+    def __init__(self, connection, recorder):
+        self._connection = connection
+        self._recorder = recorder
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def cursor(self, *args, **kwargs):
+        return TimedCursor(self._connection.cursor(*args, **kwargs), self._recorder)
+
+
+def instrument(connection, recorder=None):
+    """Connexion enveloppée (une seule fois), None reste None"""
+    if connection is None or isinstance(connection, TimedConnection):
+        return connection
+    return TimedConnection(connection, recorder or _recorder)
+
+
+def instrumented(func):
+    """Décorateur : le premier argument (connexion) est chronométré pendant l'appel"""
+    @functools.wraps(func)
+    def wrapper(connection, *args, **kwargs):
+        return func(instrument(connection), *args, **kwargs)
+    return wrapper
+
+
+def save_snapshot(process, directory=QUERY_STATS_DIR):
+    """Écrit le tampon du processus dans QUERY_STATS_DIR/<process>.json (remplacement atomique)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{process}.json")
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        json.dump(_recorder.snapshot(process), f, ensure_ascii=False, default=str)
+    os.replace(temporary, path)
+    return path
+
+
+def load_snapshots(directory=QUERY_STATS_DIR):
+    """{processus: instantané} des fichiers de QUERY_STATS_DIR"""
+    snapshots = {}
+    if not os.path.isdir(directory):
+        return snapshots
+    for filename in sorted(os.listdir(directory)):
+        if filename.endswith(".json"):
+            try:
+                with open(os.path.join(directory, filename), encoding="utf-8") as f:
+                    snapshot = json.load(f)
+                snapshots[snapshot["processus"]] = snapshot
+            except (OSError, ValueError, KeyError):
+                continue
+    return snapshots
+
+
+def percentile(values, fraction):
+    """Percentile par rang (valeurs triées)"""
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))]
+
+
+def summarize(entries):
+    """Par (nom, empreinte) : exécutions, p50, p95, max et lignes, du p95 le plus élevé au plus bas"""
+    groups = {}
+    for entry in entries:
+        if entry["empreinte"] is not None:
+            groups.setdefault((entry["nom"], entry["empreinte"]), []).append(entry)
+    summary = []
+    for (name, key), group in groups.items():
+        durations = [e["duree_ms"] for e in group]
+        summary.append({"nom": name, "empreinte": key, "executions": len(group),
+                        "p50_ms": percentile(durations, 0.5), "p95_ms": percentile(durations, 0.95),
+                        "max_ms": max(durations), "total_ms": sum(durations),
+                        "lignes_moy": sum(e["lignes"] or 0 for e in group) / len(group)})
+    return sorted(summary, key=lambda row: row["p95_ms"], reverse=True)
+
+
+def main():
+    """Fonction principale"""
+    snapshots = load_snapshots()
+    if not snapshots:
+        print(f"Aucun instantané dans {QUERY_STATS_DIR}")
+        return
+    for process, snapshot in snapshots.items():
+        written = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(snapshot["ecrit_le"]))
+        print(f"{process} (pid {snapshot['pid']}, écrit le {written}) : {len(snapshot['entrees'])} entrée(s)")
+        for row in summarize(snapshot["entrees"])[:10]:
+            print(f"  {row['p95_ms']:8.1f} ms p95  {row['executions']:6d} ×  {row['nom']}  "
+                  f"{normalize_sql(snapshot['requetes'].get(row['empreinte'], {}).get('sql', ''))[:70]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+"""
+CloudSecMonitor - Journalisation structurée non bloquante
+
+Les chemins chauds (insertion, détection, alertes) écrivent des enregistrements
+logging au lieu de print() :
+    - QueueHandler : l'appel ne fait que déposer l'enregistrement dans une file
+      bornée (jamais d'attente ; si la file est pleine, l'enregistrement est
+      compté comme perdu)
+    - QueueListener : un thread d'arrière-plan formate et écrit vers les sorties
+      (fichier JSON lines, console colorée optionnelle)
+    - Les messages par événement (log_event(..., echantillon=True)) ne sont
+      gardés qu'un sur LOG_EVENT_SAMPLE_EVERY
+
+Usage:
+    python src/structured_logging.py benchmark    # print() vs journalisation
+"""
+
+from logging.handlers import QueueHandler, QueueListener
+from datetime import datetime
+import argparse
+import logging
+import atexit
+import queue
+import json
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import (LOG_LEVEL, LOG_FILE, LOG_CONSOLE, LOG_EVENT_SAMPLE_EVERY,
+                           LOG_QUEUE_SIZE)
+
+ROOT_LOGGER = "cloudsecmonitor"
+
+
+# Codes couleurs pour le terminal
+class Colors:
+    RED = '\033[91m'      # Rouge - Critique
+    YELLOW = '\033[93m'   # Jaune - Moyen
+    GREEN = '\033[92m'    # Vert - Faible
+    BLUE = '\033[94m'     # Bleu - Info
+    RESET = '\033[0m'     # Reset couleur
+    BOLD = '\033[1m'      # Gras
+
+
+SEVERITY_COLORS = {"critique": Colors.RED, "moyen": Colors.YELLOW, "faible": Colors.GREEN}
+LEVEL_COLORS = {logging.ERROR: Colors.RED, logging.WARNING: Colors.YELLOW,
+                logging.DEBUG: Colors.BLUE}
+
+
+class JsonFormatter(logging.Formatter):
+    """Une ligne JSON par enregistrement : horodatage, niveau, composant, message, champs"""
+
+    def format(self, record):
+        entry = {
+            "date": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "niveau": record.levelname,
+            "composant": record.name.rsplit(".", 1)[-1],
+            "message": record.getMessage()
+        }
+        entry.update(getattr(record, "champs", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """Vue console colorée (couleur de la sévérité d'alerte si présente, sinon du niveau)"""
+
+    def format(self, record):
+        champs = getattr(record, "champs", None) or {}
+        color = SEVERITY_COLORS.get(champs.get("severite"), LEVEL_COLORS.get(record.levelno, ""))
+        details = " ".join(f"{k}={v}" for k, v in champs.items())
+        line = f"{datetime.fromtimestamp(record.created):%H:%M:%S} {record.getMessage()}"
+        if details:
+            line += f"  {details}"
+        return f"{color}{line}{Colors.RESET}" if color else line
+
+
+class EventSampler:
+    """
+    Garde un message par événement sur every
+    Appliqué avant la création de l'enregistrement : un message écarté ne coûte qu'un compteur
+    """
+
+    def __init__(self, every=LOG_EVENT_SAMPLE_EVERY):
+        self.every = max(1, every)
+        self.seen = 0
+        self.dropped = 0
+
+    def keep(self):
+        self.seen += 1
+        if self.seen % self.every == 1 or self.every == 1:
+            return True
+        self.dropped += 1
+        return False
+
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler qui ne bloque jamais : file pleine = enregistrement compté perdu"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.lost = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.lost += 1
+
+
+_listener = None
+_queue_handler = None
+_sampler = None
+
+
+def setup_logging(level=LOG_LEVEL, json_file=LOG_FILE, console=LOG_CONSOLE,
+                  sample_every=LOG_EVENT_SAMPLE_EVERY, queue_size=LOG_QUEUE_SIZE):
+    """
+    Configure le logger racine cloudsecmonitor (une seule fois par processus)
+
+    Args:
+        level: Niveau minimal ('DEBUG', 'INFO', ...)
+        json_file: Fichier JSON lines (None pour désactiver)
+        console: Vue console colorée sur stdout
+        sample_every: Un message par événement conservé sur sample_every
+        queue_size: Taille de la file entre les appelants et le thread d'écriture
+    """
+    global _listener, _queue_handler, _sampler
+    if _listener is not None:
+        return _listener
+
+    handlers = []
+    if json_file:
+        file_handler = logging.FileHandler(json_file, encoding="utf-8")
+        file_handler.setFormatter(JsonFormatter())
+        handlers.append(file_handler)
+    if console:
+        console_handler = logging.StreamHandler(sys.stdout)
+        console_handler.setFormatter(ConsoleFormatter())
+        handlers.append(console_handler)
+
+    _queue_handler = DroppingQueueHandler(queue.Queue(queue_size))
+    _sampler = EventSampler(sample_every)
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(level)
+    root.propagate = False
+    root.addHandler(_queue_handler)
+
+    _listener = QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+    return _listener
+
+
+def shutdown_logging():
+    """Vide la file et arrête le thread d'écriture"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+        logging.getLogger(ROOT_LOGGER).removeHandler(_queue_handler)
+
+
+def get_logger(component):
+    """
+    Logger d'un composant, sans effet de bord : importer un module ne crée ni fichier
+    ni thread. Les points d'entrée (main) appellent setup_logging()
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{component}")
+
+
+def log_event(logger, level, message, echantillon=False, **champs):
+    """
+    Écrit un enregistrement structuré
+
+    Args:
+        echantillon: Message par événement, soumis à l'échantillonnage
+        champs: Champs ajoutés à la ligne JSON (ip, serveur, severite, ...)
+    """
+    if echantillon and _sampler is not None and not _sampler.keep():
+        return
+    if logger.isEnabledFor(level):
+        logger.log(level, message, extra={"champs": champs})
+
+
+def stats():
+    """Messages échantillonnés et perdus depuis le démarrage"""
+    return {"echantillonnes": _sampler.dropped if _sampler else 0,
+            "perdus": _queue_handler.lost if _queue_handler else 0}
+
+
+def benchmark(nb_events=200_000):
+    """
+    Compare print() par événement et la journalisation structurée, sur les mêmes
+    événements : sans échantillonnage, console seule (pas de fichier JSON), file assez
+    grande pour ne rien perdre. Le temps de la journalisation inclut la vidange de la
+    file par le thread d'écriture (shutdown_logging) ; le temps côté appelant est
+    affiché à part
+    """
+    start = time.perf_counter()
+    for i in range(nb_events):
+        print(f"  ✓ Tentative {i + 1}/{nb_events} enregistrée")
+    sys.stdout.flush()
+    print_elapsed = time.perf_counter() - start
+
+    setup_logging(json_file=None, console=True, sample_every=1, queue_size=nb_events)
+    logger = get_logger("benchmark")
+    start = time.perf_counter()
+    for i in range(nb_events):
+        log_event(logger, logging.INFO, f"  ✓ Tentative {i + 1}/{nb_events} enregistrée")
+    caller_elapsed = time.perf_counter() - start
+    lost = stats()["perdus"]
+    shutdown_logging()
+    sys.stdout.flush()
+    log_elapsed = time.perf_counter() - start
+
+    print(f"print(): {nb_events / print_elapsed:,.0f} événements/s", file=sys.stderr)
+    print(f"journalisation: {nb_events / log_elapsed:,.0f} événements/s écrits "
+          f"(x{print_elapsed / log_elapsed:.2f}), {nb_events / caller_elapsed:,.0f} événements/s "
+          f"côté appelant (x{print_elapsed / caller_elapsed:.2f}), {lost} perdu(s)", file=sys.stderr)
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Journalisation CloudSecMonitor")
+    parser.add_argument("commande", choices=["benchmark"])
+    parser.add_argument("--evenements", type=int, default=200_000)
+    args = parser.parse_args()
+
+    benchmark(args.evenements)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,300 @@
+"""
+CloudSecMonitor - Correspondance des IP sources avec les flux de menaces
+
+Les flux (THREAT_FEEDS) sont des fichiers locaux d'adresses IP et de préfixes
+CIDR. Ils sont fusionnés en tableaux triés d'intervalles disjoints
+(début, fin, étiquettes) : une recherche est une dichotomie (bisect) sur un
+tableau compact, quel que soit le nombre de préfixes chargés. Pour l'IPv4, une
+table des 16 bits de poids fort réduit la dichotomie à quelques comparaisons.
+
+Le rechargement construit un nouvel index puis remplace la référence en une
+seule affectation : les recherches concurrentes voient l'ancien ou le nouvel
+index, jamais un index partiel.
+
+Usage:
+    python src/threat_intel.py stats              # flux chargés et mémoire
+    python src/threat_intel.py check 203.45.12.88
+    python src/threat_intel.py benchmark          # 1M préfixes aléatoires
+"""
+
+from array import array
+from bisect import bisect_left, bisect_right
+import ipaddress
+import argparse
+import random
+import socket
+import threading
+import time
+import sys
+import os
+
+# Ajouter le dossier parent au path pour importer config
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config.config import THREAT_FEEDS, THREAT_FEEDS_RELOAD_INTERVAL
+
+
+def parse_feed_lines(lines):
+    """
+    Convertit les lignes d'un flux en intervalles
+
+    Returns:
+        (intervalles IPv4 [(début, fin)], intervalles IPv6 [(début, fin)], lignes invalides)
+    """
+    ipv4, ipv6 = [], []
+    invalid = 0
+    for line in lines:
+        entry = line.split("#", 1)[0].split(";", 1)[0].strip().split(None, 1)
+        if not entry:
+            continue
+        try:
+            network = ipaddress.ip_network(entry[0], strict=False)
+        except ValueError:
+            invalid += 1
+            continue
+        interval = (int(network.network_address), int(network.broadcast_address))
+        (ipv4 if network.version == 4 else ipv6).append(interval)
+    return ipv4, ipv6, invalid
+
+
+def merge_intervals(feeds):
+    """
+    Fusionne les intervalles de plusieurs flux en segments disjoints triés
+
+    Args:
+        feeds: {nom_flux: [(début, fin)]}
+
+    Returns:
+        (débuts, fins, étiquettes) où étiquettes[i] est le frozenset des flux du segment i
+    """
+    events = []
+    for name, intervals in feeds.items():
+        for start, end in intervals:
+            events.append((start, 1, name))
+            events.append((end + 1, -1, name))
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    starts, ends, tags = [], [], []
+    active = {}
+    position = None
+
+    for point, delta, name in events:
+        if position is not None and point > position and active:
+            current = frozenset(active)
+            # Segment contigu avec les mêmes flux : on prolonge le précédent
+            if ends and ends[-1] == position - 1 and tags[-1] == current:
+                ends[-1] = point - 1
+            else:
+                starts.append(position)
+                ends.append(point - 1)
+                tags.append(current)
+        position = point
+        active[name] = active.get(name, 0) + delta
+        if active[name] == 0:
+            del active[name]
+
+    return starts, ends, tags
+
+
+# Nombre de bits de poids fort de la table d'accès IPv4
+V4_BUCKET_BITS = 16
+
+
+class ThreatIndex:
+    """Index immuable : tableaux triés de segments IPv4 (array) et IPv6 (listes)"""
+
+    def __init__(self, feeds_v4, feeds_v6):
+        starts, ends, tags = merge_intervals(feeds_v4)
+        starts6, ends6, tags6 = merge_intervals(feeds_v6)
+        self._tag_sets = sorted(set(tags) | set(tags6), key=sorted)
+        tag_ids = {tag: i for i, tag in enumerate(self._tag_sets)}
+
+        self._v4_starts = array("I", starts)
+        self._v4_ends = array("I", ends)
+        self._v4_tags = array("H", [tag_ids[t] for t in tags])
+
+        # _v4_buckets[b] = premier segment dont le début a b pour bits de poids fort
+        shift = 32 - V4_BUCKET_BITS
+        self._v4_buckets = array("I", (bisect_left(starts, b << shift)
+                                       for b in range((1 << V4_BUCKET_BITS) + 1)))
+
+        self._v6_starts = starts6
+        self._v6_ends = ends6
+        self._v6_tags = array("H", [tag_ids[t] for t in tags6])
+
+    def __len__(self):
+        return len(self._v4_starts) + len(self._v6_starts)
+
+    def match(self, ip):
+        """Flux contenant l'IP (frozenset) ou None"""
+        try:
+            if ":" in ip:
+                value = int(ipaddress.IPv6Address(ip))
+                i = bisect_right(self._v6_starts, value) - 1
+                if i >= 0 and value <= self._v6_ends[i]:
+                    return self._tag_sets[self._v6_tags[i]]
+                return None
+            value = int.from_bytes(socket.inet_aton(ip), "big")
+        except (OSError, ValueError):
+            return None
+        bucket = value >> (32 - V4_BUCKET_BITS)
+        lo = self._v4_buckets[bucket]
+        i = bisect_right(self._v4_starts, value, lo, self._v4_buckets[bucket + 1]) - 1
+        if i < lo:
+            i = lo - 1    # Segment commencé dans une tranche précédente
+        if i >= 0 and value <= self._v4_ends[i]:
+            return self._tag_sets[self._v4_tags[i]]
+        return None
+
+    def memory_bytes(self):
+        """Taille des tableaux de l'index"""
+        v4 = sum(a.buffer_info()[1] * a.itemsize
+                 for a in (self._v4_starts, self._v4_ends, self._v4_tags, self._v4_buckets))
+        v6 = (sum(sys.getsizeof(x) for x in self._v6_starts) + sys.getsizeof(self._v6_starts)
+              + sum(sys.getsizeof(x) for x in self._v6_ends) + sys.getsizeof(self._v6_ends)
+              + self._v6_tags.buffer_info()[1] * self._v6_tags.itemsize)
+        return v4 + v6
+
+
+class ThreatIntel:
+    """Flux de menaces chargés, rechargeables à chaud"""
+
+    def __init__(self, feeds=None):
+        self.feeds = dict(THREAT_FEEDS if feeds is None else feeds)
+        self._index = ThreatIndex({}, {})
+        self._mtimes = {}
+        self._stats = {}
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self.reload()
+
+    def reload(self):
+        """Relit tous les flux et remplace l'index de façon atomique"""
+        with self._reload_lock:
+            feeds_v4, feeds_v6, stats, mtimes = {}, {}, {}, {}
+            for name, path in self.feeds.items():
+                try:
+                    mtimes[name] = os.path.getmtime(path)
+                    with open(path, encoding="utf-8") as f:
+                        ipv4, ipv6, invalid = parse_feed_lines(f)
+                except OSError as e:
+                    print(f"✗ Flux {name} illisible: {e}")
+                    continue
+                feeds_v4[name], feeds_v6[name] = ipv4, ipv6
+                feed_index = ThreatIndex({name: ipv4}, {name: ipv6})
+                stats[name] = {
+                    "entrees": len(ipv4) + len(ipv6),
+                    "invalides": invalid,
+                    "segments": len(feed_index),
+                    "octets": feed_index.memory_bytes()
+                }
+
+            index = ThreatIndex(feeds_v4, feeds_v6)
+            self._index = index          # Remplacement atomique de la référence
+            self._stats, self._mtimes = stats, mtimes
+        return index
+
+    def reload_if_changed(self):
+        """Recharge si un fichier de flux a été modifié, ajouté ou supprimé"""
+        for name, path in self.feeds.items():
+            try:
+                mtime = os.path.getmtime(path)
+            except OSError:
+                mtime = None
+            if self._mtimes.get(name) != mtime:
+                self.reload()
+                return True
+        return False
+
+    def start_auto_reload(self, interval=THREAT_FEEDS_RELOAD_INTERVAL):
+        """Vérifie les fichiers en arrière-plan toutes les interval secondes"""
+        def loop():
+            while not self._stop.wait(interval):
+                if self.reload_if_changed():
+                    print(f"✓ Flux de menaces rechargés ({len(self._index)} segments)")
+
+        thread = threading.Thread(target=loop, name="threat-intel-reload", daemon=True)
+        thread.start()
+        return thread
+
+    def stop(self):
+        self._stop.set()
+
+    def match(self, ip):
+        """Flux contenant l'IP (frozenset) ou None"""
+        return self._index.match(ip)
+
+    def tag(self, ip):
+        """Étiquette à stocker avec le log : noms des flux séparés par des virgules, ou None"""
+        feeds = self._index.match(ip)
+        return ",".join(sorted(feeds)) if feeds else None
+
+    def stats(self):
+        """Statistiques par flux et mémoire de l'index fusionné"""
+        return {"flux": dict(self._stats),
+                "segments": len(self._index),
+                "octets": self._index.memory_bytes()}
+
+
+_shared_intel = None
+
+
+def get_threat_intel():
+    """Instance partagée par le processus (chargée et surveillée à la première utilisation)"""
+    global _shared_intel
+    if _shared_intel is None:
+        _shared_intel = ThreatIntel()
+        _shared_intel.start_auto_reload()
+    return _shared_intel
+
+
+def benchmark(nb_prefixes=1_000_000, nb_lookups=1_000_000):
+    """Mesure la construction et le temps de recherche avec des préfixes aléatoires"""
+    rng = random.Random(42)
+    intervals = []
+    for _ in range(nb_prefixes):
+        # Répartition proche d'une liste noire réelle : surtout des /32 et /24
+        prefix_len = rng.choice([32] * 6 + [24] * 3 + [16])
+        network = rng.getrandbits(32) >> (32 - prefix_len) << (32 - prefix_len)
+        intervals.append((network, network + (1 << (32 - prefix_len)) - 1))
+
+    start = time.perf_counter()
+    index = ThreatIndex({"benchmark": intervals}, {})
+    build = time.perf_counter() - start
+
+    ips = [socket.inet_ntoa(rng.getrandbits(32).to_bytes(4, "big")) for _ in range(nb_lookups)]
+    match = index.match
+    start = time.perf_counter()
+    hits = sum(1 for ip in ips if match(ip))
+    lookup = time.perf_counter() - start
+
+    print(f"Construction: {build:.2f} s pour {nb_prefixes:,} préfixes ({len(index):,} segments)")
+    print(f"Mémoire index: {index.memory_bytes() / 1024 / 1024:.1f} Mo")
+    print(f"Recherche: {lookup / nb_lookups * 1e6:.2f} µs/IP ({hits:,} correspondances)")
+
+
+def main():
+    """Fonction principale"""
+    parser = argparse.ArgumentParser(description="Flux de menaces CloudSecMonitor")
+    parser.add_argument("commande", choices=["stats", "check", "benchmark"])
+    parser.add_argument("ip", nargs="?")
+    args = parser.parse_args()
+
+    if args.commande == "benchmark":
+        benchmark()
+        return
+
+    intel = ThreatIntel()
+    if args.commande == "check":
+        feeds = intel.match(args.ip or "")
+        print(f"⚠️  {args.ip} présente dans: {', '.join(sorted(feeds))}" if feeds
+              else f"✓ {args.ip} absente des flux")
+    else:
+        stats = intel.stats()
+        for name, feed in stats["flux"].items():
+            print(f"{name}: {feed['entrees']} entrée(s), {feed['segments']} segment(s), "
+                  f"{feed['octets'] / 1024:.1f} Ko, {feed['invalides']} ligne(s) invalide(s)")
+        print(f"Index fusionné: {stats['segments']} segment(s), {stats['octets'] / 1024:.1f} Ko")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+CloudSecMonitor - record_incident : un incident résolu n'est pas recréé par les logs
+encore présents dans la fenêtre des détecteurs
+
+Test d'intégration sur la base de DB_CONFIG (ignoré si MySQL est injoignable) :
+    python -m pytest tests
+"""
+
+import unittest
+import sys
+import os
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+import mysql.connector
+from mysql.connector import Error
+from config.config import DB_CONFIG
+from alert_system import record_incident, bulk_update_incidents
+
+IP_TEST = "198.51.100.77"    # Plage de documentation (RFC 5737) : aucun log réel
+ID_REGLE = 1
+ID_SERVEUR = 1
+
+
+class RecordIncidentAfterResolution(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        try:
+            cls.connection = mysql.connector.connect(**DB_CONFIG)
+        except Error as e:
+            raise unittest.SkipTest(f"MySQL injoignable: {e}")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.connection.close()
+
+    def setUp(self):
+        self.cleanup()
+
+    def tearDown(self):
+        self.cleanup()
+
+    def cleanup(self):
+        cursor = self.connection.cursor()
+        cursor.execute("""
+            DELETE n FROM notifications n JOIN incidents i ON i.id_incident = n.id_incident
+            WHERE i.adresse_ip_source = %s
+        """, (IP_TEST,))
+        cursor.execute("DELETE FROM incidents WHERE adresse_ip_source = %s", (IP_TEST,))
+        self.connection.commit()
+        cursor.close()
+
+    def record(self, log_ids):
+        return record_incident(self.connection, ID_REGLE, IP_TEST, ID_SERVEUR, log_ids,
+                               "Brute Force SSH", "test", 'critique')
+
+    def count_incidents(self):
+        cursor = self.connection.cursor()
+        cursor.execute("SELECT COUNT(*) FROM incidents WHERE adresse_ip_source = %s", (IP_TEST,))
+        count = cursor.fetchone()[0]
+        cursor.close()
+        return count
+
+    def test_resolved_incident_not_recreated_from_same_logs(self):
+        log_ids = [9_000_001, 9_000_002, 9_000_003, 9_000_004, 9_000_005]
+        incident_id, created = self.record(log_ids)
+        self.assertTrue(created)
+
+        bulk_update_incidents(self.connection, 'resolu', ids=[incident_id], resolu_par="test")
+
+        # Cycle suivant de l'analyseur : mêmes logs, toujours dans la fenêtre
+        self.assertEqual(self.record(log_ids), (None, False))
+        self.assertEqual(self.count_incidents(), 1)
+
+    def test_new_logs_after_resolution_open_new_incident(self):
+        incident_id, _ = self.record([9_000_001, 9_000_002, 9_000_003])
+        bulk_update_incidents(self.connection, 'resolu', ids=[incident_id], resolu_par="test")
+
+        new_id, created = self.record([9_000_002, 9_000_003, 9_000_004, 9_000_005])
+        self.assertTrue(created)
+        cursor = self.connection.cursor(dictionary=True)
+        cursor.execute("SELECT nb_evenements, premier_log FROM incidents WHERE id_incident = %s", (new_id,))
+        incident = cursor.fetchone()
+        cursor.close()
+        self.assertEqual(incident['nb_evenements'], 2)
+        self.assertEqual(incident['premier_log'], 9_000_004)
+
+
+if __name__ == "__main__":
+    unittest.main()